@@ -0,0 +1,54 @@
+"""
+CCI 平均绝对偏差的微基准
+对比原 pandas rolling.apply 逐窗口调用 Python lambda 的实现与向量化实现，
+并校验两者结果一致。
+
+运行（在 src 目录下）：
+    python -m benchmarks.bench_cci
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from signals.indicators import mean_deviation
+
+SIZES = (1_500, 10_000)
+WINDOW = 20
+REPEAT = 5
+
+
+def mean_deviation_rolling_apply(values: np.ndarray, n: int) -> np.ndarray:
+    return (
+        pd.Series(values)
+        .rolling(window=n)
+        .apply(lambda x: np.mean(np.abs(x - x.mean())), raw=True)
+        .to_numpy()
+    )
+
+
+def best_of(fn, *args) -> float:
+    timer = timeit.Timer(lambda: fn(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'bars':>8} {'rolling.apply':>15} {'vectorized':>12} {'speedup':>9}")
+    for size in SIZES:
+        tp = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, size)))
+        expected = mean_deviation_rolling_apply(tp, WINDOW)
+        actual = mean_deviation(tp, WINDOW)
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
+
+        slow = best_of(mean_deviation_rolling_apply, tp, WINDOW)
+        fast = best_of(mean_deviation, tp, WINDOW)
+        print(
+            f"{size:>8} {slow * 1e3:>12.2f} ms {fast * 1e3:>9.3f} ms {slow / fast:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
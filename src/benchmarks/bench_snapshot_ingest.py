@@ -0,0 +1,100 @@
+"""
+收盘快照入库的基准
+在临时目录中构造全市场规模的本地 K 线存储（SYMBOLS 只股票 × 不复权 / 前复权），
+用一份模拟快照执行 SnapshotIngestor.ingest，统计耗时，并校验每个序列都追加了一根 K 线。
+
+运行（在 src 目录下）：
+    python -m benchmarks.bench_snapshot_ingest
+"""
+
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from datacenter.market.calendar import trading_calendar
+from datacenter.market.kline_store import KLINE_COLUMNS, KlineStore
+from datacenter.market.snapshot import SNAPSHOT_ADJUSTS, SnapshotIngestor
+
+SYMBOLS = 5_000
+BARS = 1_250
+
+
+class SnapshotSource:
+    """只提供快照的数据源"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def get_spot_snapshot(self) -> pd.DataFrame:
+        return self.df
+
+
+def build_store(root: str, codes: list[str], last: np.datetime64) -> KlineStore:
+    store = KlineStore(root)
+    rng = np.random.default_rng(0)
+    dates = np.arange(
+        last - np.timedelta64(BARS - 1, "D"), last + np.timedelta64(1, "D")
+    )
+    now = trading_calendar.now()
+    for code in codes:
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, BARS)))
+        columns = {"date": dates, "volume": rng.uniform(1e5, 1e7, BARS)}
+        for col in KLINE_COLUMNS[1:5]:
+            columns[col] = close
+        for adjust in SNAPSHOT_ADJUSTS:
+            store.write(f"stock/{adjust}/sh{code}", columns, now)
+    return store
+
+
+def snapshot(store: KlineStore, codes: list[str]) -> pd.DataFrame:
+    prev = [float(store.read(f"stock/qfq/sh{code}")["close"][-1]) for code in codes]
+    close = np.asarray(prev) * 1.01
+    return pd.DataFrame(
+        {
+            "代码": codes,
+            "最新价": close,
+            "今开": close,
+            "最高": close,
+            "最低": close,
+            "昨收": prev,
+            "成交量": 10_000,
+        }
+    )
+
+
+def main():
+    day = trading_calendar.last_closed_session(trading_calendar.now())
+    previous = np.datetime64(trading_calendar.previous_trading_day(day), "D")
+    codes = [f"{600000 + i}" for i in range(SYMBOLS)]
+
+    root = tempfile.mkdtemp(prefix="bench_snapshot_")
+    try:
+        started = time.perf_counter()
+        store = build_store(root, codes, previous)
+        df = snapshot(store, codes)
+        print(
+            f"构造 {SYMBOLS} × {len(SNAPSHOT_ADJUSTS)} 个序列: {time.perf_counter() - started:.1f}s"
+        )
+
+        ingestor = SnapshotIngestor(SnapshotSource(df), store)
+        ingestor.trade_date = lambda: day
+        started, cpu = time.perf_counter(), time.process_time()
+        stats = ingestor.ingest()
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu
+        assert stats["appended"] == SYMBOLS * len(SNAPSHOT_ADJUSTS), stats
+        sample = store.read(f"stock/qfq/sh{codes[-1]}")
+        assert sample["date"][-1] == np.datetime64(day, "D")
+        assert len(sample["date"]) == BARS + 1
+        print(
+            f"入库 {dict(stats)}: {elapsed:.2f}s（CPU {cpu:.2f}s），"
+            f"每个序列 {elapsed / stats['appended'] * 1e3:.2f} ms"
+        )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ from .loader import (
     load_notification_config,
     load_schedule_config,
     load_llm_config,
+    load_datasource_config,
+    load_screener_config,
+    load_sweep_config,
+    load_event_config,
+    load_monitor_config,
 )
 
 
@@ -11,3 +16,8 @@ STRATEGY_CONFIG = load_strategy_config(STRATEGY_CONFIG_PATH)
 NOTIFICATION_CONFIG = load_notification_config(CONFIG_PATH)
 SCHEDULE_CONFIG = load_schedule_config(CONFIG_PATH)
 LLM_CONFIG = load_llm_config(CONFIG_PATH)
+DATASOURCE_CONFIG = load_datasource_config(CONFIG_PATH)
+SCREENER_CONFIG = load_screener_config(CONFIG_PATH)
+SWEEP_CONFIG = load_sweep_config(CONFIG_PATH)
+EVENT_CONFIG = load_event_config(CONFIG_PATH)
+MONITOR_CONFIG = load_monitor_config(CONFIG_PATH)
@@ -1,10 +1,11 @@
-from typing import Dict, List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
 LOG_PATH = "./logs"
+DATA_PATH = "./data"
 WATCHLIST_PATH = "./conf/watchlist.json"
 INDEX_POOL_PATH = "./conf/index_pool.json"
 STRATEGY_CONFIG_PATH = "./conf/strategy.yaml"
@@ -74,11 +75,29 @@ class NotificationConfig(BaseModel):
 
     channels: Dict[str, NotificationChannelConfig]
 
+    # 带幂等键的消息按 (键, 渠道) 记录发送结果，重跑时不重复推送
+    sent_log_path: str = Field(
+        f"{DATA_PATH}/notifications.db", description="已发送消息记录的 SQLite 文件"
+    )
+    sent_log_days: int = Field(7, ge=1, description="已发送记录保留天数")
+
 
 class ScheduleConfig(BaseModel):
     hour: int = Field(..., ge=0, le=23)
     minute: int = Field(..., ge=0, le=59)
 
+    # 收盘快照入库时间
+    ingest_hour: int = Field(15, ge=0, le=23)
+    ingest_minute: int = Field(30, ge=0, le=59)
+
+    # 公司事件批量入库时间（开盘前）
+    events_hour: int = Field(8, ge=0, le=23)
+    events_minute: int = Field(30, ge=0, le=59)
+
+    # 估值分位索引更新时间（收盘后）
+    valuation_hour: int = Field(16, ge=0, le=23)
+    valuation_minute: int = Field(30, ge=0, le=59)
+
 
 class LLMConfig(BaseModel):
     provider: str
@@ -86,3 +105,114 @@ class LLMConfig(BaseModel):
     reason_model: str
     base_url: str
     api_key: Optional[str] = None
+
+
+class RateLimitConfig(BaseModel):
+    rate: float = Field(..., gt=0, description="每秒补充的令牌数（即稳态请求速率）")
+    burst: int = Field(1, ge=1, description="令牌桶容量，允许的瞬时突发请求数")
+
+
+class DataSourceConfig(BaseModel):
+    backend: Literal["akshare", "replay", "record"] = Field(
+        "akshare",
+        description="akshare 在线；replay 读取本地夹具（缺失时生成模拟数据）；record 在线并录制夹具",
+    )
+    replay_path: str = Field(f"{DATA_PATH}/replay", description="夹具目录")
+    synthetic: bool = Field(True, description="replay 模式下夹具缺失时生成模拟数据")
+
+    max_concurrency: int = Field(8, ge=1, description="并发请求上游的最大数量")
+    rate_limits: Dict[str, RateLimitConfig] = Field(
+        default_factory=dict, description="按 akshare 接口名配置的限流规则"
+    )
+
+
+class ScreenerConfig(BaseModel):
+    chunk_size: int = Field(
+        200, ge=1, description="每批加载并评估的股票数量，决定选股时的内存上限"
+    )
+    setups: List[Literal["breakout", "pullback"]] = Field(
+        default_factory=lambda: ["breakout", "pullback"],
+        description="上升趋势中需要出现的形态，满足其一即入选",
+    )
+    require_timing: bool = Field(False, description="是否同时要求择时信号通过")
+
+
+class EventConfig(BaseModel):
+    db_path: str | None = Field(
+        None, description="事件库 SQLite 文件，为空时为数据后端数据目录下的 events.db"
+    )
+    unlock_days_ahead: int = Field(
+        60, ge=1, description="每日入库时覆盖未来多少天内的限售解禁"
+    )
+    report_periods: int = Field(
+        2, ge=1, description="每日刷新最近几个报告期的披露预约与分红方案"
+    )
+
+
+class MonitorConfig(BaseModel):
+    fetch_workers: int = Field(8, ge=1, description="并发获取 K 线的协程数")
+    evaluate_workers: int = Field(2, ge=1, description="计算信号的线程数")
+    explain_workers: int = Field(4, ge=1, description="并发调用 LLM 生成解读的线程数")
+    notify_workers: int = Field(2, ge=1, description="并发推送通知的线程数")
+    queue_size: int = Field(
+        16, ge=1, description="相邻阶段之间的队列容量，下游跟不上时上游阻塞等待"
+    )
+
+    state_db_path: str | None = Field(
+        None,
+        description="各标的上一次信号结果与运行检查点的 SQLite 文件，为空时为数据后端数据目录下的 monitor.db",
+    )
+    state_fields: List[str] = Field(
+        default_factory=lambda: ["trend", "pullback", "breakout", "timing_ok"],
+        description="信号状态由这些字段组成，任一字段变化才生成解读并推送",
+    )
+    notify_unchanged: bool = Field(
+        False, description="为 True 时状态未变化也照常解读并推送"
+    )
+
+    checkpoint_days: int = Field(
+        3, ge=1, description="运行检查点保留天数，同一天内中断重跑时从检查点继续"
+    )
+
+    workers: int = Field(
+        0,
+        ge=0,
+        description="计算信号的工作进程数，大于 0 时经本地持久化队列分发；0 为在当前进程内计算",
+    )
+    queue_db_path: str | None = Field(
+        None,
+        description="监控任务队列的 SQLite 文件，为空时为数据后端数据目录下的 queue.db",
+    )
+    lease_seconds: int = Field(
+        300, ge=10, description="任务领取后的租约，超时未完成视为工作进程失联，重新分发"
+    )
+    max_attempts: int = Field(3, ge=1, description="单个任务的最大尝试次数")
+    claim_batch: int = Field(8, ge=1, description="工作进程每次领取的任务数")
+
+    intraday_enabled: bool = Field(False, description="是否在交易时段内定时盘中监控")
+    intraday_interval: int = Field(5, ge=1, le=60, description="盘中监控间隔（分钟）")
+    intraday_latency_budget: float = Field(
+        10.0,
+        gt=0,
+        description="单次盘中检查从拉取快照到推送的耗时上限（秒），超出时告警",
+    )
+
+
+class SweepConfig(BaseModel):
+    grid: Dict[str, List[Any]] = Field(
+        default_factory=dict,
+        description="参数网格：键为 StrategyConfig 的字段路径（如 trend.moving_averages.short），值为候选取值",
+    )
+    processes: Optional[int] = Field(
+        None, ge=1, description="并行进程数，默认为 CPU 核数"
+    )
+    signal: Literal["uptrend", "pullback", "breakout", "timing_ok", "entry"] = Field(
+        "entry", description="用于评价参数组合的回测信号"
+    )
+    horizon: int = Field(10, ge=1, description="评价使用的持有期（K 线根数）")
+    metric: Literal["mean_return", "hit_rate"] = Field(
+        "mean_return", description="排序指标：平均收益或命中率"
+    )
+    min_count: int = Field(
+        30, ge=0, description="信号出现次数少于该值的组合不参与排序，避免小样本偏差"
+    )
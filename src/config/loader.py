@@ -1,7 +1,16 @@
 import yaml
 from pathlib import Path
 from .strategy import StrategyConfig
-from .config import NotificationConfig, ScheduleConfig, LLMConfig
+from .config import (
+    NotificationConfig,
+    ScheduleConfig,
+    LLMConfig,
+    DataSourceConfig,
+    ScreenerConfig,
+    SweepConfig,
+    EventConfig,
+    MonitorConfig,
+)
 import os
 import re
 
@@ -72,3 +81,38 @@ def load_llm_config(path: str | Path) -> LLMConfig:
     # 注入环境变量
     raw = inject_env_vars(raw)
     return LLMConfig.model_validate(raw["llm"])
+
+
+def load_datasource_config(path: str | Path) -> DataSourceConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    return DataSourceConfig.model_validate(raw.get("datasource") or {})
+
+
+def load_screener_config(path: str | Path) -> ScreenerConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    return ScreenerConfig.model_validate(raw.get("screener") or {})
+
+
+def load_event_config(path: str | Path) -> EventConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    return EventConfig.model_validate(raw.get("events") or {})
+
+
+def load_monitor_config(path: str | Path) -> MonitorConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    return MonitorConfig.model_validate(raw.get("monitor") or {})
+
+
+def load_sweep_config(path: str | Path) -> SweepConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    return SweepConfig.model_validate(raw.get("sweep") or {})
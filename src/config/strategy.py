@@ -2,7 +2,7 @@
 # 监控与策略参数配置
 # ======================
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Literal
 # =====================
 # 趋势相关配置
 # =====================
@@ -28,6 +28,9 @@ class TrendConfig(BaseModel):
     趋势识别与结构信号相关配置
     """
 
+    period: Literal["daily", "weekly", "monthly"] = Field(
+        "daily", description="趋势判断（结构信号）使用的 K 线周期，择时信号始终使用日线"
+    )
     moving_averages: MovingAverageConfig
     pullback: PullbackConfig
     breakout: BreakoutConfig
@@ -53,6 +56,29 @@ class RangeIndicatorConfig(BaseModel):
     max: float = Field(..., description="指标上限")
 
 
+# =====================
+# 估值分位配置
+# =====================
+
+
+class ValueConfig(BaseModel):
+    enabled: bool = Field(True, description="是否在信号结果中附带估值分位")
+    history_years: int = Field(5, ge=1, description="历史分位的回看年数")
+    low: float = Field(20, description="分位数（0~100）不高于该值视为估值偏低")
+    high: float = Field(80, description="分位数（0~100）不低于该值视为估值偏高")
+
+
+# =====================
+# 公司事件配置
+# =====================
+
+
+class EventSignalConfig(BaseModel):
+    enabled: bool = Field(True, description="是否在信号结果中附带公司事件")
+    lookback_days: int = Field(5, ge=0, description="展示最近多少天内已发生的事件")
+    lookahead_days: int = Field(10, ge=0, description="展示未来多少天内将发生的事件")
+
+
 # =====================
 # 策略元信息（可选，但强烈建议保留）
 # =====================
@@ -80,4 +106,6 @@ class StrategyConfig(BaseModel):
     volume: VolumeConfig
     rsi: RangeIndicatorConfig
     cci: RangeIndicatorConfig
+    value: ValueConfig = Field(default_factory=ValueConfig)
+    event: EventSignalConfig = Field(default_factory=EventSignalConfig)
     risk_disclaimer: List[str]
@@ -0,0 +1,46 @@
+import os
+
+from config import DATA_PATH, DATASOURCE_CONFIG, DataSourceConfig
+
+from .base import MarketDataBackend
+
+
+def backend_name(config: DataSourceConfig) -> str:
+    """实际使用的后端，环境变量 INVESTAI_DATA_BACKEND 可覆盖配置"""
+    return os.getenv("INVESTAI_DATA_BACKEND", config.backend)
+
+
+def data_root(config: DataSourceConfig) -> str:
+    """
+    后端对应的本地数据目录（交易日历、K 线、估值、事件库、监控状态等）
+    回放后端的数据（含按工作日近似、没有节假日的模拟交易日历）放在 replay_path/cache 下，
+    不写入在线数据共用的 DATA_PATH；录制模式访问的是在线数据，与 akshare 共用。
+    """
+    if backend_name(config) == "replay":
+        return os.path.join(config.replay_path, "cache")
+    return DATA_PATH
+
+
+def create_backend(config: DataSourceConfig) -> MarketDataBackend:
+    """按配置创建数据后端，环境变量 INVESTAI_DATA_BACKEND 可覆盖配置"""
+    backend = backend_name(config)
+
+    if backend == "replay":
+        from .replay import ReplayBackend
+
+        return ReplayBackend(config.replay_path, synthetic=config.synthetic)
+
+    from .akshare_backend import AkshareBackend
+
+    if backend == "record":
+        from .replay import RecordingBackend
+
+        return RecordingBackend(AkshareBackend(), config.replay_path)
+
+    if backend != "akshare":
+        raise ValueError(f"Unsupported data backend: {backend}")
+    return AkshareBackend()
+
+
+default_backend = create_backend(DATASOURCE_CONFIG)
+DATA_ROOT = data_root(DATASOURCE_CONFIG)
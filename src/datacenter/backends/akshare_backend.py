@@ -0,0 +1,59 @@
+import akshare as ak
+import pandas as pd
+
+from datacenter.ratelimit import rate_limiter
+
+from .base import MarketDataBackend
+
+
+class AkshareBackend(MarketDataBackend):
+    """基于 AkShare 的在线数据后端，所有请求经过按接口配置的限流"""
+
+    def stock_daily(self, symbol: str, start_date: str, adjust: str) -> pd.DataFrame:
+        return rate_limiter.call(
+            ak.stock_zh_a_daily, symbol=symbol, start_date=start_date, adjust=adjust
+        )
+
+    def index_daily(self, symbol: str, start_date: str) -> pd.DataFrame:
+        return rate_limiter.call(
+            ak.stock_zh_index_daily_em,
+            symbol=symbol,
+            start_date=start_date,
+            end_date="20500101",
+        )
+
+    def company_profile(self, symbol: str) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_individual_info_em, symbol=symbol)
+
+    def pe_pb(self, symbol: str) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_value_em, symbol=symbol)
+
+    def financial_indicators(self, symbol: str, start_year: str) -> pd.DataFrame:
+        return rate_limiter.call(
+            ak.stock_financial_analysis_indicator, symbol=symbol, start_year=start_year
+        )
+
+    def a_share_list(self) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_info_a_code_name)
+
+    def spot_snapshot(self) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_zh_a_spot_em)
+
+    def trade_dates(self) -> pd.DataFrame:
+        return rate_limiter.call(ak.tool_trade_date_hist_sina)
+
+    def earnings_calendar(self, period: str) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_yysj_em, symbol="沪深A股", date=period)
+
+    def dividends(self, period: str) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_fhps_em, date=period)
+
+    def suspensions(self, date: str) -> pd.DataFrame:
+        return rate_limiter.call(ak.stock_tfp_em, date=date)
+
+    def share_unlocks(self, start_date: str, end_date: str) -> pd.DataFrame:
+        return rate_limiter.call(
+            ak.stock_restricted_release_detail_em,
+            start_date=start_date,
+            end_date=end_date,
+        )
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+
+class MarketDataBackend(ABC):
+    """
+    行情 / 基本面原始数据后端
+    数据源（StockDataSource / IndexDataSource / TradingCalendar）只通过该接口访问上游，
+    返回值的列名与 akshare 对应接口保持一致。
+    """
+
+    @abstractmethod
+    def stock_daily(self, symbol: str, start_date: str, adjust: str) -> pd.DataFrame:
+        """股票日线：date, open, high, low, close, volume"""
+
+    @abstractmethod
+    def index_daily(self, symbol: str, start_date: str) -> pd.DataFrame:
+        """指数日线：date, open, high, low, close, volume"""
+
+    @abstractmethod
+    def company_profile(self, symbol: str) -> pd.DataFrame:
+        """个股资料：item, value"""
+
+    @abstractmethod
+    def pe_pb(self, symbol: str) -> pd.DataFrame:
+        """估值历史：数据日期, PE(TTM), 市净率 等"""
+
+    @abstractmethod
+    def financial_indicators(self, symbol: str, start_year: str) -> pd.DataFrame:
+        """财务指标：日期及各项指标"""
+
+    @abstractmethod
+    def a_share_list(self) -> pd.DataFrame:
+        """A 股列表：code, name"""
+
+    @abstractmethod
+    def spot_snapshot(self) -> pd.DataFrame:
+        """全市场行情快照：代码, 名称, 最新价, 今开, 最高, 最低, 昨收, 成交量(手)"""
+
+    @abstractmethod
+    def trade_dates(self) -> pd.DataFrame:
+        """交易日历：trade_date"""
+
+    # =====================
+    # 公司事件（全市场批量）
+    # =====================
+
+    @abstractmethod
+    def earnings_calendar(self, period: str) -> pd.DataFrame:
+        """定期报告预约披露时间：股票代码, 股票简称, 首次预约时间, 一次/二次/三次变更日期, 实际披露时间"""
+
+    @abstractmethod
+    def dividends(self, period: str) -> pd.DataFrame:
+        """分红送配：代码, 名称, 送转股份-送转总比例, 现金分红-现金分红比例, 股权登记日, 除权除息日, 方案进度"""
+
+    @abstractmethod
+    def suspensions(self, date: str) -> pd.DataFrame:
+        """停复牌：代码, 名称, 停牌时间, 停牌截止时间, 停牌期限, 停牌原因, 预计复牌时间"""
+
+    @abstractmethod
+    def share_unlocks(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """限售解禁明细：股票代码, 股票简称, 解禁时间, 限售股类型, 解禁数量, 实际解禁市值, 占解禁前流通市值比例"""
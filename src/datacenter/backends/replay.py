@@ -0,0 +1,344 @@
+import os
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from log import logger
+
+from .base import MarketDataBackend
+
+SYNTHETIC_START = "2020-01-01"
+SYNTHETIC_INDUSTRIES = (
+    "银行",
+    "酿酒行业",
+    "半导体",
+    "电力行业",
+    "医疗器械",
+    "汽车整车",
+)
+
+
+class ReplayBackend(MarketDataBackend):
+    """
+    离线回放后端，不访问网络
+    优先读取 root 下录制的 CSV 夹具：
+        stock/{adjust}/{symbol}.csv   index/{symbol}.csv
+        profile/{symbol}.csv          pe_pb/{symbol}.csv
+        financials/{symbol}.csv       a_shares.csv
+        spot.csv                      trade_dates.csv
+        events/earnings/{period}.csv  events/dividends/{period}.csv
+        events/suspensions/{date}.csv events/unlocks/{start}_{end}.csv
+    夹具缺失且开启 synthetic 时，按标的代码生成确定性的模拟数据，
+    便于在无网络环境下运行引擎、MCP 服务与性能测试。
+    """
+
+    def __init__(self, root: str, synthetic: bool = True, universe: int = 300):
+        self.root = root
+        self.synthetic = synthetic
+        self.universe = universe
+        self._dates: tuple[date, pd.DatetimeIndex] | None = None
+
+    def _read(self, *parts: str) -> pd.DataFrame | None:
+        path = os.path.join(self.root, *parts)
+        if not os.path.exists(path):
+            return None
+        return pd.read_csv(path, dtype={"code": str, "代码": str, "股票代码": str})
+
+    @staticmethod
+    def _rng(*keys: str) -> np.random.Generator:
+        return np.random.default_rng(zlib.crc32("/".join(keys).encode()))
+
+    @staticmethod
+    def _since(df: pd.DataFrame, col: str, start_date: str) -> pd.DataFrame:
+        mask = pd.to_datetime(df[col]) >= pd.Timestamp(start_date)
+        return df[mask].reset_index(drop=True)
+
+    # =====================
+    # 模拟数据
+    # =====================
+
+    def _synthetic_dates(self) -> pd.DatetimeIndex:
+        # 生成日期序列的开销远大于生成价格，按天缓存（快照需要为每只股票生成一次）
+        today = date.today()
+        if self._dates is None or self._dates[0] != today:
+            self._dates = (today, pd.bdate_range(SYNTHETIC_START, today))
+        return self._dates[1]
+
+    def _synthetic_kline(self, symbol: str) -> pd.DataFrame:
+        dates = self._synthetic_dates()
+        rng = self._rng("kline", symbol)
+        n = len(dates)
+        close = rng.uniform(5, 100) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+        open_ = close * (1 + rng.normal(0, 0.005, n))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n))
+        volume = rng.lognormal(13, 0.5, n).round()
+        return pd.DataFrame(
+            {
+                "date": dates.date,
+                "open": open_.round(2),
+                "high": high.round(2),
+                "low": low.round(2),
+                "close": close.round(2),
+                "volume": volume,
+            }
+        )
+
+    # =====================
+    # 接口实现
+    # =====================
+
+    def stock_daily(self, symbol: str, start_date: str, adjust: str) -> pd.DataFrame:
+        df = self._read("stock", adjust or "none", f"{symbol}.csv")
+        if df is None:
+            if not self.synthetic:
+                return pd.DataFrame()
+            df = self._synthetic_kline(symbol)
+        return self._since(df, "date", start_date)
+
+    def index_daily(self, symbol: str, start_date: str) -> pd.DataFrame:
+        df = self._read("index", f"{symbol}.csv")
+        if df is None:
+            if not self.synthetic:
+                return pd.DataFrame()
+            df = self._synthetic_kline(symbol)
+        return self._since(df, "date", start_date)
+
+    def company_profile(self, symbol: str) -> pd.DataFrame:
+        df = self._read("profile", f"{symbol}.csv")
+        if df is not None or not self.synthetic:
+            return df if df is not None else pd.DataFrame()
+        industry = SYNTHETIC_INDUSTRIES[
+            zlib.crc32(symbol.encode()) % len(SYNTHETIC_INDUSTRIES)
+        ]
+        return pd.DataFrame(
+            {
+                "item": ["股票代码", "股票简称", "行业"],
+                "value": [symbol, f"模拟{symbol}", industry],
+            }
+        )
+
+    def pe_pb(self, symbol: str) -> pd.DataFrame:
+        df = self._read("pe_pb", f"{symbol}.csv")
+        if df is not None or not self.synthetic:
+            return df if df is not None else pd.DataFrame()
+        dates = self._synthetic_dates()
+        rng = self._rng("pe_pb", symbol)
+        n = len(dates)
+        pe = rng.uniform(8, 60) * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        pb = rng.uniform(0.8, 8) * np.exp(np.cumsum(rng.normal(0, 0.012, n)))
+        return pd.DataFrame({"数据日期": dates.date, "PE(TTM)": pe, "市净率": pb})
+
+    def financial_indicators(self, symbol: str, start_year: str) -> pd.DataFrame:
+        df = self._read("financials", f"{symbol}.csv")
+        return df if df is not None else pd.DataFrame()
+
+    def a_share_list(self) -> pd.DataFrame:
+        df = self._read("a_shares.csv")
+        if df is not None or not self.synthetic:
+            return df if df is not None else pd.DataFrame()
+        codes = [f"{600000 + i:06d}" for i in range(self.universe)]
+        return pd.DataFrame({"code": codes, "name": [f"模拟{c}" for c in codes]})
+
+    def spot_snapshot(self) -> pd.DataFrame:
+        df = self._read("spot.csv")
+        if df is not None or not self.synthetic:
+            return df if df is not None else pd.DataFrame()
+
+        rows = []
+        for code in self.a_share_list()["code"]:
+            prefix = "sh" if code.startswith("6") else "sz"
+            kline = self._synthetic_kline(f"{prefix}{code}")
+            last, prev = kline.iloc[-1], kline.iloc[-2]
+            rows.append(
+                {
+                    "代码": code,
+                    "名称": f"模拟{code}",
+                    "最新价": last["close"],
+                    "今开": last["open"],
+                    "最高": last["high"],
+                    "最低": last["low"],
+                    "昨收": prev["close"],
+                    "成交量": last["volume"] / 100,
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def trade_dates(self) -> pd.DataFrame:
+        df = self._read("trade_dates.csv")
+        if df is not None:
+            return df
+        # 覆盖到年底，与新浪交易日历包含当年未来交易日的行为一致
+        dates = pd.bdate_range(SYNTHETIC_START, f"{date.today().year}-12-31")
+        return pd.DataFrame({"trade_date": dates.date})
+
+    # =====================
+    # 公司事件
+    # =====================
+
+    def _event_fixture(self, *parts: str) -> pd.DataFrame | None:
+        df = self._read("events", *parts)
+        if df is not None or not self.synthetic:
+            return df if df is not None else pd.DataFrame()
+        return None
+
+    def _codes(self) -> np.ndarray:
+        return self.a_share_list()["code"].to_numpy()
+
+    def earnings_calendar(self, period: str) -> pd.DataFrame:
+        df = self._event_fixture("earnings", f"{period}.csv")
+        if df is not None:
+            return df
+        codes = self._codes()
+        rng = self._rng("earnings", period)
+        planned = pd.Timestamp(period) + pd.to_timedelta(
+            rng.integers(20, 110, len(codes)), unit="D"
+        )
+        actual = planned.where(planned <= pd.Timestamp(date.today()))
+        return pd.DataFrame(
+            {
+                "股票代码": codes,
+                "股票简称": [f"模拟{c}" for c in codes],
+                "首次预约时间": planned.date,
+                "实际披露时间": actual.date,
+            }
+        )
+
+    def dividends(self, period: str) -> pd.DataFrame:
+        df = self._event_fixture("dividends", f"{period}.csv")
+        if df is not None:
+            return df
+        codes = self._codes()
+        rng = self._rng("dividends", period)
+        payers = codes[rng.random(len(codes)) < 0.4]
+        ex_date = pd.Timestamp(period) + pd.to_timedelta(
+            rng.integers(120, 200, len(payers)), unit="D"
+        )
+        return pd.DataFrame(
+            {
+                "代码": payers,
+                "名称": [f"模拟{c}" for c in payers],
+                "现金分红-现金分红比例": rng.uniform(0.5, 20, len(payers)).round(2),
+                "股权登记日": (ex_date - pd.Timedelta(days=1)).date,
+                "除权除息日": ex_date.date,
+                "方案进度": "实施分配",
+            }
+        )
+
+    def suspensions(self, date: str) -> pd.DataFrame:
+        df = self._event_fixture("suspensions", f"{date}.csv")
+        if df is not None:
+            return df
+        codes = self._codes()
+        rng = self._rng("suspensions", date)
+        suspended = codes[rng.random(len(codes)) < 0.01]
+        return pd.DataFrame(
+            {
+                "代码": suspended,
+                "名称": [f"模拟{c}" for c in suspended],
+                "停牌时间": pd.Timestamp(date).date(),
+                "停牌期限": "停牌一天",
+                "停牌原因": "重要事项未公告",
+            }
+        )
+
+    def share_unlocks(self, start_date: str, end_date: str) -> pd.DataFrame:
+        df = self._event_fixture("unlocks", f"{start_date}_{end_date}.csv")
+        if df is not None:
+            return df
+        rows = []
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        for code in self._codes():
+            rng = self._rng("unlocks", code)
+            # 每只股票每半年至多一次解禁，各股票的解禁日错开
+            first = pd.Timestamp(SYNTHETIC_START) + pd.Timedelta(
+                days=int(rng.integers(0, 182))
+            )
+            for day in pd.date_range(first, end, freq="182D"):
+                if rng.random() < 0.3 and start <= day <= end:
+                    rows.append(
+                        {
+                            "股票代码": code,
+                            "股票简称": f"模拟{code}",
+                            "解禁时间": day.date(),
+                            "限售股类型": "首发原股东限售股份",
+                            "实际解禁市值": round(rng.uniform(1e7, 1e10)),
+                            "占解禁前流通市值比例": round(rng.uniform(0.001, 0.3), 4),
+                        }
+                    )
+        return pd.DataFrame(rows)
+
+
+class RecordingBackend(MarketDataBackend):
+    """
+    录制后端：透传到真实后端，并把结果按 ReplayBackend 的目录结构写成 CSV 夹具
+    K 线按日期合并写入，增量请求不会覆盖已录制的历史。
+    """
+
+    def __init__(self, inner: MarketDataBackend, root: str):
+        self.inner = inner
+        self.root = root
+
+    def _write(self, df: pd.DataFrame, *parts: str, merge_on: str | None = None):
+        if df is None or df.empty:
+            return df
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        out = df
+        if merge_on and os.path.exists(path):
+            out = pd.concat([pd.read_csv(path), df.astype({merge_on: str})])
+            out = out.drop_duplicates(subset=merge_on, keep="last").sort_values(
+                merge_on
+            )
+        out.to_csv(path, index=False)
+        logger.debug(f"录制夹具 {path}")
+        return df
+
+    def stock_daily(self, symbol: str, start_date: str, adjust: str) -> pd.DataFrame:
+        df = self.inner.stock_daily(symbol, start_date, adjust)
+        return self._write(
+            df, "stock", adjust or "none", f"{symbol}.csv", merge_on="date"
+        )
+
+    def index_daily(self, symbol: str, start_date: str) -> pd.DataFrame:
+        df = self.inner.index_daily(symbol, start_date)
+        return self._write(df, "index", f"{symbol}.csv", merge_on="date")
+
+    def company_profile(self, symbol: str) -> pd.DataFrame:
+        return self._write(
+            self.inner.company_profile(symbol), "profile", f"{symbol}.csv"
+        )
+
+    def pe_pb(self, symbol: str) -> pd.DataFrame:
+        return self._write(self.inner.pe_pb(symbol), "pe_pb", f"{symbol}.csv")
+
+    def financial_indicators(self, symbol: str, start_year: str) -> pd.DataFrame:
+        df = self.inner.financial_indicators(symbol, start_year)
+        return self._write(df, "financials", f"{symbol}.csv")
+
+    def a_share_list(self) -> pd.DataFrame:
+        return self._write(self.inner.a_share_list(), "a_shares.csv")
+
+    def spot_snapshot(self) -> pd.DataFrame:
+        return self._write(self.inner.spot_snapshot(), "spot.csv")
+
+    def trade_dates(self) -> pd.DataFrame:
+        return self._write(self.inner.trade_dates(), "trade_dates.csv")
+
+    def earnings_calendar(self, period: str) -> pd.DataFrame:
+        df = self.inner.earnings_calendar(period)
+        return self._write(df, "events", "earnings", f"{period}.csv")
+
+    def dividends(self, period: str) -> pd.DataFrame:
+        df = self.inner.dividends(period)
+        return self._write(df, "events", "dividends", f"{period}.csv")
+
+    def suspensions(self, date: str) -> pd.DataFrame:
+        df = self.inner.suspensions(date)
+        return self._write(df, "events", "suspensions", f"{date}.csv")
+
+    def share_unlocks(self, start_date: str, end_date: str) -> pd.DataFrame:
+        df = self.inner.share_unlocks(start_date, end_date)
+        return self._write(df, "events", "unlocks", f"{start_date}_{end_date}.csv")
@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+
+from datacenter.market.calendar import MARKET_TZ, trading_calendar
+from datacenter.singleflight import SingleFlight
+
+# 根据写入时间计算过期时间
+ExpirePolicy = Callable[[datetime], datetime]
+
+
+# =====================
+# 过期策略
+# =====================
+
+
+def expire_at_next_close(now: datetime) -> datetime:
+    """日频数据（如 PE/PB）：下一次收盘后失效"""
+    return trading_calendar.next_close(now)
+
+
+def expire_after(delta: timedelta) -> ExpirePolicy:
+    """固定有效期，用于很少变化的数据（如公司资料）"""
+
+    def policy(now: datetime) -> datetime:
+        return now + delta
+
+    return policy
+
+
+# 定期报告披露窗口：年报 / 一季报 1-4 月，半年报 7-8 月，三季报 10 月
+REPORT_SEASONS = ((1, 1, 4, 30), (7, 1, 8, 31), (10, 1, 10, 31))
+
+
+def expire_at_next_report_season(now: datetime) -> datetime:
+    """
+    财务数据：披露窗口内每日收盘后失效（报告陆续发布），
+    窗口外一直有效到下一个披露窗口开始
+    """
+    today = now.date()
+    for start_month, start_day, end_month, end_day in REPORT_SEASONS:
+        if (
+            date(today.year, start_month, start_day)
+            <= today
+            <= date(today.year, end_month, end_day)
+        ):
+            return trading_calendar.next_close(now)
+
+    for start_month, start_day, _, _ in REPORT_SEASONS:
+        start = date(today.year, start_month, start_day)
+        if start > today:
+            break
+    else:
+        start = date(today.year + 1, 1, 1)
+    return datetime.combine(start, datetime.min.time(), MARKET_TZ)
+
+
+# =====================
+# 缓存
+# =====================
+
+
+class TTLCache:
+    """
+    线程安全的 LRU 缓存，每个条目带独立的过期时间
+    按命名空间（通常是被缓存的方法名）统计命中 / 未命中次数
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[datetime, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    def get(
+        self, namespace: str, key: Hashable, count: bool = True
+    ) -> tuple[bool, Any]:
+        now = trading_calendar.now()
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end((namespace, key))
+                if count:
+                    self._hits[namespace] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[(namespace, key)]
+            if count:
+                self._misses[namespace] += 1
+            return False, None
+
+    def set(self, namespace: str, key: Hashable, value: Any, expires_at: datetime):
+        with self._lock:
+            self._data[(namespace, key)] = (expires_at, value)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "namespaces": {
+                    namespace: {
+                        "hits": self._hits[namespace],
+                        "misses": self._misses[namespace],
+                    }
+                    for namespace in sorted(set(self._hits) | set(self._misses))
+                },
+            }
+
+
+def _is_empty(value: Any) -> bool:
+    """数据源在失败时返回 None / {} / 空 DataFrame，这些结果不缓存"""
+    if value is None:
+        return True
+    if isinstance(value, pd.DataFrame):
+        return value.empty
+    if isinstance(value, dict):
+        return not value
+    return False
+
+
+def cached(cache: TTLCache, expires: ExpirePolicy):
+    """
+    方法缓存装饰器，以 (方法名, 参数) 为键
+    未命中时并发的相同调用会被合并为一次上游请求
+    注意：返回的对象在多次调用间共享，调用方不应原地修改
+    """
+
+    def decorator(func):
+        namespace = func.__name__
+        flight = SingleFlight()
+
+        def load(self, key, args, kwargs):
+            # 等待期间其他调用方可能已写入缓存
+            hit, value = cache.get(namespace, key, count=False)
+            if hit:
+                return value
+            value = func(self, *args, **kwargs)
+            if not _is_empty(value):
+                cache.set(namespace, key, value, expires(trading_calendar.now()))
+            return value
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(namespace, key)
+            if hit:
+                return value
+            return flight.do(key, load, self, key, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+data_cache = TTLCache()
@@ -0,0 +1,267 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from config import EVENT_CONFIG, EventConfig
+from datacenter.backends import MarketDataBackend, default_backend
+from datacenter.market.calendar import trading_calendar
+from log import logger
+from utils.stock import get_fullcodes
+
+from .store import DIVIDEND, EARNINGS, SUSPENSION, UNLOCK, EventStore, event_store
+
+REPORT_NAMES = {3: "一季报", 6: "半年报", 9: "三季报", 12: "年报"}
+
+
+def report_periods(day: date, n: int) -> List[str]:
+    """day 当天及之前最近的 n 个报告期（季末），如 ['20250930', '20250630']"""
+    periods = []
+    year, month = day.year, (day.month - 1) // 3 * 3
+    for _ in range(n):
+        if month == 0:
+            year, month = year - 1, 12
+        end = pd.Timestamp(year, month, 1) + pd.offsets.MonthEnd(0)
+        periods.append(end.strftime("%Y%m%d"))
+        month -= 3
+    return periods
+
+
+def unlock_months(start: date, end: date) -> List[Tuple[str, date, date]]:
+    """[start, end] 覆盖的自然月：(YYYYMM, 月初, 月末)"""
+    months = []
+    for first in pd.date_range(start.replace(day=1), end, freq="MS"):
+        last = first + pd.offsets.MonthEnd(0)
+        months.append((first.strftime("%Y%m"), first.date(), last.date()))
+    return months
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, errors="coerce")
+
+
+def _number(value) -> float | None:
+    value = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(value) else float(value)
+
+
+def earnings_events(df: pd.DataFrame, period: str) -> List[Dict]:
+    """披露预约 -> 事件：已披露取实际披露日，否则取最近一次变更后的预约日"""
+    if df is None or df.empty:
+        return []
+    planned = _dates(df["首次预约时间"])
+    for col in ("一次变更日期", "二次变更日期", "三次变更日期"):
+        if col in df:
+            planned = _dates(df[col]).fillna(planned)
+    actual = (
+        _dates(df["实际披露时间"])
+        if "实际披露时间" in df
+        else pd.Series(pd.NaT, index=df.index)
+    )
+    day = actual.fillna(planned)
+    name = f"{period[:4]}{REPORT_NAMES[int(period[4:6])]}"
+
+    events = []
+    for symbol, when, disclosed in zip(
+        get_fullcodes(df["股票代码"]), day, actual.notna()
+    ):
+        if pd.isna(when):
+            continue
+        events.append(
+            {
+                "symbol": symbol,
+                "date": when.date(),
+                "type": EARNINGS,
+                "title": f"{name}{'已披露' if disclosed else '预约披露'}",
+                "detail": {"period": period, "disclosed": bool(disclosed)},
+            }
+        )
+    return events
+
+
+def dividend_events(df: pd.DataFrame, period: str) -> List[Dict]:
+    """分红送转方案 -> 除权除息事件，尚未确定除权除息日的方案不入库"""
+    if df is None or df.empty:
+        return []
+    events = []
+    ex_dates, record_dates = _dates(df["除权除息日"]), _dates(df["股权登记日"])
+    for symbol, ex_date, record_date, (_, row) in zip(
+        get_fullcodes(df["代码"]), ex_dates, record_dates, df.iterrows()
+    ):
+        if pd.isna(ex_date):
+            continue
+        cash = _number(row.get("现金分红-现金分红比例"))
+        bonus = _number(row.get("送转股份-送转总比例"))
+        plan = []
+        if bonus:
+            plan.append(f"10送转{bonus:g}")
+        if cash:
+            plan.append(f"10派{cash:g}元")
+        events.append(
+            {
+                "symbol": symbol,
+                "date": ex_date.date(),
+                "type": DIVIDEND,
+                "title": f"除权除息：{'，'.join(plan) or '分红送转'}",
+                "detail": {
+                    "period": period,
+                    "cash_per_10": cash,
+                    "bonus_per_10": bonus,
+                    "record_date": None
+                    if pd.isna(record_date)
+                    else record_date.date().isoformat(),
+                    "progress": row.get("方案进度"),
+                },
+            }
+        )
+    return events
+
+
+def suspension_events(df: pd.DataFrame, day: date) -> List[Dict]:
+    """当日停牌名单 -> 停牌事件（日期为查询日，连续停牌每天各一条）"""
+    if df is None or df.empty:
+        return []
+    events = []
+    for symbol, (_, row) in zip(get_fullcodes(df["代码"]), df.iterrows()):
+        reason = row.get("停牌原因")
+        reason = None if pd.isna(reason) else str(reason)
+        resume = _dates(pd.Series([row.get("预计复牌时间")])).iloc[0]
+        events.append(
+            {
+                "symbol": symbol,
+                "date": day,
+                "type": SUSPENSION,
+                "title": f"停牌：{reason}" if reason else "停牌",
+                "detail": {
+                    "term": None
+                    if pd.isna(row.get("停牌期限"))
+                    else str(row.get("停牌期限")),
+                    "resume": None if pd.isna(resume) else resume.date().isoformat(),
+                },
+            }
+        )
+    return events
+
+
+def unlock_events(df: pd.DataFrame) -> List[Dict]:
+    """限售解禁明细 -> 解禁事件，同一天的多类限售股合并为一条"""
+    if df is None or df.empty:
+        return []
+    df = pd.DataFrame(
+        {
+            "symbol": get_fullcodes(df["股票代码"]),
+            "date": _dates(df["解禁时间"]),
+            "kind": df["限售股类型"].astype(str),
+            "value": pd.to_numeric(df["实际解禁市值"], errors="coerce"),
+            "ratio": pd.to_numeric(df["占解禁前流通市值比例"], errors="coerce"),
+        }
+    ).dropna(subset=["date"])
+    grouped = df.groupby(["symbol", "date"], sort=False).agg(
+        kind=("kind", lambda kinds: "、".join(dict.fromkeys(kinds))),
+        value=("value", "sum"),
+        ratio=("ratio", "sum"),
+    )
+    return [
+        {
+            "symbol": symbol,
+            "date": when.date(),
+            "type": UNLOCK,
+            "title": f"限售解禁：{row.kind}，占流通市值 {row.ratio:.1%}",
+            "detail": {
+                "kind": row.kind,
+                "market_value": _number(row.value),
+                "float_ratio": _number(row.ratio),
+            },
+        }
+        for (symbol, when), row in grouped.iterrows()
+    ]
+
+
+class EventIngestor:
+    """
+    公司事件每日批量入库
+    每类事件都是一次全市场请求（按日期或报告期），不在监控运行中逐只股票查询：
+        停牌       当日停牌名单
+        限售解禁   未来 unlock_days_ahead 天覆盖的各自然月的解禁明细（按月分批，已过去的月份保留）
+        披露预约   最近 report_periods 个报告期
+        分红送转   最近 report_periods 个报告期
+    每个批次以完整结果整体替换旧记录，当天已入库的批次不重复请求。
+    """
+
+    def __init__(
+        self,
+        config: EventConfig = EVENT_CONFIG,
+        backend: MarketDataBackend = default_backend,
+        store: EventStore = event_store,
+    ):
+        self.config = config
+        self.backend = backend
+        self.store = store
+
+    def _run(
+        self,
+        batch: str,
+        day: date,
+        fetch: Callable[[], List[Dict]],
+        force: bool,
+    ) -> int | None:
+        """拉取并替换一个批次，返回入库条数；当天已入库时返回 None"""
+        if not force and self.store.ingested(batch, day.isoformat()):
+            return None
+        events = fetch()
+        rows = self.store.replace(events, batch)
+        self.store.mark_ingested(batch, day.isoformat(), rows)
+        return rows
+
+    def ingest(self, day: date | None = None, force: bool = False) -> Counter:
+        """
+        :param day: 入库日期，默认为当天
+        :param force: 忽略当天已入库的记录，重新拉取
+        :return: 各批次入库的事件条数
+        """
+        day = day or trading_calendar.now().date()
+        until = day + timedelta(days=self.config.unlock_days_ahead)
+        compact = day.strftime("%Y%m%d")
+
+        jobs = {
+            f"{SUSPENSION}:{compact}": lambda: suspension_events(
+                self.backend.suspensions(compact), day
+            ),
+        }
+        # 解禁按自然月分批，每批整月拉取：批次之间没有重叠，按批次替换即可
+        for month, first, last in unlock_months(day, until):
+            jobs[f"{UNLOCK}:{month}"] = lambda f=first, t=last: unlock_events(
+                self.backend.share_unlocks(f.strftime("%Y%m%d"), t.strftime("%Y%m%d"))
+            )
+        for period in report_periods(day, self.config.report_periods):
+            jobs[f"{EARNINGS}:{period}"] = lambda p=period: earnings_events(
+                self.backend.earnings_calendar(p), p
+            )
+            jobs[f"{DIVIDEND}:{period}"] = lambda p=period: dividend_events(
+                self.backend.dividends(p), p
+            )
+
+        stats = Counter()
+        for batch, fetch in jobs.items():
+            try:
+                rows = self._run(batch, day, fetch, force)
+            except Exception as e:
+                # 单个批次失败不影响其余批次，本地保留上一次的结果
+                logger.exception(f"公司事件入库失败 {batch}: {e}")
+                stats["failed"] += 1
+                continue
+            if rows is None:
+                stats["skipped"] += 1
+            else:
+                stats[batch] = rows
+
+        logger.info(f"公司事件入库完成: {dict(stats)}")
+        return stats
+
+
+event_ingestor = EventIngestor()
+
+
+if __name__ == "__main__":
+    event_ingestor.ingest(force=True)
@@ -0,0 +1,174 @@
+import os
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Sequence
+
+import orjson
+
+from config import EVENT_CONFIG
+from datacenter.backends import DATA_ROOT
+from utils.sqlite import open_database
+
+# 事件类型
+EARNINGS = "earnings"  # 定期报告披露
+DIVIDEND = "dividend"  # 分红送转除权除息
+SUSPENSION = "suspension"  # 停牌
+UNLOCK = "unlock"  # 限售股解禁
+EVENT_TYPES = (EARNINGS, DIVIDEND, SUSPENSION, UNLOCK)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    detail TEXT NOT NULL DEFAULT '{}',
+    batch TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, date, type, batch)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_by_date ON events (date, type);
+CREATE INDEX IF NOT EXISTS events_by_batch ON events (batch);
+CREATE TABLE IF NOT EXISTS ingestions (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+) WITHOUT ROWID;
+"""
+# 主键变化时递增；旧版本的事件库是每日重新拉取的缓存，直接重建
+SCHEMA_VERSION = 2
+
+
+def _iso(day: date | str) -> str:
+    return day if isinstance(day, str) else day.isoformat()
+
+
+class EventStore:
+    """
+    本地公司事件库（SQLite）
+    事件以 (symbol, date, type, batch) 为聚簇主键，按标的与日期区间查询为一次 B 树定位加顺序扫描，
+    单次查询 O(log n)；另有 (date, type) 索引用于按日期浏览全市场事件。
+    batch 为事件来源的批次（如某报告期的披露预约），不同报告期在同一天的同类事件互不覆盖；
+    整批重新入库时先删除该批次的旧记录，改期、撤回的事件不会残留，批量入库可以安全重跑。
+    """
+
+    def __init__(self, path: str | None = EVENT_CONFIG.db_path):
+        self.path = path or os.path.join(DATA_ROOT, "events.db")
+        self.db = open_database(self.path, row_factory=sqlite3.Row)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect(SCHEMA, self._migrate)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS ingestions;"
+            )
+            conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # =====================
+    # 写入
+    # =====================
+
+    @staticmethod
+    def _rows(events: Iterable[Dict[str, Any]], batch: str) -> List[tuple]:
+        now = datetime.now().isoformat(timespec="seconds")
+        return [
+            (
+                event["symbol"],
+                _iso(event["date"]),
+                event["type"],
+                event["title"],
+                orjson.dumps(event.get("detail") or {}).decode(),
+                batch,
+                now,
+            )
+            for event in events
+        ]
+
+    def upsert(self, events: Iterable[Dict[str, Any]], batch: str = "") -> int:
+        """
+        批量写入事件，返回写入条数
+        每条事件含 symbol, date, type, title，可选 detail（dict）
+        """
+        rows = self._rows(events, batch)
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def replace(self, events: Iterable[Dict[str, Any]], batch: str) -> int:
+        """用某个批次一次完整拉取的结果替换该批次的旧记录，删除与写入在同一事务中完成"""
+        rows = self._rows(events, batch)
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM events WHERE batch = ?", (batch,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def mark_ingested(self, source: str, key: str, rows: int):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ingestions VALUES (?, ?, ?, ?)",
+                (source, key, rows, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def ingested(self, source: str, key: str) -> bool:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT 1 FROM ingestions WHERE source = ? AND key = ?", (source, key)
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    # =====================
+    # 查询
+    # =====================
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "symbol": row["symbol"],
+            "date": row["date"],
+            "type": row["type"],
+            "title": row["title"],
+            "detail": orjson.loads(row["detail"]),
+        }
+
+    def query(
+        self,
+        symbol: str,
+        start: date | str,
+        end: date | str,
+        types: Sequence[str] | None = None,
+    ) -> List[Dict[str, Any]]:
+        """标的在 [start, end] 内的事件，按日期升序"""
+        sql = "SELECT * FROM events WHERE symbol = ? AND date BETWEEN ? AND ?"
+        params: list = [symbol, _iso(start), _iso(end)]
+        if types:
+            sql += f" AND type IN ({','.join('?' * len(types))})"
+            params.extend(types)
+        rows = self._connect().execute(f"{sql} ORDER BY date", params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def on_date(self, day: date | str, type: str | None = None) -> List[Dict]:
+        """某一天全市场的事件"""
+        sql, params = "SELECT * FROM events WHERE date = ?", [_iso(day)]
+        if type:
+            sql += " AND type = ?"
+            params.append(type)
+        return [self._to_dict(row) for row in self._connect().execute(sql, params)]
+
+
+event_store = EventStore()
@@ -0,0 +1,182 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable
+
+import pandas as pd
+
+from config import DATASOURCE_CONFIG
+
+from .index import IndexDataSource, index_data_source
+from .kline_store import OhlcvArrays
+from .panel import KlinePanel
+from .stock import StockDataSource, stock_data_source
+
+
+class _AsyncRunner:
+    """
+    在线程池中执行阻塞的 akshare 调用
+    并发上限由信号量控制，上游限流由同步数据源中的令牌桶负责。
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="datasource"
+        )
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # 信号量绑定事件循环，每次 asyncio.run 都会创建新的循环
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            self._semaphores = {
+                other: sem
+                for other, sem in self._semaphores.items()
+                if not other.is_closed()
+            }
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, partial(fn, *args, **kwargs)
+            )
+
+    async def _gather(
+        self, fn: Callable[..., Any], symbols: Iterable[str], **kwargs
+    ) -> Dict[str, Any]:
+        """并发获取多个标的，单个失败时对应值为 None"""
+        symbols = list(symbols)
+        results = await asyncio.gather(
+            *(self._run(fn, symbol, **kwargs) for symbol in symbols),
+            return_exceptions=True,
+        )
+        return {
+            symbol: None if isinstance(result, Exception) else result
+            for symbol, result in zip(symbols, results)
+        }
+
+
+class AsyncStockDataSource(_AsyncRunner):
+    """StockDataSource 的 asyncio 版本"""
+
+    def __init__(
+        self,
+        source: StockDataSource = stock_data_source,
+        max_concurrency: int = DATASOURCE_CONFIG.max_concurrency,
+    ):
+        super().__init__(max_concurrency)
+        self.source = source
+
+    async def get_kline(
+        self,
+        symbol: str,
+        period: str = "daily",
+        adjust: str = "qfq",
+        compact: bool = False,
+        lookback: int | None = None,
+    ) -> pd.DataFrame:
+        return await self._run(
+            self.source.get_kline,
+            symbol,
+            period,
+            adjust,
+            compact=compact,
+            lookback=lookback,
+        )
+
+    async def get_kline_arrays(
+        self,
+        symbol: str,
+        adjust: str = "qfq",
+        lookback: int | None = None,
+        period: str = "daily",
+    ) -> OhlcvArrays | None:
+        return await self._run(
+            self.source.get_kline_arrays, symbol, adjust, lookback, period
+        )
+
+    async def get_kline_arrays_many(
+        self,
+        symbols: Iterable[str],
+        adjust: str = "qfq",
+        lookback: int | None = None,
+        period: str = "daily",
+    ) -> Dict[str, OhlcvArrays | None]:
+        return await self._gather(
+            self.source.get_kline_arrays,
+            symbols,
+            adjust=adjust,
+            lookback=lookback,
+            period=period,
+        )
+
+    async def get_klines(
+        self,
+        symbols: Iterable[str],
+        adjust: str = "qfq",
+        compact: bool = False,
+        lookback: int | None = None,
+        period: str = "daily",
+    ) -> KlinePanel:
+        arrays = await self.get_kline_arrays_many(
+            dict.fromkeys(symbols), adjust, lookback, period
+        )
+        return KlinePanel.from_arrays(
+            {
+                symbol: kline
+                for symbol, kline in arrays.items()
+                if kline is not None and not kline.empty
+            },
+            compact=compact,
+        )
+
+    async def get_company_profile(self, symbol: str):
+        return await self._run(self.source.get_company_profile, symbol)
+
+    async def get_pe_pb(self, symbol: str) -> pd.DataFrame:
+        return await self._run(self.source.get_pe_pb, symbol)
+
+    async def get_last_n_years_financials(self, symbol: str, n: int = 3):
+        return await self._run(self.source.get_last_n_years_financials, symbol, n)
+
+    async def get_all_a_shares(self) -> pd.DataFrame:
+        return await self._run(self.source.get_all_a_shares)
+
+
+class AsyncIndexDataSource(_AsyncRunner):
+    """IndexDataSource 的 asyncio 版本"""
+
+    def __init__(
+        self,
+        source: IndexDataSource = index_data_source,
+        max_concurrency: int = DATASOURCE_CONFIG.max_concurrency,
+    ):
+        super().__init__(max_concurrency)
+        self.source = source
+
+    async def get_kline(self, symbol: str, period: str = "daily") -> pd.DataFrame:
+        return await self._run(self.source.get_kline, symbol, period)
+
+    async def get_kline_arrays(
+        self, symbol: str, lookback: int | None = None, period: str = "daily"
+    ) -> OhlcvArrays | None:
+        return await self._run(self.source.get_kline_arrays, symbol, lookback, period)
+
+    async def get_kline_arrays_many(
+        self,
+        symbols: Iterable[str],
+        lookback: int | None = None,
+        period: str = "daily",
+    ) -> Dict[str, OhlcvArrays | None]:
+        return await self._gather(
+            self.source.get_kline_arrays, symbols, lookback=lookback, period=period
+        )
+
+
+async_stock_data_source = AsyncStockDataSource()
+async_index_data_source = AsyncIndexDataSource()
@@ -0,0 +1,154 @@
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from datacenter.backends import DATA_ROOT, MarketDataBackend, default_backend
+from log import logger
+
+MARKET_TZ = ZoneInfo("Asia/Shanghai")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(15, 0)
+# 午间休市
+LUNCH_START = time(11, 30)
+LUNCH_END = time(13, 0)
+
+
+class TradingCalendar:
+    """
+    A 股交易日历
+    交易日列表来自数据后端（新浪，包含当年已公布的未来交易日），本地缓存为 .npy，
+    拉取失败时退化为「周一至周五均为交易日」的近似规则。
+    """
+
+    def __init__(
+        self,
+        cache_path: str = os.path.join(DATA_ROOT, "calendar.npy"),
+        backend: MarketDataBackend = default_backend,
+    ):
+        self.cache_path = cache_path
+        self.backend = backend
+        self._dates: np.ndarray | None = None
+        self._loaded_on: date | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> np.ndarray:
+        today = self.today()
+        if self._dates is not None and self._loaded_on == today:
+            return self._dates
+
+        with self._lock:
+            if self._dates is not None and self._loaded_on == today:
+                return self._dates
+
+            dates = None
+            if os.path.exists(self.cache_path):
+                dates = np.load(self.cache_path)
+                if not len(dates) or dates[-1] < np.datetime64(today, "D"):
+                    dates = None
+
+            if dates is None:
+                try:
+                    df = self.backend.trade_dates()
+                    dates = np.sort(df["trade_date"].to_numpy(dtype="datetime64[D]"))
+                    os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                    np.save(self.cache_path, dates)
+                except Exception as e:
+                    logger.warning(f"获取交易日历失败，按工作日近似: {e}")
+                    dates = np.array([], dtype="datetime64[D]")
+
+            self._dates = dates
+            self._loaded_on = today
+            return dates
+
+    @staticmethod
+    def now() -> datetime:
+        return datetime.now(MARKET_TZ)
+
+    @classmethod
+    def today(cls) -> date:
+        return cls.now().date()
+
+    def is_trading_day(self, day: date) -> bool:
+        dates = self._load()
+        if not len(dates):
+            return day.weekday() < 5
+        d = np.datetime64(day, "D")
+        idx = np.searchsorted(dates, d)
+        return bool(idx < len(dates) and dates[idx] == d)
+
+    def previous_trading_day(self, day: date) -> date:
+        """严格早于 day 的最近一个交易日"""
+        dates = self._load()
+        if not len(dates):
+            day -= timedelta(days=1)
+            while day.weekday() >= 5:
+                day -= timedelta(days=1)
+            return day
+        idx = np.searchsorted(dates, np.datetime64(day, "D")) - 1
+        return dates[max(idx, 0)].astype(date)
+
+    def next_trading_day(self, day: date) -> date:
+        """严格晚于 day 的最近一个交易日"""
+        dates = self._load()
+        idx = np.searchsorted(dates, np.datetime64(day, "D"), side="right")
+        if not len(dates) or idx >= len(dates):
+            day += timedelta(days=1)
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            return day
+        return dates[idx].astype(date)
+
+    def session_window_start(self, n: int, now: datetime | None = None) -> date:
+        """最近 n 个已收盘交易日中最早的一天"""
+        end = self.last_closed_session(now)
+        dates = self._load()
+        if not len(dates):
+            day = end
+            for _ in range(n - 1):
+                day = self.previous_trading_day(day)
+            return day
+        idx = np.searchsorted(dates, np.datetime64(end, "D")) - (n - 1)
+        return dates[max(idx, 0)].astype(date)
+
+    def next_close(self, now: datetime | None = None) -> datetime:
+        """下一次收盘时间（当日为交易日且未收盘时即为当日 15:00）"""
+        now = now or self.now()
+        today = now.date()
+        if self.is_trading_day(today) and now.time() < MARKET_CLOSE:
+            day = today
+        else:
+            day = self.next_trading_day(today)
+        return datetime.combine(day, MARKET_CLOSE, MARKET_TZ)
+
+    def last_closed_session(self, now: datetime | None = None) -> date:
+        """
+        最近一个已收盘的交易日
+        当日为交易日且已过 15:00 时返回当日，否则返回上一个交易日
+        """
+        now = now or self.now()
+        today = now.date()
+        if self.is_trading_day(today) and now.time() >= MARKET_CLOSE:
+            return today
+        return self.previous_trading_day(today)
+
+    def in_session(self, now: datetime | None = None) -> bool:
+        """当前是否处于交易时段（09:30 - 15:00，含午休）"""
+        now = now or self.now()
+        return (
+            self.is_trading_day(now.date()) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+        )
+
+    def in_continuous_trading(self, now: datetime | None = None) -> bool:
+        """当前是否处于连续竞价时段（09:30 - 11:30、13:00 - 15:00）"""
+        now = now or self.now()
+        return self.in_session(now) and not (LUNCH_START <= now.time() < LUNCH_END)
+
+
+trading_calendar = TradingCalendar()
+
+
+if __name__ == "__main__":
+    logger.info(trading_calendar.last_closed_session())
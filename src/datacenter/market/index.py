@@ -1,21 +1,73 @@
-import akshare as ak
+from datetime import datetime
+from functools import partial
+
+import numpy as np
 import pandas as pd
 
+from datacenter.backends import MarketDataBackend, default_backend
+from datacenter.singleflight import SingleFlight
 from log import logger
 
+from .kline_store import KlineStore, OhlcvArrays, kline_store
+from .resample import check_period, daily_lookback
+from .stock import DEFAULT_START_DATE
+
 
 class IndexDataSource:
+    def __init__(
+        self,
+        store: KlineStore = kline_store,
+        backend: MarketDataBackend = default_backend,
+    ):
+        self.store = store
+        self.backend = backend
+        self.flight = SingleFlight()
+
+    def _sync(self, key: str, fetch, lookback: int | None = None) -> bool:
+        """并发请求同一标的（且回看窗口相同）时只向上游发起一次同步"""
+        return self.flight.do(
+            f"{key}#{lookback}", self.store.sync, key, fetch, lookback
+        )
+
+    def _fetch_daily(self, symbol: str, start: np.datetime64 | None) -> pd.DataFrame:
+        start_date = (
+            DEFAULT_START_DATE
+            if start is None
+            else start.astype(datetime).strftime("%Y%m%d")
+        )
+        return self.backend.index_daily(symbol, start_date)
+
     def get_kline(self, symbol: str, period: str = "daily") -> pd.DataFrame:
         try:
-            if period == "daily":
-                df = ak.stock_zh_index_daily(symbol=symbol)
-            else:
-                raise ValueError(f"Unsupported period: {period}")
-            return df
+            check_period(period)
+            key = f"index/{symbol}"
+            self._sync(key, partial(self._fetch_daily, symbol))
+            return KlineStore.to_frame(self.store.read(key, period=period))
         except Exception as e:
             logger.opt(exception=e).error(f"Error fetching Kline: {e}")
             return pd.DataFrame()
 
+    def get_kline_arrays(
+        self,
+        symbol: str,
+        lookback: int | None = None,
+        period: str = "daily",
+        sync: bool = True,
+    ) -> OhlcvArrays | None:
+        """参数同 StockDataSource.get_kline_arrays"""
+        check_period(period)
+        key = f"index/{symbol}"
+        if sync:
+            try:
+                self._sync(
+                    key,
+                    partial(self._fetch_daily, symbol),
+                    None if lookback is None else daily_lookback(lookback, period),
+                )
+            except Exception as e:
+                logger.opt(exception=e).error(f"Error syncing Kline: {e}")
+        return self.store.read_arrays(key, lookback, period)
+
 
 index_data_source = IndexDataSource()
 
@@ -0,0 +1,634 @@
+import os
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from math import ceil
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，仅保留进程内互斥
+    fcntl = None
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from datacenter.backends import DATA_ROOT
+from log import logger
+
+from .calendar import MARKET_CLOSE, MARKET_TZ, trading_calendar
+from .resample import check_period, resample
+
+KLINE_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+Columns = Dict[str, np.ndarray]
+# fetch(start) -> DataFrame，start 为 None 时表示拉取全量历史
+Fetcher = Callable[[Optional[np.datetime64]], pd.DataFrame]
+
+# 紧凑布局（全市场计算时按需启用）：价格 float32，成交量为整数，
+# DataFrame 中的日期为自 1970-01-01 起的 int32 天数（pandas 不支持 datetime64[D]）
+COMPACT_PRICE_DTYPE = np.float32
+COMPACT_DATE_DTYPE = np.int32
+
+
+# 按回看窗口首次下载时多取的比例，用于覆盖停牌等导致的交易日缺口
+LOOKBACK_MARGIN = 1.5
+
+
+def compact_volume_dtype(volume: np.ndarray) -> np.dtype:
+    """成交量（股）通常在 uint32 范围内，个别超大成交日退回 int64"""
+    finite = volume[np.isfinite(volume)] if volume.dtype.kind == "f" else volume
+    if finite.size and finite.max() > np.iinfo(np.uint32).max:
+        return np.dtype(np.int64)
+    return np.dtype(np.uint32)
+
+
+def compact_columns(columns: Columns) -> Columns:
+    """转换为紧凑布局，日期保持 datetime64[D]"""
+    out = {"date": columns["date"]}
+    for col in KLINE_COLUMNS[1:5]:
+        out[col] = columns[col].astype(COMPACT_PRICE_DTYPE)
+    volume = columns["volume"]
+    out["volume"] = np.nan_to_num(volume).astype(compact_volume_dtype(volume))
+    return out
+
+
+@dataclass(frozen=True)
+class OhlcvArrays:
+    """
+    单个标的的 OHLCV 列数组
+    由 KlineStore.read_arrays 以内存映射方式打开，数据页由操作系统页缓存按需加载，
+    读取时既不拷贝也不解析；支持 arrays["close"] 形式的按列访问，与 DataFrame 用法一致。
+    """
+
+    date: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        if col not in KLINE_COLUMNS:
+            raise KeyError(col)
+        return getattr(self, col)
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def tail(self, n: int) -> "OhlcvArrays":
+        """最后 n 根 K 线（切片视图，不拷贝）"""
+        return OhlcvArrays(*(getattr(self, col)[-n:] for col in KLINE_COLUMNS))
+
+    def compact(self) -> "OhlcvArrays":
+        """紧凑布局的副本：float32 价格、整数成交量，约为原大小的一半"""
+        columns = compact_columns({col: getattr(self, col) for col in KLINE_COLUMNS})
+        return OhlcvArrays(**columns)
+
+
+def _npy_layout(f) -> tuple[int, int, np.dtype] | None:
+    """
+    一维 .npy（1.0 版格式）的 (数据起始位置, 长度, dtype)
+    其它版本、多维或文件大小与数组头不符（如上次追加中断）时返回 None
+    """
+    if np.lib.format.read_magic(f) != (1, 0):
+        return None
+    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    offset = f.tell()
+    if (
+        len(shape) != 1
+        or fortran_order
+        or os.fstat(f.fileno()).st_size != offset + shape[0] * dtype.itemsize
+    ):
+        return None
+    return offset, shape[0], dtype
+
+
+def _npy_header(offset: int, dtype: np.dtype, length: int) -> bytes | None:
+    """
+    长度为 length 的数组头，填充到与原数组头相同的长度（数据起始位置不变）
+    魔数、版本号与头长度字段共 10 字节；放不下时返回 None
+    """
+    header = repr(
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (length,),
+        }
+    )
+    space = offset - 10
+    if len(header) + 1 > space:
+        return None
+    return (header.ljust(space - 1) + "\n").encode("latin1")
+
+
+class KlineStore:
+    """
+    本地列式 K 线存储
+    每个标的一个目录，每列一个 .npy 文件：
+        {root}/{key}/date.npy   datetime64[D]
+        {root}/{key}/open.npy   float64
+        ...
+        {root}/{key}/meta.json  最近一次同步时间，以及历史是否只下载了尾部（partial）
+    首次访问时拉取全量历史（指定回看窗口时只拉取尾部），
+    之后只补拉最后一根已收盘 K 线之后的数据。
+    周线、月线由日线在本地聚合，缓存在 {root}/{period}/{key}，日线变化后增量更新。
+    """
+
+    def __init__(self, root: str = os.path.join(DATA_ROOT, "kline")):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def _exclusive(self, key: str):
+        """同一标的的同步在线程间和进程间（如监控任务与 MCP 服务共享数据目录）互斥"""
+        with self._lock(key):
+            if fcntl is None:
+                yield
+                return
+            path = self.path(key)
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, ".lock"), "w") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _shared(self, key: str):
+        """
+        读取时持有共享锁，与同步写入互斥：write 逐列替换文件，不加锁读取可能拿到新旧混合的列
+        文件锁按打开的文件描述区分，同进程内的其他线程写入时同样会阻塞读取。
+        """
+        path = os.path.join(self.path(key), ".lock")
+        if fcntl is None:
+            with self._lock(key):
+                yield
+            return
+        try:
+            f = open(path, "a")
+        except FileNotFoundError:  # 从未同步过，没有可读的数据
+            yield
+            return
+        with f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    # =====================
+    # 读写
+    # =====================
+
+    def read(
+        self,
+        key: str,
+        mmap: bool = False,
+        lookback: int | None = None,
+        period: str = "daily",
+    ) -> Columns | None:
+        """
+        读取全部列，文件缺失或列长度不一致（写入中断）时返回 None
+        :param mmap: 以只读内存映射方式打开，不把数据读入进程内存
+        :param lookback: 只取最后 lookback 行，文件以内存映射打开，只有尾部的数据页被读入
+        :param period: 'weekly' / 'monthly' 时读取由日线聚合的周期 K 线，lookback 按周期计
+        """
+        if period != "daily":
+            key = self.refresh_resampled(key, period)
+        with self._shared(key):
+            return self._read(key, mmap, lookback)
+
+    def _read(
+        self, key: str, mmap: bool = False, lookback: int | None = None
+    ) -> Columns | None:
+        """不加锁读取，供已持有该标的锁的同步、聚合流程使用"""
+        path = self.path(key)
+        mmap_mode = "r" if mmap or lookback is not None else None
+        try:
+            columns = {
+                col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mmap_mode)
+                for col in KLINE_COLUMNS
+            }
+        except FileNotFoundError:
+            return None
+
+        if len({len(arr) for arr in columns.values()}) != 1 or not len(columns["date"]):
+            logger.warning(f"K线存储 {key} 数据不完整，将重新下载")
+            return None
+        if lookback is not None:
+            columns = {
+                col: arr[-lookback:] if mmap else np.array(arr[-lookback:])
+                for col, arr in columns.items()
+            }
+        return columns
+
+    def read_arrays(
+        self, key: str, lookback: int | None = None, period: str = "daily"
+    ) -> OhlcvArrays | None:
+        columns = self.read(key, mmap=True, lookback=lookback, period=period)
+        if columns is None:
+            return None
+        return OhlcvArrays(**columns)
+
+    def write(
+        self,
+        key: str,
+        columns: Columns,
+        updated_at: datetime,
+        partial: bool = False,
+        **extra: Any,
+    ):
+        """:param extra: 额外写入 meta.json 的字段"""
+        path = self.path(key)
+        os.makedirs(path, exist_ok=True)
+        for col in KLINE_COLUMNS:
+            target = os.path.join(path, f"{col}.npy")
+            tmp = f"{target}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, columns[col])
+            os.replace(tmp, target)
+
+        self._write_meta(
+            key, {"updated_at": updated_at.isoformat(), "partial": partial, **extra}
+        )
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]):
+        path = os.path.join(self.path(key), "meta.json")
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(orjson.dumps(meta))
+        os.replace(f"{path}.tmp", path)
+
+    def keys(self, prefix: str) -> list[str]:
+        """列出某个前缀（如 'stock/qfq'）下已有数据的全部 key"""
+        path = self.path(prefix)
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            f"{prefix}/{name}"
+            for name in os.listdir(path)
+            if os.path.exists(os.path.join(path, name, "date.npy"))
+        )
+
+    def invalidate(self, key: str):
+        """清除同步时间，下次访问时重新下载全量"""
+        try:
+            os.remove(os.path.join(self.path(key), "meta.json"))
+        except FileNotFoundError:
+            pass
+
+    def meta(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path(key), "meta.json"), "rb") as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def updated_at(self, key: str) -> datetime | None:
+        try:
+            return datetime.fromisoformat(self.meta(key)["updated_at"])
+        except (KeyError, ValueError):
+            return None
+
+    def is_partial(self, key: str) -> bool:
+        """本地只保存了尾部历史（按回看窗口下载）"""
+        return bool(self.meta(key).get("partial", False))
+
+    def covers(
+        self, key: str, lookback: int | None, columns: Columns | None = None
+    ) -> bool:
+        """本地历史是否足够提供最后 lookback 根 K 线（lookback 为空表示需要全量）"""
+        if not self.is_partial(key):
+            return True
+        if lookback is None:
+            return False
+        columns = columns if columns is not None else self._read(key, mmap=True)
+        return columns is not None and len(columns["date"]) >= lookback
+
+    # =====================
+    # 增量同步
+    # =====================
+
+    def is_fresh(self, updated_at: datetime, now: datetime) -> bool:
+        """上次同步发生在最近一次收盘之后，且当前不在交易时段内"""
+        if trading_calendar.in_session(now):
+            return False
+        last_close = datetime.combine(
+            trading_calendar.last_closed_session(now), MARKET_CLOSE, MARKET_TZ
+        )
+        return updated_at >= last_close
+
+    def sync(self, key: str, fetch: Fetcher, lookback: int | None = None) -> bool:
+        """
+        同步某个标的的 K 线，返回本地是否有可用数据
+        以上次同步时已收盘的最后一根 K 线为锚点补拉尾部数据，
+        若锚点收盘价与上游不一致（如除权导致前复权价格整体变化），则重新下载。
+        等锁期间若已被其他线程或进程同步过，则直接复用其结果。
+        :param lookback: 调用方只需要最后 lookback 根 K 线；本地无数据时只下载这段尾部，
+                         本地只有尾部且不够长时重新下载
+        """
+        before = self.updated_at(key)
+        with self._exclusive(key):
+            now = trading_calendar.now()
+            updated_at = self.updated_at(key)
+            if (
+                updated_at is not None
+                and (updated_at != before or self.is_fresh(updated_at, now))
+                and self.covers(key, lookback)
+            ):
+                return True
+
+            columns = self._read(key, mmap=True) if updated_at is not None else None
+            if columns is None or not self.covers(key, lookback, columns):
+                return self._reload(key, fetch, now, lookback)
+            # 已有全量历史时重新下载仍取全量，不因本次调用的回看窗口而截断
+            partial = self.is_partial(key)
+            lookback = lookback if partial else None
+
+            dates = columns["date"]
+            complete = np.datetime64(
+                trading_calendar.last_closed_session(updated_at), "D"
+            )
+            idx = int(np.searchsorted(dates, complete, side="right")) - 1
+            if idx < 0:
+                return self._reload(key, fetch, now, lookback)
+            anchor = dates[idx]
+
+            try:
+                tail = self.from_frame(fetch(anchor))
+            except Exception as e:
+                logger.warning(f"K线 {key} 增量更新失败，使用本地数据: {e}")
+                return True
+
+            if (
+                tail is None
+                or tail["date"][0] != anchor
+                or not np.isclose(tail["close"][0], columns["close"][idx], rtol=1e-6)
+            ):
+                logger.info(f"K线 {key} 历史价格发生变化，重新下载")
+                return self._reload(key, fetch, now, lookback)
+
+            merged = {
+                col: np.concatenate([columns[col][:idx], tail[col]])
+                for col in KLINE_COLUMNS
+            }
+            self.write(key, merged, now, partial)
+            return True
+
+    def upsert_bar(
+        self, key: str, bar: Dict[str, float], prev_close: float, now: datetime
+    ) -> str:
+        """
+        用行情快照写入一根 K 线（bar 含 date 及各价格列），不访问上游
+        - 末根日期与 bar 相同：覆盖末根
+        - 末根为 bar 的上一个交易日：追加
+        - 中间缺失交易日：跳过，交给 sync 补拉
+        快照的昨收与本地前一根收盘价不一致（除权导致前复权历史变化）时使存储失效。
+        :return: 'updated' / 'appended' / 'gap' / 'adjusted' / 'missing'
+        """
+        with self._exclusive(key):
+            columns = self._read(key, mmap=True)
+            if columns is None:
+                return "missing"
+
+            dates = columns["date"]
+            day = bar["date"]
+            if dates[-1] == day:
+                idx = len(dates) - 1
+            elif dates[-1] == np.datetime64(
+                trading_calendar.previous_trading_day(day.astype(datetime)), "D"
+            ):
+                idx = len(dates)
+            else:
+                return "gap"
+
+            if idx == 0 or not np.isclose(
+                columns["close"][idx - 1], prev_close, rtol=0, atol=0.01
+            ):
+                self.invalidate(key)
+                return "adjusted"
+
+            merged = {
+                col: np.append(columns[col][:idx], np.asarray(bar[col], dtype=dtype))
+                for col, dtype in zip(KLINE_COLUMNS, (dates.dtype,) + (np.float64,) * 5)
+            }
+            self.write(key, merged, now, self.is_partial(key))
+            return "updated" if idx < len(dates) else "appended"
+
+    def upsert_bars(
+        self, prefix: str, bars: Dict[str, Dict[str, float]], day: date, now: datetime
+    ) -> Counter:
+        """
+        用全市场行情快照批量写入 prefix（如 'stock/qfq'）下各标的 day 当天的 K 线
+        :param bars: 标的代码 -> 各价格列及 prev_close
+        最常见的情形（末根为上一交易日）在各列文件末尾原地追加一个值、改写数组头中的长度，
+        不读取、不重写整个序列；其余情形（当日重跑覆盖、缺口、除权）逐只交给 upsert_bar。
+        :return: 各类处理结果的计数，含 'no_quote'（快照中没有该标的）
+        """
+        stats = Counter()
+        date64 = np.datetime64(day, "D")
+        previous = np.datetime64(trading_calendar.previous_trading_day(day), "D")
+        for key in self.keys(prefix):
+            record = bars.get(key[len(prefix) + 1 :])
+            if record is None:
+                stats["no_quote"] += 1
+                continue
+            bar = {"date": date64, **record}
+            with self._exclusive(key):
+                status = self._append_bar(key, bar, previous, record["prev_close"], now)
+            if status is None:
+                status = self.upsert_bar(key, bar, record["prev_close"], now)
+            stats[status] += 1
+        return stats
+
+    def _append_bar(
+        self,
+        key: str,
+        bar: Dict[str, Any],
+        previous: np.datetime64,
+        prev_close: float,
+        now: datetime,
+    ) -> str | None:
+        """
+        在末根为 previous 的序列后原地追加 bar，调用方持有该标的的写锁
+        各列先追加数据、全部成功后再改写数组头：中途中断时数组头仍为旧长度，
+        多出的尾部字节使下次追加退回整体重写；已映射旧文件的读取方不受影响。
+        :return: 'appended' / 'adjusted'；不适用原地追加时返回 None
+        """
+        path = self.path(key)
+        with ExitStack() as stack:
+            try:
+                files = {
+                    col: stack.enter_context(
+                        open(os.path.join(path, f"{col}.npy"), "r+b")
+                    )
+                    for col in KLINE_COLUMNS
+                }
+            except FileNotFoundError:
+                return None
+            layouts = {col: _npy_layout(f) for col, f in files.items()}
+            if any(layout is None for layout in layouts.values()):
+                return None
+            length = layouts["date"][1]
+            if not length or any(n != length for _, n, _ in layouts.values()):
+                return None
+
+            def last(col: str):
+                offset, n, dtype = layouts[col]
+                files[col].seek(offset + (n - 1) * dtype.itemsize)
+                return np.frombuffer(files[col].read(dtype.itemsize), dtype)[0]
+
+            if last("date") != previous:
+                return None
+            if not np.isclose(last("close"), prev_close, rtol=0, atol=0.01):
+                self.invalidate(key)
+                return "adjusted"
+
+            headers = {
+                col: _npy_header(offset, dtype, length + 1)
+                for col, (offset, _, dtype) in layouts.items()
+            }
+            if any(header is None for header in headers.values()):
+                return None
+            for col, f in files.items():
+                f.seek(0, os.SEEK_END)
+                f.write(np.asarray(bar[col], dtype=layouts[col][2]).tobytes())
+            for col, f in files.items():
+                f.seek(10)
+                f.write(headers[col])
+
+        self._write_meta(key, {**self.meta(key), "updated_at": now.isoformat()})
+        return "appended"
+
+    def _reload(
+        self, key: str, fetch: Fetcher, now: datetime, lookback: int | None = None
+    ) -> bool:
+        """下载全量历史；指定 lookback 时只下载覆盖最后 lookback 根 K 线的尾部"""
+        if lookback is not None:
+            start = trading_calendar.session_window_start(
+                ceil(lookback * LOOKBACK_MARGIN), now
+            )
+            columns = self.from_frame(fetch(np.datetime64(start, "D")))
+            # 长期停牌等情况下尾部不够长，退回全量
+            if columns is not None and len(columns["date"]) >= lookback:
+                self.write(key, columns, now, partial=True)
+                return True
+
+        columns = self.from_frame(fetch(None))
+        if columns is None:
+            return False
+        self.write(key, columns, now)
+        return True
+
+    # =====================
+    # 周期聚合
+    # =====================
+
+    def refresh_resampled(self, key: str, period: str) -> str:
+        """
+        确保 key 的周期 K 线缓存与日线一致，返回缓存的 key
+        缓存记录聚合时日线的同步时间，日线未变化时直接复用；
+        日线变化时只重新聚合最后一根（可能未完结的）周期 K 线起的日线。
+        """
+        check_period(period)
+        resampled_key = f"{period}/{key}"
+        with self._exclusive(resampled_key):
+            version = self.meta(key).get("updated_at")
+            meta = self.meta(resampled_key)
+            if version is None or meta.get("source_updated_at") != version:
+                self._resample(key, resampled_key, period, meta, version)
+        return resampled_key
+
+    def _resample(
+        self,
+        key: str,
+        resampled_key: str,
+        period: str,
+        meta: Dict[str, Any],
+        version: str | None,
+    ):
+        daily = self.read(key, mmap=True)
+        if daily is None:
+            return
+        dates = daily["date"]
+        first_date = str(dates[0])
+
+        start, head = 0, None
+        existing = self._read(resampled_key, mmap=True) if meta else None
+        if (
+            existing is not None
+            and meta.get("first_date") == first_date
+            and len(existing["date"]) >= 2
+        ):
+            # 以倒数第二根（已完结）周期 K 线为锚点：其收盘价不变说明历史价格未变（未除权）
+            anchor = existing["date"][-2]
+            idx = int(np.searchsorted(dates, anchor))
+            if (
+                idx < len(dates)
+                and dates[idx] == anchor
+                and np.isclose(daily["close"][idx], existing["close"][-2], rtol=1e-6)
+            ):
+                start = idx + 1
+                head = {col: existing[col][:-1] for col in KLINE_COLUMNS}
+
+        tail = resample({col: daily[col][start:] for col in KLINE_COLUMNS}, period)
+        columns = (
+            tail
+            if head is None
+            else {col: np.concatenate([head[col], tail[col]]) for col in KLINE_COLUMNS}
+        )
+        self.write(
+            resampled_key,
+            columns,
+            trading_calendar.now(),
+            self.is_partial(key),
+            source_updated_at=version,
+            first_date=first_date,
+        )
+
+    # =====================
+    # DataFrame 转换
+    # =====================
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame) -> Columns | None:
+        if df is None or df.empty:
+            return None
+        df = df.drop_duplicates(subset="date", keep="last").sort_values("date")
+        columns = {
+            "date": pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[D]"),
+        }
+        for col in KLINE_COLUMNS[1:]:
+            columns[col] = df[col].to_numpy(dtype=np.float64)
+        return columns
+
+    @staticmethod
+    def to_frame(columns: Columns | None, compact: bool = False) -> pd.DataFrame:
+        """
+        :param compact: 为 True 时按紧凑布局返回，日期列为 int32 天数
+        """
+        if columns is None:
+            return pd.DataFrame(columns=list(KLINE_COLUMNS))
+        if compact:
+            columns = compact_columns(columns)
+            columns["date"] = columns["date"].astype(COMPACT_DATE_DTYPE)
+        return pd.DataFrame({col: columns[col] for col in KLINE_COLUMNS})
+
+
+kline_store = KlineStore()
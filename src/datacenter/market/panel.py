@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .kline_store import (
+    COMPACT_DATE_DTYPE,
+    COMPACT_PRICE_DTYPE,
+    KLINE_COLUMNS,
+    OhlcvArrays,
+    compact_volume_dtype,
+)
+
+PANEL_FIELDS = KLINE_COLUMNS[1:]
+
+
+@dataclass
+class KlinePanel:
+    """
+    多标的对齐后的 K 线面板
+    每个字段是一个 symbols × dates 的二维数组，某标的在某日无数据（未上市、停牌）时为 NaN。
+    紧凑布局下价格为 float32、成交量为整数（无数据处为 0），以收盘价是否为 NaN 判断有无数据；
+    5000 只股票 × 6 年约 1500 个交易日的面板约占 150MB。
+    """
+
+    symbols: np.ndarray  # (S,)
+    dates: np.ndarray  # (T,) datetime64[D]
+    open: np.ndarray  # (S, T)
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        if field not in PANEL_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.symbols) == 0 or len(self.dates) == 0
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, OhlcvArrays], compact: bool = False
+    ) -> "KlinePanel":
+        """
+        按日期并集对齐各标的的 K 线
+        :param compact: 为 True 时使用紧凑布局
+        """
+        symbols = np.array(list(arrays), dtype=object)
+        if not len(symbols):
+            dates = np.array([], dtype="datetime64[D]")
+        else:
+            dates = np.unique(np.concatenate([a.date for a in arrays.values()]))
+
+        shape = (len(symbols), len(dates))
+        if compact:
+            volume_dtype = max(
+                (compact_volume_dtype(a.volume) for a in arrays.values()),
+                default=np.dtype(np.uint32),
+                key=lambda dtype: dtype.itemsize,
+            )
+            fields = {
+                field: np.full(shape, np.nan, dtype=COMPACT_PRICE_DTYPE)
+                for field in PANEL_FIELDS[:-1]
+            }
+            fields["volume"] = np.zeros(shape, dtype=volume_dtype)
+        else:
+            fields = {field: np.full(shape, np.nan) for field in PANEL_FIELDS}
+        for row, kline in enumerate(arrays.values()):
+            cols = np.searchsorted(dates, kline.date)
+            for field in PANEL_FIELDS:
+                fields[field][row, cols] = kline[field]
+        return cls(symbols=symbols, dates=dates, **fields)
+
+    def reindex(self, symbols: np.ndarray) -> "KlinePanel":
+        """按给定顺序重排标的，不在面板中的标的整行为缺失"""
+        index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        rows = np.array([index.get(symbol, -1) for symbol in symbols], dtype=np.intp)
+        missing = rows < 0
+        fields = {}
+        for field in PANEL_FIELDS:
+            values = self[field]
+            out = np.empty((len(rows), len(self.dates)), dtype=values.dtype)
+            out[~missing] = values[rows[~missing]]
+            out[missing] = np.nan if values.dtype.kind == "f" else 0
+            fields[field] = out
+        return KlinePanel(
+            symbols=np.asarray(symbols, dtype=object), dates=self.dates, **fields
+        )
+
+    def iter_rows(self) -> Iterator[tuple[str, OhlcvArrays]]:
+        """逐个标的还原为 OhlcvArrays（去掉无数据的日期）"""
+        for row, symbol in enumerate(self.symbols):
+            mask = ~np.isnan(self.close[row])
+            yield (
+                symbol,
+                OhlcvArrays(
+                    self.dates[mask],
+                    *(self[field][row, mask] for field in PANEL_FIELDS),
+                ),
+            )
+
+    @property
+    def compact(self) -> bool:
+        return self.close.dtype == COMPACT_PRICE_DTYPE
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        长表格式：symbol, date, open, high, low, close, volume
+        紧凑布局下 symbol 为分类列，date 为 int32 天数
+        """
+        rows, cols = np.nonzero(~np.isnan(self.close))
+        if self.compact:
+            symbol = pd.Categorical.from_codes(rows, categories=self.symbols)
+            dates = self.dates.astype(COMPACT_DATE_DTYPE)
+        else:
+            symbol, dates = self.symbols[rows], self.dates
+        return pd.DataFrame(
+            {
+                "symbol": symbol,
+                "date": dates[cols],
+                **{field: self[field][rows, cols] for field in PANEL_FIELDS},
+            }
+        )
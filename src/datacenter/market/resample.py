@@ -0,0 +1,60 @@
+"""
+由日线聚合周线、月线
+周期内开盘取首日、收盘取末日、最高 / 最低取极值、成交量求和，日期为周期内最后一个交易日。
+"""
+
+from typing import Dict
+
+import numpy as np
+
+PERIODS = ("daily", "weekly", "monthly")
+# 每个周期最多包含的交易日数，用于把周期 K 线的回看窗口折算为日线根数
+PERIOD_SESSIONS = {"daily": 1, "weekly": 5, "monthly": 23}
+
+
+def check_period(period: str):
+    if period not in PERIODS:
+        raise ValueError(f"不支持的周期类型: {period}")
+
+
+def daily_lookback(lookback: int, period: str) -> int:
+    """
+    计算最后 lookback 根周期 K 线所需的日线根数
+    多算一个周期：只保存了尾部日线时，第一个周期可能不完整。
+    """
+    check_period(period)
+    if period == "daily":
+        return lookback
+    return (lookback + 1) * PERIOD_SESSIONS[period]
+
+
+def period_labels(dates: np.ndarray, period: str) -> np.ndarray:
+    """每个交易日所属周期的标签，相邻交易日标签相同即属于同一根周期 K 线"""
+    if period == "weekly":
+        # numpy 的周以 1970-01-01（周四）为起点，平移三天后按自然周（周一至周日）分组
+        return (dates + np.timedelta64(3, "D")).astype("datetime64[W]")
+    if period == "monthly":
+        return dates.astype("datetime64[M]")
+    raise ValueError(f"不支持的周期类型: {period}")
+
+
+def resample(columns: Dict[str, np.ndarray], period: str) -> Dict[str, np.ndarray]:
+    """
+    把按日期升序排列的日线列数组聚合为周期 K 线
+    :param columns: date, open, high, low, close, volume
+    """
+    dates = columns["date"]
+    if not len(dates):
+        return {col: np.asarray(values[:0]) for col, values in columns.items()}
+
+    labels = period_labels(dates, period)
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(dates)] - 1
+    return {
+        "date": np.asarray(dates[ends]),
+        "open": np.asarray(columns["open"][starts]),
+        "high": np.asarray(np.maximum.reduceat(columns["high"], starts)),
+        "low": np.asarray(np.minimum.reduceat(columns["low"], starts)),
+        "close": np.asarray(columns["close"][ends]),
+        "volume": np.asarray(np.add.reduceat(columns["volume"], starts)),
+    }
@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+from datetime import date
+
+import pandas as pd
+
+from log import logger
+from utils.stock import get_fullcodes
+
+from .calendar import MARKET_OPEN, trading_calendar
+from .kline_store import KlineStore, kline_store
+from .stock import StockDataSource, stock_data_source
+
+# 快照只能更新不复权与前复权序列：前复权的最新一根即为实际价格，后复权则不是
+SNAPSHOT_ADJUSTS = ("qfq", "none")
+
+
+def snapshot_to_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将东方财富行情快照整体转换为日 K 线格式
+    :return: 以完整代码（如 sh600519）为索引，列为 open, high, low, close, volume, prev_close
+    """
+    bars = pd.DataFrame(
+        {
+            "open": pd.to_numeric(df["今开"], errors="coerce"),
+            "high": pd.to_numeric(df["最高"], errors="coerce"),
+            "low": pd.to_numeric(df["最低"], errors="coerce"),
+            "close": pd.to_numeric(df["最新价"], errors="coerce"),
+            # 快照成交量单位为「手」，日 K 线为「股」
+            "volume": pd.to_numeric(df["成交量"], errors="coerce") * 100,
+            "prev_close": pd.to_numeric(df["昨收"], errors="coerce"),
+        }
+    )
+    bars.index = get_fullcodes(df["代码"])
+    # 停牌或未成交的股票没有当日 K 线
+    return bars[bars["close"].notna() & (bars["volume"] > 0)]
+
+
+class SnapshotIngestor:
+    """
+    收盘快照入库
+    一次请求拉取全市场快照，为本地 K 线存储中已有的每只股票追加或覆盖最新一根 K 线，
+    代替逐只股票下载历史。按复权方式批量写入（KlineStore.upsert_bars），
+    常见的追加只在各列文件末尾原地写入，基准见 benchmarks/bench_snapshot_ingest.py。
+    """
+
+    def __init__(
+        self,
+        source: StockDataSource = stock_data_source,
+        store: KlineStore = kline_store,
+    ):
+        self.source = source
+        self.store = store
+
+    def trade_date(self) -> date:
+        """盘中或收盘后为当日，开盘前或非交易日为上一交易日"""
+        now = trading_calendar.now()
+        if trading_calendar.is_trading_day(now.date()) and now.time() >= MARKET_OPEN:
+            return now.date()
+        return trading_calendar.last_closed_session(now)
+
+    def ingest(self) -> Counter:
+        """
+        :return: 各类处理结果的计数，如 appended / updated / gap / adjusted
+        """
+        stats = Counter()
+        started = time.perf_counter()
+        df = self.source.get_spot_snapshot()
+        if df.empty:
+            logger.warning("行情快照为空，跳过入库")
+            return stats
+
+        now = trading_calendar.now()
+        day = self.trade_date()
+        records = snapshot_to_bars(df).to_dict("index")
+        for adjust in SNAPSHOT_ADJUSTS:
+            stats.update(self.store.upsert_bars(f"stock/{adjust}", records, day, now))
+
+        logger.info(
+            f"行情快照入库完成: {dict(stats)}，耗时 {time.perf_counter() - started:.1f}s"
+        )
+        return stats
+
+
+snapshot_ingestor = SnapshotIngestor()
+
+
+if __name__ == "__main__":
+    snapshot_ingestor.ingest()
@@ -1,35 +1,91 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Iterable
 
-import akshare as ak
+import numpy as np
 import pandas as pd
 
+from config import DATASOURCE_CONFIG
+from datacenter.cache import (
+    cached,
+    data_cache,
+    expire_after,
+    expire_at_next_close,
+    expire_at_next_report_season,
+)
+from datacenter.backends import MarketDataBackend, default_backend
+from datacenter.singleflight import SingleFlight
 from log import logger
 
+from .kline_store import KlineStore, OhlcvArrays, kline_store
+from .panel import KlinePanel
+from .resample import check_period, daily_lookback
+
+DEFAULT_START_DATE = "20200101"
+
 
 class StockDataSource:
     """
-    基于 AkShare 的股票数据源模块
-    提供 Kline、财务指标、公司资料等原始数据访问接口
+    股票数据源模块
+    提供 Kline、财务指标、公司资料等原始数据访问接口，
+    上游由可替换的数据后端提供（默认 AkShare，也可离线回放）
     """
 
+    def __init__(
+        self,
+        store: KlineStore = kline_store,
+        backend: MarketDataBackend = default_backend,
+    ):
+        self.store = store
+        self.backend = backend
+        self.flight = SingleFlight()
+
+    def _sync(self, key: str, fetch, lookback: int | None = None) -> bool:
+        """并发请求同一标的（且回看窗口相同）时只向上游发起一次同步"""
+        return self.flight.do(
+            f"{key}#{lookback}", self.store.sync, key, fetch, lookback
+        )
+
+    def _fetch_daily(
+        self, symbol: str, adjust: str, start: np.datetime64 | None
+    ) -> pd.DataFrame:
+        start_date = (
+            DEFAULT_START_DATE
+            if start is None
+            else start.astype(datetime).strftime("%Y%m%d")
+        )
+        return self.backend.stock_daily(symbol, start_date, adjust)
+
     def get_kline(
-        self, symbol: str, period: str = "daily", adjust: str = "qfq"
+        self,
+        symbol: str,
+        period: str = "daily",
+        adjust: str = "qfq",
+        compact: bool = False,
+        lookback: int | None = None,
     ) -> pd.DataFrame:
         """
         获取股票历史 K 线数据
+        优先读取本地 K 线存储，仅从上游补拉缺失的尾部数据；周线、月线由本地日线聚合
         :param symbol: 股票代码，例如 '000001'
         :param period: 'daily', 'weekly', 'monthly'
         :param adjust: 复权类型 'qfq' 前复权, 'hfq' 后复权, 'none' 不复权
+        :param compact: 紧凑布局，float32 价格、整数成交量、int32 天数日期
+        :param lookback: 只需要最后 lookback 根 K 线（按 period 计），为空时返回全部历史
         :return: pd.DataFrame 包含 date, open, high, low, close, volume 等
         """
         try:
-            if period == "daily":
-                df = ak.stock_zh_a_daily(
-                    symbol=symbol, start_date="20200101", adjust=adjust
-                )
-            else:
-                raise ValueError(f"不支持的周期类型: {period}")
-            return df
+            check_period(period)
+            key = f"stock/{adjust}/{symbol}"
+            self._sync(
+                key,
+                partial(self._fetch_daily, symbol, adjust),
+                None if lookback is None else daily_lookback(lookback, period),
+            )
+            return KlineStore.to_frame(
+                self.store.read(key, lookback=lookback, period=period), compact=compact
+            )
         except ValueError:
             # 参数错误，重新抛出
             raise
@@ -37,27 +93,84 @@ class StockDataSource:
             logger.exception(f"获取股票 {symbol} K线数据失败: {e}")
             return pd.DataFrame()
 
-    def get_last_n_years_financials(self, symbol: str, n: int = 3) -> pd.DataFrame:
+    def get_kline_arrays(
+        self,
+        symbol: str,
+        adjust: str = "qfq",
+        lookback: int | None = None,
+        period: str = "daily",
+        sync: bool = True,
+    ) -> OhlcvArrays | None:
         """
-        获取财务指标数据，例如 ROE, EPS, 净利润等
-        :param symbol: 股票代码
-        :param years: 最近几年数据，默认5年
-        :return: 包含财务指标的DataFrame
+        以内存映射数组形式获取股票 K 线，供信号计算零拷贝读取
+        同步失败时返回本地已有数据，本地无数据时返回 None
+        :param symbol: 股票代码，例如 'sh600519'
+        :param adjust: 复权类型，同 get_kline
+        :param lookback: 只需要最后 lookback 根 K 线（如策略的预热窗口，按 period 计），
+                         本地无数据时也只从上游下载这段尾部
+        :param period: 'daily', 'weekly', 'monthly'，周线、月线由本地日线聚合
+        :param sync: 为 False 时只读本地存储，用于日线刚同步过、再取其他周期的场景
+        :return: OhlcvArrays(date, open, high, low, close, volume)
         """
-        try:
-            data = []
-            for year in range(years):
-                df = ak.stock_zh_a_financial(
-                    symbol=symbol,
-                    period="yearly",
-                    start_date=f"{start_year}{year + 1}0101",
+        check_period(period)
+        key = f"stock/{adjust}/{symbol}"
+        if sync:
+            try:
+                self._sync(
+                    key,
+                    partial(self._fetch_daily, symbol, adjust),
+                    None if lookback is None else daily_lookback(lookback, period),
                 )
-                data.append(df)
-            return pd.concat(data, axis=0)
-        except Exception as e:
-            logger.error(f"Error fetching financials: {e}")
-            return pd.DataFrame()
+            except Exception as e:
+                logger.exception(f"同步股票 {symbol} K线数据失败: {e}")
+        return self.store.read_arrays(key, lookback, period)
+
+    def get_klines(
+        self,
+        symbols: Iterable[str],
+        adjust: str = "qfq",
+        max_workers: int = DATASOURCE_CONFIG.max_concurrency,
+        compact: bool = False,
+        lookback: int | None = None,
+        period: str = "daily",
+        sync: bool = True,
+    ) -> KlinePanel:
+        """
+        批量获取多只股票 K 线，按日期对齐为 symbols × dates 面板
+        本地存储、并发拉取（受接口限流约束）与日期对齐均在内部完成，
+        无数据的股票不出现在结果中。
+        :param symbols: 股票代码列表，例如 ['sh600519', 'sz000001']
+        :param adjust: 复权类型，同 get_kline
+        :param compact: 紧凑布局，全市场面板建议开启
+        :param lookback: 每只股票只取最后 lookback 根 K 线
+        :param period: 同 get_kline_arrays
+        :param sync: 同 get_kline_arrays
+        :return: KlinePanel，panel.to_frame() 可转为长表
+        """
+        symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                partial(
+                    self.get_kline_arrays,
+                    adjust=adjust,
+                    lookback=lookback,
+                    period=period,
+                    sync=sync,
+                ),
+                symbols,
+            )
+            arrays = {
+                symbol: kline
+                for symbol, kline in zip(symbols, results)
+                if kline is not None and not kline.empty
+            }
 
+        missing = len(symbols) - len(arrays)
+        if missing:
+            logger.warning(f"{missing} 只股票未获取到K线数据")
+        return KlinePanel.from_arrays(arrays, compact=compact)
+
+    @cached(data_cache, expires=expire_at_next_report_season)
     def get_last_n_years_financials(self, symbol: str, n: int = 3) -> pd.DataFrame:
         """
         获取财务指标数据，例如 ROE, EPS, 净利润等
@@ -152,9 +265,7 @@ class StockDataSource:
         """
         try:
             start_year = str(datetime.now().year - n)
-            df = ak.stock_financial_analysis_indicator(
-                symbol=symbol, start_year=start_year
-            )
+            df = self.backend.financial_indicators(symbol, start_year)
             # 可以根据需要提取最新一行数据
             if not df.empty:
                 return df
@@ -166,6 +277,7 @@ class StockDataSource:
             return {}
 
     # 获取个股概要信息
+    @cached(data_cache, expires=expire_after(timedelta(days=7)))
     def get_company_profile(self, symbol: str):
         """
         通过东方财富接口获取指定股票代码的公司基本信息。
@@ -187,7 +299,7 @@ class StockDataSource:
             # 获取个股的概要信息
             # symbol: 股票代码
             # indicator: 用于指定获取信息的类型，这里用 '基本情况'
-            company_info_df = ak.stock_individual_info_em(symbol=symbol)
+            company_info_df = self.backend.company_profile(symbol)
 
             if not company_info_df.empty:
                 info_dict = company_info_df.set_index("item")["value"].to_dict()
@@ -199,6 +311,7 @@ class StockDataSource:
             logger.exception(f"获取股票 {symbol} 公司信息失败: {e}")
             return None
 
+    @cached(data_cache, expires=expire_at_next_close)
     def get_pe_pb(self, symbol: str) -> pd.DataFrame:
         """
                 获取估值指标 PE 和 PB 数据
@@ -212,12 +325,13 @@ class StockDataSource:
         1912  2025-11-20  1467.11 -0.265124  1.837218e+12  1.837218e+12  1252270215  ...  20.407336  21.306479  7.146763  1.272362  21.303770  10.098744
         """
         try:
-            df = ak.stock_value_em(symbol=symbol)
+            df = self.backend.pe_pb(symbol)
             return df
         except Exception as e:
             logger.exception(f"获取股票 {symbol} PE/PB数据失败: {e}")
             return pd.DataFrame()
 
+    @cached(data_cache, expires=expire_at_next_close)
     def get_all_a_shares(self) -> pd.DataFrame:
         """
         获取中国A股市场所有上市公司的股票列表。
@@ -232,12 +346,28 @@ class StockDataSource:
         """
         try:
             # 实际返回的是所有A股的列表及实时数据
-            stock_list_df = ak.stock_info_a_code_name()
+            stock_list_df = self.backend.a_share_list()
             return stock_list_df
         except Exception as e:
             logger.exception(f"获取A股股票列表失败: {e}")
             return pd.DataFrame()
 
+    def get_spot_snapshot(self) -> pd.DataFrame:
+        """
+        获取沪深京 A 股全市场实时行情快照（一次请求）
+        数据源：东方财富
+        :return: 包含 代码, 名称, 最新价, 今开, 最高, 最低, 昨收, 成交量(手) 等列
+        """
+        try:
+            return self.backend.spot_snapshot()
+        except Exception as e:
+            logger.exception(f"获取A股行情快照失败: {e}")
+            return pd.DataFrame()
+
+    def cache_stats(self) -> dict:
+        """资料 / 估值 / 财务等查询缓存的命中统计"""
+        return data_cache.stats()
+
 
 stock_data_source = StockDataSource()
 
@@ -0,0 +1,323 @@
+import os
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，仅保留进程内互斥
+    fcntl = None
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from config import STRATEGY_CONFIG
+from datacenter.backends import DATA_ROOT
+from log import logger
+from utils.stock import extract_code
+
+from .calendar import MARKET_CLOSE, MARKET_TZ, trading_calendar
+from .stock import StockDataSource, stock_data_source
+
+# 估值字段 -> get_pe_pb 中的列名
+VALUATION_FIELDS = {"pe": "PE(TTM)", "pb": "市净率"}
+
+
+def percentile(sorted_values: np.ndarray, value: float) -> float | None:
+    """value 在有序数组中的分位数（0~100），相同取值按中位秩计"""
+    n = len(sorted_values)
+    if not n or value is None or not np.isfinite(value):
+        return None
+    left = np.searchsorted(sorted_values, value, side="left")
+    right = np.searchsorted(sorted_values, value, side="right")
+    return round(float((left + right) / 2 / n * 100), 1)
+
+
+def insert_sorted(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    values = np.sort(values)
+    return np.insert(sorted_values, np.searchsorted(sorted_values, values), values)
+
+
+def remove_sorted(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """从有序数组中逐个删除 values（重复值删除同样多次）"""
+    values = np.sort(values)
+    pos = np.searchsorted(sorted_values, values, side="left")
+    # 相同取值依次落在相邻位置
+    pos += np.arange(len(values)) - np.searchsorted(values, values, side="left")
+    return np.delete(sorted_values, pos)
+
+
+def valid_values(values: np.ndarray) -> np.ndarray:
+    """参与分位统计的取值：亏损（PE 为负）或缺失的数据点没有可比性"""
+    return values[np.isfinite(values) & (values > 0)]
+
+
+class ValuationIndex:
+    """
+    PE / PB 分位数索引
+    每个标的保存回看窗口内的时间序列和只含有效值的有序副本：
+        {root}/{symbol}/date.npy, pe.npy, pb.npy        按日期排列
+        {root}/{symbol}/pe_sorted.npy, pb_sorted.npy    按取值排列
+        {root}/{symbol}/meta.json                       更新时间、窗口、行业
+    每日更新只把新增的数据点二分插入有序副本、把移出窗口的数据点二分删除，
+    查询历史分位为一次二分查找，不再对全量历史排序。
+    """
+
+    def __init__(
+        self,
+        root: str = os.path.join(DATA_ROOT, "valuation"),
+        source: StockDataSource = stock_data_source,
+        history_years: int = STRATEGY_CONFIG.value.history_years,
+    ):
+        self.root = root
+        self.source = source
+        self.history_years = history_years
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def _exclusive(self, key: str, lock_path: str):
+        """
+        同一标的或行业截面的读-改-写在线程间和进程间（如多个监控工作进程）互斥
+        :param lock_path: 用于进程间互斥的锁文件
+        """
+        with self._lock(key):
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            with open(lock_path, "w") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def path(self, symbol: str, name: str) -> str:
+        return os.path.join(self.root, symbol, name)
+
+    # =====================
+    # 读写
+    # =====================
+
+    def meta(self, symbol: str) -> Dict[str, Any]:
+        try:
+            with open(self.path(symbol, "meta.json"), "rb") as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _read(self, symbol: str) -> Dict[str, np.ndarray] | None:
+        names = ["date", *VALUATION_FIELDS, *(f"{f}_sorted" for f in VALUATION_FIELDS)]
+        try:
+            return {
+                name: np.load(self.path(symbol, f"{name}.npy"), mmap_mode="r")
+                for name in names
+            }
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _tmp(path: str) -> str:
+        # 临时文件名各不相同，并发写入同一文件时不会互相覆盖写到一半的临时文件
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    @classmethod
+    def _write_json(cls, path: str, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = cls._tmp(path)
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(tmp, path)
+
+    def _write(self, symbol: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+        for name, values in arrays.items():
+            target = self.path(symbol, f"{name}.npy")
+            tmp = self._tmp(target)
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, target)
+        self._write_json(self.path(symbol, "meta.json"), meta)
+
+    # =====================
+    # 更新
+    # =====================
+
+    @staticmethod
+    def is_fresh(updated_at: datetime, now: datetime) -> bool:
+        """估值为日频数据：最近一次收盘后更新过即可"""
+        last_close = datetime.combine(
+            trading_calendar.last_closed_session(now), MARKET_CLOSE, MARKET_TZ
+        )
+        return updated_at >= last_close
+
+    def _fetch(self, symbol: str) -> Dict[str, np.ndarray] | None:
+        df = self.source.get_pe_pb(extract_code(symbol))
+        if df is None or df.empty:
+            return None
+        df = df.drop_duplicates(subset="数据日期", keep="last").sort_values("数据日期")
+        series = {
+            "date": pd.to_datetime(df["数据日期"]).to_numpy(dtype="datetime64[D]")
+        }
+        for field, col in VALUATION_FIELDS.items():
+            series[field] = pd.to_numeric(df[col], errors="coerce").to_numpy(
+                dtype=np.float64
+            )
+        return series
+
+    def _cutoff(self, last: np.datetime64) -> np.datetime64:
+        return last - np.timedelta64(round(self.history_years * 365.25), "D")
+
+    def _build(self, series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        keep = series["date"] >= self._cutoff(series["date"][-1])
+        arrays = {name: values[keep] for name, values in series.items()}
+        for field in VALUATION_FIELDS:
+            arrays[f"{field}_sorted"] = np.sort(valid_values(arrays[field]))
+        return arrays
+
+    def _append(
+        self, stored: Dict[str, np.ndarray], series: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray] | None:
+        """把新增的数据点并入已有索引，历史数据与上游不一致时返回 None（需要重建）"""
+        dates = stored["date"]
+        last = dates[-1]
+        idx = int(np.searchsorted(series["date"], last))
+        if idx >= len(series["date"]) or series["date"][idx] != last:
+            return None
+        for field in VALUATION_FIELDS:
+            old, new = stored[field][-1], series[field][idx]
+            if not (np.isnan(old) and np.isnan(new)) and not np.isclose(
+                old, new, rtol=1e-6
+            ):
+                return None
+
+        added = {name: values[idx + 1 :] for name, values in series.items()}
+        cutoff = self._cutoff(added["date"][-1] if len(added["date"]) else last)
+        expired = int(np.searchsorted(dates, cutoff))
+
+        arrays = {}
+        for name in ("date", *VALUATION_FIELDS):
+            arrays[name] = np.concatenate([stored[name][expired:], added[name]])
+        for field in VALUATION_FIELDS:
+            sorted_values = remove_sorted(
+                np.asarray(stored[f"{field}_sorted"]),
+                valid_values(np.asarray(stored[field][:expired])),
+            )
+            arrays[f"{field}_sorted"] = insert_sorted(
+                sorted_values, valid_values(added[field])
+            )
+        return arrays
+
+    def _industry(self, symbol: str) -> str | None:
+        profile = self.source.get_company_profile(extract_code(symbol))
+        industry = profile.get("行业") if profile else None
+        return str(industry) if industry else None
+
+    def update(self, symbol: str) -> bool:
+        """
+        把标的的估值索引更新到最近一个交易日，返回本地是否有可用索引
+        同一交易日内只访问一次上游；上游失败时沿用本地已有索引，
+        并在 meta 中记录失败时间，到下一次收盘前不再重试。
+        """
+        with self._exclusive(symbol, self.path(symbol, ".lock")):
+            now = trading_calendar.now()
+            meta = self.meta(symbol)
+            stored = self._read(symbol) if meta else None
+            if (
+                stored is not None
+                and meta.get("history_years") == self.history_years
+                and self.is_fresh(datetime.fromisoformat(meta["updated_at"]), now)
+            ):
+                return True
+            if meta.get("failed_at") and self.is_fresh(
+                datetime.fromisoformat(meta["failed_at"]), now
+            ):
+                return stored is not None
+
+            try:
+                series = self._fetch(symbol)
+            except Exception as e:
+                logger.warning(f"获取 {symbol} 估值数据失败: {e}")
+                series = None
+            if series is None:
+                self._write_json(
+                    self.path(symbol, "meta.json"),
+                    {**meta, "failed_at": now.isoformat()},
+                )
+                return stored is not None
+
+            arrays = None
+            if stored is not None and meta.get("history_years") == self.history_years:
+                arrays = self._append(stored, series)
+            if arrays is None:
+                arrays = self._build(series)
+
+            industry = meta.get("industry")
+            if industry is None:
+                try:
+                    industry = self._industry(symbol)
+                except Exception as e:
+                    logger.warning(f"获取 {symbol} 所属行业失败: {e}")
+
+            self._write(
+                symbol,
+                arrays,
+                {
+                    "updated_at": now.isoformat(),
+                    "history_years": self.history_years,
+                    "industry": industry,
+                },
+            )
+        return True
+
+    def refresh(self, symbols: Iterable[str]) -> Counter:
+        """
+        收盘后批量更新估值索引（定时任务），评估信号时只读取本地索引
+        :return: 有可用索引（ok）与缺失（missing）的标的数
+        """
+        stats = Counter()
+        for symbol in symbols:
+            stats["ok" if self.update(symbol) else "missing"] += 1
+        logger.info(f"估值索引更新完成: {dict(stats)}")
+        return stats
+
+    # =====================
+    # 查询
+    # =====================
+
+    def query(self, symbol: str, update: bool = True) -> Dict[str, Any] | None:
+        """
+        当前估值及其历史分位（0~100）
+        :param update: 先按需更新索引（每个交易日至多访问一次上游）
+        :return: 无估值数据时返回 None
+        """
+        if update:
+            self.update(symbol)
+        stored = self._read(symbol)
+        if stored is None or not len(stored["date"]):
+            return None
+
+        meta = self.meta(symbol)
+        result: Dict[str, Any] = {
+            "date": str(stored["date"][-1]),
+            "industry": meta.get("industry"),
+        }
+        for field in VALUATION_FIELDS:
+            value = float(stored[field][-1])
+            result[field] = None if np.isnan(value) else round(value, 2)
+            result[f"{field}_percentile"] = (
+                percentile(stored[f"{field}_sorted"], value) if value > 0 else None
+            )
+        return result
+
+
+valuation_index = ValuationIndex()
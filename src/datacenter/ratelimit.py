@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from config import DATASOURCE_CONFIG, DataSourceConfig
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+    以 rate 个/秒的速度补充令牌，最多积攒 burst 个；取不到令牌时阻塞等待。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    按上游接口（akshare 函数名）限流
+    只在真正发起网络请求时消耗令牌，命中本地存储或缓存的调用不受影响。
+    """
+
+    def __init__(self, config: DataSourceConfig):
+        self.buckets: Dict[str, TokenBucket] = {
+            endpoint: TokenBucket(limit.rate, limit.burst)
+            for endpoint, limit in config.rate_limits.items()
+        }
+
+    def acquire(self, endpoint: str):
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None:
+            bucket.acquire()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """限流后调用上游接口，以函数名作为接口名"""
+        self.acquire(fn.__name__)
+        return fn(*args, **kwargs)
+
+
+rate_limiter = RateLimiter(DATASOURCE_CONFIG)
@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config import SCREENER_CONFIG, STRATEGY_CONFIG
+from config.strategy import StrategyConfig
+from datacenter.market.panel import KlinePanel
+from datacenter.market.stock import StockDataSource, stock_data_source
+
+from .panel_engine import TREND_TYPES, PanelEngine, align_right
+
+DEFAULT_HORIZONS = (5, 10, 20)
+# 回测统计的信号（逐根 K 线的状态）：
+# entry 为结构向好（上升趋势、趋势内回调或突破）且择时通过，即策略提示可以关注的时点
+SIGNAL_NAMES = ("uptrend", "pullback", "breakout", "timing_ok", "entry")
+STATS_COLUMNS = ("count", "hits", "total_return", "hit_rate", "mean_return")
+
+
+@dataclass
+class BacktestResult:
+    """
+    一组股票的逐根 K 线回测结果
+    每个标的一行，按其自身的 K 线右对齐（左侧补 NaN），列数为面板中最长的历史长度。
+    """
+
+    strategy: str
+    symbols: np.ndarray  # (S,)
+    dates: np.ndarray  # (S, T) datetime64[D]，缺失处为 NaT
+    outputs: Dict[str, np.ndarray]  # PanelEngine.series 的输出，(S, T)
+    signals: Dict[str, np.ndarray]  # SIGNAL_NAMES -> (S, T) 布尔数组
+    forward_returns: Dict[int, np.ndarray]  # 持有 h 根 K 线后的收益率 -> (S, T)
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """单个标的的信号时间序列，以日期为索引"""
+        row = int(np.flatnonzero(self.symbols == symbol)[0])
+        valid = ~np.isnat(self.dates[row])
+        data = {col: values[row, valid] for col, values in self.outputs.items()}
+        data["trend"] = TREND_TYPES[data["trend"]]
+        data.update({name: sig[row, valid] for name, sig in self.signals.items()})
+        data.update(
+            {f"ret_{h}": ret[row, valid] for h, ret in self.forward_returns.items()}
+        )
+        return pd.DataFrame(data, index=pd.Index(self.dates[row, valid], name="date"))
+
+    def stats(self) -> pd.DataFrame:
+        """
+        按标的 × 信号 × 持有期统计：出现次数、上涨次数、命中率与平均收益
+        signal 为 all 的行是不加条件的基准（全部 K 线）
+        """
+        frames = []
+        for h, ret in self.forward_returns.items():
+            has_ret = ~np.isnan(ret)
+            conditions = {"all": has_ret, **self.signals}
+            for name, signal in conditions.items():
+                mask = signal & has_ret
+                count = mask.sum(axis=1)
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "symbol": self.symbols,
+                            "signal": name,
+                            "horizon": h,
+                            "count": count,
+                            "hits": (mask & (ret > 0)).sum(axis=1),
+                            "total_return": np.where(mask, ret, 0).sum(axis=1),
+                        }
+                    )
+                )
+        df = pd.concat(frames, ignore_index=True)
+        return _with_rates(df).set_index(["symbol", "signal", "horizon"]).sort_index()
+
+
+def _with_rates(df: pd.DataFrame) -> pd.DataFrame:
+    count = df["count"].replace(0, np.nan)
+    return df.assign(
+        hit_rate=df["hits"] / count, mean_return=df["total_return"] / count
+    )
+
+
+def summarize(stats: pd.DataFrame, strategy: str) -> pd.DataFrame:
+    """把逐标的统计汇总为策略整体的命中率与平均收益（按出现次数加权）"""
+    totals = (
+        stats[["count", "hits", "total_return"]]
+        .groupby(level=["signal", "horizon"])
+        .sum()
+        .reset_index()
+    )
+    totals.insert(0, "strategy", strategy)
+    return _with_rates(totals).set_index(["strategy", "signal", "horizon"])
+
+
+class BacktestEngine:
+    """
+    向量化历史回测
+    用 PanelEngine.series 对每个标的的每一根 K 线同时计算 StructureSignal 与 TimingSignal，
+    第 t 根的结果与只用前 t+1 根 K 线逐只计算一致；再计算各持有期的前瞻收益与命中率。
+    整段历史只需一次向量化计算，开销与逐只评估最新一根相当。
+    """
+
+    def __init__(
+        self,
+        config: StrategyConfig = STRATEGY_CONFIG,
+        source: StockDataSource = stock_data_source,
+        horizons: Sequence[int] = DEFAULT_HORIZONS,
+    ):
+        self.config = config
+        self.source = source
+        self.horizons = tuple(horizons)
+        self.engine = PanelEngine(config, source)
+
+    @staticmethod
+    def forward_returns(close: np.ndarray, h: int) -> np.ndarray:
+        ret = np.full(close.shape, np.nan, dtype=close.dtype)
+        if close.shape[-1] > h:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ret[..., :-h] = close[..., h:] / close[..., :-h] - 1
+        return ret
+
+    def run_panel(self, panel: KlinePanel) -> BacktestResult:
+        fields, dates = align_right(panel, len(panel.dates))
+        return self.run_aligned(panel.symbols, fields, dates)
+
+    def run_aligned(
+        self,
+        symbols: np.ndarray,
+        fields: Dict[str, np.ndarray],
+        dates: np.ndarray,
+    ) -> BacktestResult:
+        """对 align_right 得到的右对齐矩阵回测，fields 不会被修改"""
+        outputs = self.engine.series(fields)
+        uptrend = outputs["trend"] == 0
+        structure = uptrend | outputs["pullback"] | outputs["breakout"]
+        signals = {
+            "uptrend": uptrend,
+            "pullback": outputs["pullback"],
+            "breakout": outputs["breakout"],
+            "timing_ok": outputs["timing_ok"],
+            "entry": structure & outputs["timing_ok"],
+        }
+        return BacktestResult(
+            strategy=self.config.strategy.id,
+            symbols=symbols,
+            dates=dates,
+            outputs=outputs,
+            signals=signals,
+            forward_returns={
+                h: self.forward_returns(fields["close"], h) for h in self.horizons
+            },
+        )
+
+    def run(
+        self, symbols: Iterable[str], adjust: str = "qfq", compact: bool = False
+    ) -> BacktestResult:
+        """加载一组股票的全部历史并回测"""
+        panel = self.source.get_klines(symbols, adjust, compact=compact)
+        return self.run_panel(panel)
+
+    def run_stats(
+        self,
+        symbols: Iterable[str],
+        adjust: str = "qfq",
+        chunk_size: int = SCREENER_CONFIG.chunk_size,
+    ) -> pd.DataFrame:
+        """
+        分批回测大量股票，只保留逐标的统计，内存占用由 chunk_size 决定
+        :return: 同 BacktestResult.stats，可再用 summarize 汇总
+        """
+        symbols = list(dict.fromkeys(symbols))
+        frames = []
+        for start in range(0, len(symbols), chunk_size):
+            chunk = symbols[start : start + chunk_size]
+            frames.append(self.run(chunk, adjust, compact=True).stats())
+            logger.info(
+                f"回测进度 {min(start + chunk_size, len(symbols))}/{len(symbols)}"
+            )
+        if not frames:
+            return pd.DataFrame(columns=STATS_COLUMNS)
+        return pd.concat(frames)
+
+    def summary(self, stats: pd.DataFrame) -> pd.DataFrame:
+        return summarize(stats, self.config.strategy.id)
+
+
+backtest_engine = BacktestEngine()
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+import orjson
+
+from config import MONITOR_CONFIG
+from datacenter.backends import DATA_ROOT
+from utils.json import to_json
+from utils.sqlite import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, symbol, stage)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checkpoints_by_time ON checkpoints (updated_at);
+"""
+
+# 标的在本次运行中已全部完成（已推送，或状态未变化无需推送）
+DONE = "done"
+
+
+class CheckpointStore:
+    """
+    监控运行的检查点（SQLite）
+    每完成一个阶段记录一条 (run_id, symbol, stage)，附带该阶段的产出（信号结果、解读文案），
+    进程中断后以同一 run_id 重跑时，已完成的阶段直接使用记录的产出，不再重复获取、解读与推送。
+    """
+
+    def __init__(
+        self,
+        path: str | None = MONITOR_CONFIG.state_db_path,
+        retention_days: int = MONITOR_CONFIG.checkpoint_days,
+    ):
+        self.path = path or os.path.join(DATA_ROOT, "monitor.db")
+        self.retention_days = retention_days
+        # 与信号状态共用 monitor.db，同一进程内共用连接
+        self.db = open_database(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect(SCHEMA, self._prune)
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        with conn:
+            conn.execute(
+                "DELETE FROM checkpoints WHERE updated_at < ?",
+                (cutoff.isoformat(timespec="seconds"),),
+            )
+
+    def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """本次运行已完成的阶段：symbol -> {stage: payload}"""
+        progress: Dict[str, Dict[str, Any]] = {}
+        rows = self._connect().execute(
+            "SELECT symbol, stage, payload FROM checkpoints WHERE run_id = ?", (run_id,)
+        )
+        for symbol, stage, payload in rows:
+            progress.setdefault(symbol, {})[stage] = orjson.loads(payload)
+        return progress
+
+    def mark(self, run_id: str, symbol: str, stage: str, payload: Any = None):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    symbol,
+                    stage,
+                    to_json(payload),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+
+checkpoint_store = CheckpointStore()
@@ -1,15 +1,46 @@
+from config import STRATEGY_CONFIG
+from config.strategy import StrategyConfig
 from datacenter.market.index import index_data_source
+from datacenter.market.kline_store import OhlcvArrays
+from datacenter.market.resample import daily_lookback
 from loguru import logger
+from signals.indicators import IndicatorCache
 from signals.structrue_signal import StructureSignal
 from notifiers.formater.index import format_index_trend_message
 
 
 class IndexEngine:
-    def evaluate(self, index_code: str):
-        context = {}
-        context["kline"] = index_data_source.get_kline(index_code)
-        signal = StructureSignal()
-        context["result"] = signal.evaluate(context)
+    def __init__(self, config: StrategyConfig = STRATEGY_CONFIG):
+        self.config = config
+        self.signal = StructureSignal()
+
+    def lookback(self) -> int:
+        """需要加载的日线根数，趋势周期为周线、月线时按日线折算"""
+        return daily_lookback(
+            self.signal.lookback(self.config), self.config.trend.period
+        )
+
+    def evaluate(self, index_code: str, kline: OhlcvArrays | None = None):
+        context = {"config": self.config}
+        lookback = self.lookback()
+        if kline is None:
+            kline = index_data_source.get_kline_arrays(index_code, lookback=lookback)
+        if kline is None:
+            raise ValueError(f"未获取到指数 {index_code} 的K线数据")
+        period = self.config.trend.period
+        if period != "daily":
+            # 日线已同步，周期 K 线由本地日线聚合
+            kline = index_data_source.get_kline_arrays(
+                index_code,
+                lookback=self.signal.lookback(self.config),
+                period=period,
+                sync=False,
+            )
+            if kline is None:
+                raise ValueError(f"未获取到指数 {index_code} 的{period} K线数据")
+        context["kline"] = kline.tail(lookback)
+        context["indicators"] = IndicatorCache(context["kline"])
+        context["result"] = self.signal.evaluate(context)
         return context
 
 
@@ -0,0 +1,135 @@
+import time
+from datetime import date
+from typing import Any, Dict
+
+import numpy as np
+from loguru import logger
+
+from config import MONITOR_CONFIG, MonitorConfig
+from datacenter.market.calendar import trading_calendar
+from datacenter.market.snapshot import snapshot_to_bars
+from datacenter.market.stock import StockDataSource, stock_data_source
+from notifiers.formater.stock import format_state_change_message
+from notifiers.manager import notification_manager
+from signals.streaming import StreamingState
+
+from .signal_state import SignalStateStore, signal_state_store
+from .streaming_engine import StreamingSignalEngine, streaming_signal_engine
+
+
+class IntradayMonitor:
+    """
+    盘中监控
+    每个交易日首次检查时为关注列表加载流式信号状态（最后一根已收盘 K 线上的指标增量状态），
+    之后每次检查只请求一次全市场快照，把快照作为未收盘 K 线交给状态 peek：
+    不重新获取历史 K 线、不修改持久化状态，每只股票为常数时间。
+    与上一次检查相比信号状态（趋势、回调、突破、择时）发生变化时，直接推送简短的变化通知。
+    """
+
+    def __init__(
+        self,
+        watchlist: dict,
+        config: MonitorConfig = MONITOR_CONFIG,
+        engine: StreamingSignalEngine = streaming_signal_engine,
+        source: StockDataSource = stock_data_source,
+        state_store: SignalStateStore = signal_state_store,
+    ):
+        self.watchlist = watchlist
+        self.config = config
+        self.engine = engine
+        self.source = source
+        self.state_store = state_store
+        self.day: date | None = None
+        # symbol -> 当日的流式状态 / 上一次检查的信号状态
+        self.states: Dict[str, StreamingState] = {}
+        self.last: Dict[str, Dict[str, Any]] = {}
+
+    def prepare(self, day: date | None = None):
+        """
+        加载当日各标的的流式状态（会按需从上游同步日线），可在开盘前调用，
+        否则在当日首次检查时执行
+        """
+        day = day or trading_calendar.today()
+        states, last = {}, {}
+        for symbol in dict.fromkeys(self.watchlist.values()):
+            try:
+                state = self.engine.state(symbol)
+            except Exception as e:
+                logger.exception(f"加载 {symbol} 流式状态失败: {e}")
+                continue
+            if state is None:
+                continue
+            states[symbol] = state
+            last[symbol] = self.state_store.state(state.result(self.engine.config))
+        self.states, self.last, self.day = states, last, day
+        logger.info(f"盘中监控：已加载 {len(states)} 只股票的流式状态")
+
+    def _peek(self, symbol: str, bar: Dict[str, Any]) -> dict:
+        state = self.states[symbol]
+        if str(bar["date"]) == state.date:
+            # 当日 K 线已入库（如收盘后补跑），退回引擎按预热窗口计算
+            return self.engine.peek(symbol, bar)["result"]
+        return state.peek(bar, self.engine.config)
+
+    def tick(self) -> Dict[str, Dict[str, Any]]:
+        """
+        执行一次盘中检查
+        :return: 信号状态发生变化的标的 -> 变化的字段 (旧值, 新值)
+        """
+        now = trading_calendar.now()
+        if not trading_calendar.in_continuous_trading(now):
+            return {}
+        if self.day != now.date():
+            self.prepare(now.date())
+
+        started, cpu_started = time.perf_counter(), time.process_time()
+        df = self.source.get_spot_snapshot()
+        if df.empty:
+            logger.warning("行情快照为空，跳过本次盘中检查")
+            return {}
+        records = snapshot_to_bars(df).to_dict("index")
+        day = np.datetime64(now.date(), "D")
+
+        transitions = {}
+        for name, symbol in self.watchlist.items():
+            record = records.get(symbol)
+            if record is None or symbol not in self.states:
+                continue
+            try:
+                result = self._peek(symbol, {"date": day, **record})
+            except Exception as e:
+                logger.exception(f"{symbol} 盘中信号计算失败: {e}")
+                continue
+            state = self.state_store.state(result)
+            previous = self.last.get(symbol, {})
+            changes = {
+                field: (previous.get(field), value)
+                for field, value in state.items()
+                if previous.get(field) != value
+            }
+            if changes:
+                result["name"] = name
+                try:
+                    notification_manager.notify(
+                        format_state_change_message(result, changes)
+                    )
+                except RuntimeError as e:
+                    # 不记录新状态，下一次检查时重新推送
+                    logger.warning(f"{symbol} 盘中信号推送失败: {e}")
+                    continue
+                transitions[symbol] = changes
+            self.last[symbol] = state
+
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        message = (
+            f"盘中检查完成：{len(self.states)} 只股票，{len(transitions)} 只信号变化，"
+            f"耗时 {elapsed:.2f}s（CPU {cpu:.2f}s）"
+        )
+        if elapsed > self.config.intraday_latency_budget:
+            logger.warning(
+                f"{message}，超出 {self.config.intraday_latency_budget:g}s 的延迟预算"
+            )
+        else:
+            logger.info(message)
+        return transitions
@@ -1,24 +1,55 @@
-import time
+import asyncio
 
 from loguru import logger
 
 from agents.index_explainer import explain_index_trend
 from agents.stock_explainer import explain_stock_trend
+from config import MONITOR_CONFIG, MonitorConfig
+from datacenter.market.async_source import (
+    async_index_data_source,
+    async_stock_data_source,
+)
+from datacenter.market.calendar import trading_calendar
+from datacenter.market.kline_store import OhlcvArrays
 from notifiers.manager import notification_manager
 
+from .checkpoint import DONE, CheckpointStore, checkpoint_store
 from .index_engine import IndexEngine
+from .pipeline import Pipeline, Stage
 from .signal_engine import SignalEngine
+from .signal_state import SignalStateStore, signal_state_store
+from .work_queue import evaluate_sharded
+
+# 检查点中指数总结使用的标的名
+INDEX_KEY = "__index__"
 
 
 class StockMonitor:
-    def __init__(self, watchlist: dict, index_pool: dict, config: dict = {}):
+    def __init__(
+        self,
+        watchlist: dict,
+        index_pool: dict,
+        config: MonitorConfig = MONITOR_CONFIG,
+        state_store: SignalStateStore = signal_state_store,
+        checkpoints: CheckpointStore = checkpoint_store,
+        run_id: str | None = None,
+    ):
+        """
+        :param run_id: 运行标识，默认每个自然日一次；以同一 run_id 重跑时从检查点继续
+        """
         self.watchlist = watchlist
         self.index_pool = index_pool
         self.config = config
+        self.state_store = state_store
+        self.checkpoints = checkpoints
+        self.run_id = run_id or f"monitor:{trading_calendar.today()}"
+        self.signal_engine = SignalEngine()
 
-    def check_index(self, index_symbol: str, index_name: str):
+    def check_index(
+        self, index_symbol: str, index_name: str, kline: OhlcvArrays | None = None
+    ):
         index_engine = IndexEngine()
-        context = index_engine.evaluate(index_symbol)
+        context = index_engine.evaluate(index_symbol, kline)
         result = context["result"]
         result.update(
             {
@@ -27,43 +58,197 @@ class StockMonitor:
         )
         return result
 
-    def check_stock(self, symbol: str, stock_name: str):
-        signal_engine = SignalEngine()
-        context = signal_engine.evaluate(symbol)
+    def check_stock(
+        self, symbol: str, stock_name: str, kline: OhlcvArrays | None = None
+    ):
+        item = {"symbol": symbol, "name": stock_name, "kline": kline}
+        self.notify_stock(self.explain_stock(self.evaluate_stock(item)))
+
+    # =====================
+    # 关注列表流水线的各阶段，条目为 {"symbol", "name", ...} 字典，逐阶段补充字段
+    # 每个阶段完成后记录检查点，从检查点恢复的条目已带有 result / message，对应阶段直接跳过
+    # =====================
+
+    async def fetch_stock(self, item: dict) -> dict:
+        if "result" in item:
+            return item
+        item["kline"] = await async_stock_data_source.get_kline_arrays(
+            item["symbol"], lookback=self.signal_engine.lookback()
+        )
+        return item
+
+    def evaluate_stock(self, item: dict) -> dict:
+        context = self.signal_engine.evaluate(item["symbol"], item.get("kline"))
         result = context["result"]
         result.update(
             {
-                "name": stock_name,
+                "name": item["name"],
             }
         )
-        message = explain_stock_trend(result)
-        logger.debug(message)
-        notification_manager.notify(f"""
-        {message}\n━━━━━━━━━━━━━━━━
-        """)
+        item["result"] = result
+        # 后续阶段不再需要 K 线，尽早释放
+        item.pop("kline", None)
+        return item
+
+    def evaluate_changed(self, item: dict) -> dict | None:
+        """
+        计算信号并与上一次保存的状态比较，状态未变化的标的只更新保存的结果，
+        不再进入解读与推送阶段；信号已由工作进程算好的条目只做比较
+        """
+        if "changes" in item:
+            return item
+        if "result" not in item:
+            item = self.evaluate_stock(item)
+        changes = self.state_store.diff(item["symbol"], item["result"])
+        if not changes and not self.config.notify_unchanged:
+            self.state_store.save(item["symbol"], item["result"])
+            self.checkpoints.mark(self.run_id, item["symbol"], DONE)
+            return None
+        logger.debug(f"{item['symbol']} 信号状态变化: {changes}")
+        item["changes"] = changes
+        self.checkpoints.mark(
+            self.run_id,
+            item["symbol"],
+            "evaluate",
+            {"result": item["result"], "changes": changes},
+        )
+        return item
+
+    def explain_stock(self, item: dict) -> dict:
+        item["message"] = explain_stock_trend(item["result"])
+        logger.debug(item["message"])
+        return item
+
+    def explain_pending(self, item: dict) -> dict:
+        if "message" not in item:
+            item = self.explain_stock(item)
+            self.checkpoints.mark(
+                self.run_id, item["symbol"], "explain", {"message": item["message"]}
+            )
+        return item
+
+    def notify_stock(self, item: dict, idempotency_key: str | None = None):
+        notification_manager.notify(
+            f"""
+        {item["message"]}\n━━━━━━━━━━━━━━━━
+        """,
+            idempotency_key=idempotency_key,
+        )
+        # 任一渠道推送失败时 notify 抛出异常，不记录新状态，
+        # 解读或推送失败的标的下次运行仍会发现状态变化并重试
+        self.state_store.save(item["symbol"], item["result"])
+
+    def notify_pending(self, item: dict):
+        # 推送后、写检查点前中断时，幂等键保证重跑不会重复推送
+        self.notify_stock(item, f"{self.run_id}:{item['symbol']}")
+        self.checkpoints.mark(self.run_id, item["symbol"], DONE)
+
+    def stock_pipeline(self) -> Pipeline:
+        """
+        获取 K 线 → 计算信号 → LLM 解读 → 推送，各阶段按 MonitorConfig 配置并发数，
+        以有界队列衔接：网络请求、指标计算与 LLM、通知调用相互重叠；
+        信号状态与上一次运行相同的标的在计算信号后即结束
+        """
+        cfg = self.config
+        return Pipeline(
+            [
+                Stage("fetch", self.fetch_stock, cfg.fetch_workers),
+                Stage("evaluate", self.evaluate_changed, cfg.evaluate_workers),
+                Stage("explain", self.explain_pending, cfg.explain_workers),
+                Stage("notify", self.notify_pending, cfg.notify_workers),
+            ],
+            queue_size=cfg.queue_size,
+            key=lambda item: item["symbol"],
+        )
 
     def run(self):
-        index_result = []
-        for name, symbol in self.index_pool.items():
-            try:
-                result = self.check_index(symbol, name)
-                index_result.append(result)
-                time.sleep(1)
-            except Exception as e:
-                logger.exception(f"Error processing {symbol}: {e}")
-
-        message = explain_index_trend(index_result)
-        # logger.debug(message)
-        notification_manager.notify(f"""
-        {message}\n━━━━━━━━━━━━━━━━
-        """)
+        asyncio.run(self.arun())
+
+    async def arun(self):
+        """
+        先生成指数总结，再以流水线处理关注列表（推送顺序为各股票的完成顺序）
+        K 线由异步数据源并发获取，受并发上限与接口限流约束；
+        同一 run_id 中断后重跑时，只处理检查点中尚未完成的标的与阶段
+        """
+        progress = self.checkpoints.load(self.run_id)
+        if progress:
+            logger.info(
+                f"从检查点继续运行 {self.run_id}："
+                f"{sum(DONE in stages for stages in progress.values())} 项已完成"
+            )
+
+        index_progress = progress.get(INDEX_KEY, {})
+        if DONE not in index_progress:
+            await self.run_index(index_progress)
 
+        items = []
         for name, symbol in self.watchlist.items():
-            try:
-                self.check_stock(symbol, name)
-                time.sleep(1)
-            except Exception as e:
-                logger.exception(f"Error processing {symbol}: {e}")
+            stages = progress.get(symbol, {})
+            if DONE in stages:
+                continue
+            item = {"symbol": symbol, "name": name}
+            for stage in ("evaluate", "explain"):
+                item.update(stages.get(stage) or {})
+            items.append(item)
+        if self.config.workers > 0:
+            items = await self.evaluate_in_workers(items)
+        await self.stock_pipeline().run(items)
+
+    async def evaluate_in_workers(self, items: list) -> list:
+        """
+        经任务队列由多个工作进程计算信号，结果并入条目后再交给流水线做比较、解读与推送
+        计算失败的标的不再进入流水线
+        """
+        pending = {item["symbol"] for item in items if "result" not in item}
+        if not pending:
+            return items
+        results = await asyncio.to_thread(
+            evaluate_sharded, self.run_id, list(pending), self.config
+        )
+        evaluated = []
+        for item in items:
+            if item["symbol"] in pending:
+                result = results.get(item["symbol"])
+                if result is None:
+                    continue
+                item["result"] = {**result, "name": item["name"]}
+            evaluated.append(item)
+        return evaluated
+
+    async def run_index(self, progress: dict):
+        if "explain" in progress:
+            message = progress["explain"]["message"]
+        else:
+            # 只加载策略预热窗口内的 K 线
+            index_klines = await async_index_data_source.get_kline_arrays_many(
+                self.index_pool.values(), lookback=IndexEngine().lookback()
+            )
+            index_result = []
+            for name, symbol in self.index_pool.items():
+                try:
+                    result = self.check_index(symbol, name, index_klines[symbol])
+                    index_result.append(result)
+                except Exception as e:
+                    logger.exception(f"Error processing {symbol}: {e}")
+
+            message = await asyncio.to_thread(explain_index_trend, index_result)
+            # logger.debug(message)
+            self.checkpoints.mark(
+                self.run_id, INDEX_KEY, "explain", {"message": message}
+            )
+
+        try:
+            notification_manager.notify(
+                f"""
+        {message}\n━━━━━━━━━━━━━━━━
+        """,
+                idempotency_key=f"{self.run_id}:{INDEX_KEY}",
+            )
+        except RuntimeError as e:
+            # 不标记完成，重跑时只补发失败的渠道；关注列表照常处理
+            logger.warning(f"指数总结推送失败: {e}")
+            return
+        self.checkpoints.mark(self.run_id, INDEX_KEY, DONE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config import STRATEGY_CONFIG
+from config.strategy import StrategyConfig
+from datacenter.market.panel import PANEL_FIELDS, KlinePanel
+from datacenter.market.stock import StockDataSource, stock_data_source
+from signals.base import TrendType
+from signals.structrue_signal import StructureSignal
+from signals.indicators import cci, float_dtype, rolling_mean, rolling_nanmax, rsi
+
+from .signal_engine import SignalEngine
+
+# np.select 的取值顺序与 StructureSignal.judge 的分支一致
+TREND_TYPES = np.array(
+    [TrendType.UPTREND, TrendType.NEUTRAL, TrendType.DOWNTREND], dtype=object
+)
+
+RESULT_COLUMNS = (
+    "price",
+    "ma_short",
+    "ma_long",
+    "trend",
+    "pullback",
+    "breakout",
+    "volume",
+    "volume_ma",
+    "volume_ok",
+    "rsi",
+    "rsi_ok",
+    "cci",
+    "cci_ok",
+    "timing_ok",
+)
+# 与 judge 中保留两位小数的列一致
+ROUNDED_COLUMNS = ("price", "ma_short", "ma_long", "volume", "volume_ma", "rsi", "cci")
+
+
+def align_right(panel: KlinePanel, n: int) -> tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    把每个标的自己的最后 n 根 K 线右对齐到 (S, n) 的矩阵中
+    各标的最后交易日可能不同（停牌），按行稳定排序把缺失值移到左侧，
+    与逐只计算时 kline.tail(n) 取到的 K 线一一对应；不足 n 根的左侧为 NaN。
+    :return: (各字段矩阵, 对应的 (S, n) 日期矩阵，缺失处为 NaT)
+    """
+    valid = ~np.isnan(panel.close)
+    order = np.argsort(valid, axis=1, kind="stable")[:, -n:]
+    fields = {}
+    for field in PANEL_FIELDS:
+        values = np.take_along_axis(panel[field], order, axis=1)
+        if values.dtype.kind != "f":
+            # 紧凑布局的整数成交量：缺失处为 0，换成浮点 NaN 以免计入均值
+            values = values.astype(float_dtype(values))
+        fields[field] = values
+    aligned_valid = np.take_along_axis(valid, order, axis=1)
+    for field in PANEL_FIELDS:
+        fields[field][~aligned_valid] = np.nan
+    dates = panel.dates[order]
+    dates[~aligned_valid] = np.datetime64("NaT")
+    return fields, dates
+
+
+class PanelEngine:
+    """
+    横截面面板引擎
+    对 symbols × dates 面板一次性向量化计算 StructureSignal 与 TimingSignal 的全部输出，
+    结果与 SignalEngine 逐只计算一致，全市场几千只股票的评估为秒级。
+    """
+
+    def __init__(
+        self,
+        config: StrategyConfig = STRATEGY_CONFIG,
+        source: StockDataSource = stock_data_source,
+    ):
+        self.config = config
+        self.source = source
+        self.lookback = SignalEngine(config).lookback()
+        # 结构信号的预热窗口，按 trend.period 计
+        self.trend_lookback = StructureSignal().lookback(config)
+
+    def judge(self, v: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        StructureSignal.judge 与 TimingSignal.judge 的向量化版本，输入为任意形状的指标数组
+        :return: trend 为 TREND_TYPES 的下标（int8），其余为布尔数组
+        """
+        cfg = self.config
+        pullback_cfg = cfg.trend.pullback
+        price, ma_short, ma_long = v["price"], v["ma_short"], v["ma_long"]
+
+        # ===== 结构信号 =====
+        trend = np.select(
+            [(price > ma_short) & (ma_short > ma_long), price > ma_long],
+            [0, 1],
+            default=2,
+        ).astype(np.int8)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pullback = (
+                (price < ma_short)
+                & (price > ma_long)
+                & ((ma_short - price) / ma_short <= pullback_cfg.threshold)
+            )
+        pullback &= pullback_cfg.enabled
+        breakout = (v["prev_price"] <= v["resistance"]) & (
+            price > v["resistance"] * (1 + cfg.trend.breakout.buffer)
+        )
+
+        # ===== 择时信号 =====
+        volume_ok = v["volume"] >= v["volume_ma"] * cfg.volume.min_ratio
+        rsi_ok = (cfg.rsi.min <= v["rsi"]) & (v["rsi"] <= cfg.rsi.max)
+        cci_ok = (cfg.cci.min <= v["cci"]) & (v["cci"] <= cfg.cci.max)
+
+        return {
+            "trend": trend,
+            "pullback": pullback,
+            "breakout": breakout,
+            "volume_ok": volume_ok,
+            "rsi_ok": rsi_ok,
+            "cci_ok": cci_ok,
+            "timing_ok": volume_ok & rsi_ok & cci_ok,
+        }
+
+    def _outputs(
+        self, values: Dict[str, np.ndarray], flags: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        merged = {**values, **flags}
+        return {col: merged[col] for col in RESULT_COLUMNS}
+
+    def compute(
+        self,
+        fields: Dict[str, np.ndarray],
+        trend_fields: Dict[str, np.ndarray] | None = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        按最后一列（各标的最新一根 K 线）计算信号，只对最后一个窗口求指标
+        :param fields: 日线 open/high/low/close/volume 的 (S, T) 矩阵，T 至少为预热窗口
+        :param trend_fields: 趋势周期（周线、月线）的同名矩阵，行与 fields 一致；
+                             为空时结构信号同样使用日线
+        :return: 各输出列的 (S,) 数组
+        """
+        cfg = self.config
+        ma_cfg = cfg.trend.moving_averages
+        n = cfg.volume.ma_window
+        close, volume = fields["close"], fields["volume"]
+        trend_close = close if trend_fields is None else trend_fields["close"]
+
+        values = {
+            "price": trend_close[:, -1],
+            "prev_price": trend_close[:, -2],
+            "ma_short": rolling_mean(trend_close[:, -ma_cfg.short :], ma_cfg.short)[
+                :, -1
+            ],
+            "ma_long": rolling_mean(trend_close[:, -ma_cfg.long :], ma_cfg.long)[:, -1],
+            # 最新一根之前 N 根的最高价；fmax 忽略 NaN（同 nanmax），整行缺失时为 NaN 且不告警
+            "resistance": np.fmax.reduce(
+                trend_close[:, -cfg.trend.breakout.resistance_window - 1 : -1], axis=1
+            ),
+            "volume": volume[:, -1],
+            "volume_ma": rolling_mean(volume[:, -n:], n)[:, -1],
+            "rsi": rsi(close[:, -(n + 1) :], n)[:, -1],
+            "cci": cci(fields["high"][:, -n:], fields["low"][:, -n:], close[:, -n:], n)[
+                :, -1
+            ],
+        }
+        flags = self.judge(values)
+        flags["trend"] = TREND_TYPES[flags["trend"]]
+        return self._outputs(values, flags)
+
+    def series(self, fields: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        对每一根 K 线计算信号（回测用），第 t 列的结果与只用前 t+1 根 K 线逐只计算一致
+        :param fields: 右对齐的 (S, T) 矩阵，左侧缺失处为 NaN
+        :return: 各输出列的 (S, T) 数组，trend 为 TREND_TYPES 的下标
+        """
+        cfg = self.config
+        if cfg.trend.period != "daily":
+            raise ValueError("逐根 K 线回测暂只支持日线趋势周期（trend.period: daily）")
+        ma_cfg = cfg.trend.moving_averages
+        n = cfg.volume.ma_window
+        close, volume = fields["close"], fields["volume"]
+
+        prev_price = np.full_like(close, np.nan)
+        prev_price[..., 1:] = close[..., :-1]
+        # 第 t 根的阻力位为第 t 根之前 N 根的最高价
+        resistance = np.full_like(close, np.nan)
+        resistance[..., 1:] = rolling_nanmax(
+            close, cfg.trend.breakout.resistance_window
+        )[..., :-1]
+        values = {
+            "price": close,
+            "prev_price": prev_price,
+            "ma_short": rolling_mean(close, ma_cfg.short),
+            "ma_long": rolling_mean(close, ma_cfg.long),
+            "resistance": resistance,
+            "volume": volume,
+            "volume_ma": rolling_mean(volume, n),
+            "rsi": rsi(close, n),
+            "cci": cci(fields["high"], fields["low"], close, n),
+        }
+        return self._outputs(values, self.judge(values))
+
+    def evaluate(
+        self, panel: KlinePanel, trend_panel: KlinePanel | None = None
+    ) -> pd.DataFrame:
+        """
+        :param trend_panel: 趋势周期非日线时，同一组标的的周期 K 线面板（行与 panel 一致）
+        :return: 以 symbol 为索引的 DataFrame，列与 SignalEngine 的 result 相同，另含 date
+        """
+        if panel.empty:
+            return pd.DataFrame(
+                columns=["date", *RESULT_COLUMNS], index=pd.Index([], name="symbol")
+            )
+
+        fields, dates = align_right(panel, self.lookback)
+        # 不足两根 K 线的标的逐只计算时会失败，这里同样剔除
+        keep = ~np.isnan(fields["close"][:, -2])
+        trend_fields = None
+        if trend_panel is not None:
+            trend_fields, _ = align_right(trend_panel, self.trend_lookback)
+            keep &= ~np.isnan(trend_fields["close"][:, -2])
+            trend_fields = {
+                field: values[keep] for field, values in trend_fields.items()
+            }
+        fields = {field: values[keep] for field, values in fields.items()}
+
+        result = self.compute(fields, trend_fields)
+        if panel.volume.dtype.kind != "f":
+            # 紧凑布局的成交量还原为整数，与逐只计算的输出一致
+            result["volume"] = result["volume"].astype(panel.volume.dtype)
+        for col in ROUNDED_COLUMNS:
+            if result[col].dtype.kind == "f":
+                result[col] = np.round(result[col], 2)
+        return pd.DataFrame(
+            {"date": dates[keep, -1], **result},
+            index=pd.Index(panel.symbols[keep], name="symbol"),
+        )
+
+    def evaluate_symbols(
+        self, symbols: Iterable[str], adjust: str = "qfq"
+    ) -> pd.DataFrame:
+        """批量加载（紧凑布局、只取预热窗口）并评估一组股票"""
+        panel = self.source.get_klines(
+            symbols, adjust, compact=True, lookback=self.lookback
+        )
+        logger.info(f"面板评估 {len(panel)} 只股票")
+        trend_panel = None
+        period = self.config.trend.period
+        if period != "daily" and not panel.empty:
+            # 日线刚同步过，周期 K 线只从本地聚合；按 panel 的标的顺序对齐行
+            trend_panel = self.source.get_klines(
+                panel.symbols,
+                adjust,
+                compact=True,
+                lookback=self.trend_lookback,
+                period=period,
+                sync=False,
+            )
+            trend_panel = trend_panel.reindex(panel.symbols)
+        return self.evaluate(panel, trend_panel)
+
+
+panel_engine = PanelEngine()
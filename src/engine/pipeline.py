@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List
+
+from loguru import logger
+
+# 通知下游「上游已结束」的哨兵
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    流水线的一个阶段
+    fn 接收上一阶段的输出，返回值交给下一阶段；返回 None 表示该条目到此为止。
+    fn 可以是协程函数（在事件循环中并发执行），也可以是普通函数（在本阶段专用的线程池中执行）。
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    stats: Counter = field(default_factory=Counter)
+
+
+class Pipeline:
+    """
+    多阶段流水线：相邻阶段之间以有界队列连接
+    每个阶段各有 workers 个并发工作者，下游处理不过来时队列写满，上游随之阻塞（背压），
+    内存中积压的条目不超过 队列容量 × 阶段数。各阶段重叠执行，总耗时取决于最慢的阶段，
+    而不是各阶段耗时之和。单个条目出错只记录日志并丢弃，不影响其它条目。
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 16,
+        key: Callable[[Any], str] = str,
+    ):
+        """
+        :param key: 出错时在日志中标识条目
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.key = key
+
+    async def _worker(
+        self,
+        stage: Stage,
+        executor: ThreadPoolExecutor | None,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue | None,
+    ):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                if executor is None:
+                    result = await stage.fn(item)
+                else:
+                    result = await loop.run_in_executor(executor, stage.fn, item)
+            except Exception as e:
+                logger.exception(
+                    f"流水线阶段 {stage.name} 处理 {self.key(item)} 失败: {e}"
+                )
+                stage.stats["failed"] += 1
+                continue
+            finally:
+                stage.stats["seconds"] += time.perf_counter() - start
+            stage.stats["done"] += 1
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    async def _run_stage(self, index: int, queues: List[asyncio.Queue]):
+        stage = self.stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(queues) else None
+        executor = None
+        if not inspect.iscoroutinefunction(stage.fn):
+            executor = ThreadPoolExecutor(
+                max_workers=stage.workers, thread_name_prefix=f"pipeline-{stage.name}"
+            )
+        try:
+            await asyncio.gather(
+                *(
+                    self._worker(stage, executor, inbox, outbox)
+                    for _ in range(stage.workers)
+                )
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        # 本阶段全部结束后再通知下游的每个工作者
+        if outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                await outbox.put(_DONE)
+
+    async def run(self, items: Iterable[Any]) -> List[Stage]:
+        """
+        处理全部条目，返回带有各阶段统计（done / failed / seconds）的阶段列表
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        tasks = [
+            asyncio.create_task(self._run_stage(i, queues))
+            for i in range(len(self.stages))
+        ]
+        try:
+            for item in items:
+                await queues[0].put(item)
+            for _ in range(self.stages[0].workers):
+                await queues[0].put(_DONE)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info(
+            "流水线完成："
+            + "，".join(
+                f"{s.name} {s.stats['done']} 条 / 失败 {s.stats['failed']} 条 / "
+                f"累计 {s.stats['seconds']:.1f}s"
+                for s in self.stages
+            )
+        )
+        return self.stages
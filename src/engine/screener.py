@@ -0,0 +1,106 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config import SCREENER_CONFIG, ScreenerConfig
+from datacenter.market.stock import StockDataSource, stock_data_source
+from signals.base import TrendType
+from utils.stock import get_fullcodes
+
+from .panel_engine import PanelEngine, panel_engine
+
+
+class Screener:
+    """
+    全市场选股
+    遍历 get_all_a_shares 的股票列表，按批加载预热窗口内的 K 线（紧凑布局）并用面板引擎评估，
+    每批的命中结果立即产出；同一时刻只持有一批的数据，内存占用与市场规模无关。
+
+    命中条件：上升趋势中出现突破，或均线多头排列（MA短 > MA长）下的趋势内回调。
+    回调定义为价格跌破短期均线，本身不满足 UPTREND 的「价格 > MA短」，因此以均线排列判断趋势。
+    """
+
+    def __init__(
+        self,
+        config: ScreenerConfig = SCREENER_CONFIG,
+        engine: PanelEngine = panel_engine,
+        source: StockDataSource = stock_data_source,
+    ):
+        self.config = config
+        self.engine = engine
+        self.source = source
+
+    def universe(self) -> pd.DataFrame:
+        """全部 A 股，列为 symbol（带交易所前缀）与 name"""
+        df = self.source.get_all_a_shares()
+        if df.empty:
+            return pd.DataFrame(columns=["symbol", "name"])
+        return pd.DataFrame(
+            {"symbol": get_fullcodes(df["code"]), "name": df["name"].to_numpy()}
+        )
+
+    def match(self, df: pd.DataFrame) -> np.ndarray:
+        uptrend = df["trend"].to_numpy() == TrendType.UPTREND
+        aligned = (df["ma_short"] > df["ma_long"]).to_numpy()
+        mask = np.zeros(len(df), dtype=bool)
+        if "breakout" in self.config.setups:
+            mask |= uptrend & df["breakout"].to_numpy(dtype=bool)
+        if "pullback" in self.config.setups:
+            mask |= aligned & df["pullback"].to_numpy(dtype=bool)
+        if self.config.require_timing:
+            mask &= df["timing_ok"].to_numpy(dtype=bool)
+        return mask
+
+    def screen_chunk(self, chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+        """评估一批股票，返回命中的结果（含 symbol, name 及 SignalEngine 的各项输出）"""
+        df = self.engine.evaluate_symbols(chunk["symbol"])
+        hits = df[self.match(df)]
+        names = dict(zip(chunk["symbol"], chunk["name"]))
+        return [
+            {"symbol": symbol, "name": names.get(symbol), **row}
+            for symbol, row in hits.to_dict("index").items()
+        ]
+
+    def _chunks(self) -> Iterator[pd.DataFrame]:
+        universe = self.universe()
+        size = self.config.chunk_size
+        logger.info(f"全市场选股：共 {len(universe)} 只股票，每批 {size} 只")
+        for start in range(0, len(universe), size):
+            yield universe.iloc[start : start + size]
+
+    def scan(self) -> Iterator[Dict[str, Any]]:
+        """逐批评估，命中即产出"""
+        for chunk in self._chunks():
+            try:
+                yield from self.screen_chunk(chunk)
+            except Exception as e:
+                logger.exception(f"选股批次 {chunk['symbol'].iloc[0]} 起评估失败: {e}")
+
+    async def ascan(self) -> AsyncIterator[Dict[str, Any]]:
+        """scan 的异步版本，评估在工作线程中进行，不阻塞事件循环"""
+        chunks = await asyncio.to_thread(lambda: list(self._chunks()))
+        for chunk in chunks:
+            try:
+                hits = await asyncio.to_thread(self.screen_chunk, chunk)
+            except Exception as e:
+                logger.exception(f"选股批次 {chunk['symbol'].iloc[0]} 起评估失败: {e}")
+                continue
+            for hit in hits:
+                yield hit
+
+
+def format_hit(hit: Dict[str, Any]) -> str:
+    setups = [name for name in ("breakout", "pullback") if hit.get(name)]
+    labels = {"breakout": "突破", "pullback": "回调"}
+    return (
+        f"{hit['symbol']} {hit['name'] or ''} 收盘 {hit['price']:.2f} "
+        f"MA短 {hit['ma_short']:.2f} MA长 {hit['ma_long']:.2f} "
+        f"{'/'.join(labels[s] for s in setups)}"
+        f"{'，择时通过' if hit['timing_ok'] else ''}"
+    )
+
+
+screener = Screener()
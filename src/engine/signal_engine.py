@@ -1,23 +1,102 @@
+from config import STRATEGY_CONFIG
+from config.strategy import StrategyConfig
+from signals.indicators import IndicatorCache
 from signals.structrue_signal import StructureSignal
 from signals.timing_signal import TimingSignal
+from signals.value_signal import ValueSignal
+from signals.event_signal import EventSignal
+from datacenter.market.kline_store import OhlcvArrays
+from datacenter.market.resample import daily_lookback
 from datacenter.market.stock import stock_data_source
 from loguru import logger
 from notifiers.formater.stock import format_trend_signal_message
 
 
 class SignalEngine:
-    def evaluate(self, symbol: str):
-        context = {}
-        context["kline"] = stock_data_source.get_kline(symbol)
-        structure_signal = StructureSignal()
-        structure_data = structure_signal.evaluate(context)
+    def __init__(self, config: StrategyConfig = STRATEGY_CONFIG):
+        self.config = config
+        self.structure_signal = StructureSignal()
+        self.timing_signal = TimingSignal()
+        self.value_signal = ValueSignal()
+        self.event_signal = EventSignal()
+
+    def lookback(self) -> int:
+        """
+        当前策略配置下各信号预热窗口的最大值（日线根数），只需加载这么多根 K 线
+        趋势周期为周线、月线时，结构信号的窗口按日线折算，保证本地日线足够聚合
+        """
+        return max(
+            daily_lookback(
+                self.structure_signal.lookback(self.config), self.config.trend.period
+            ),
+            self.timing_signal.lookback(self.config),
+        )
+
+    def trend_context(self, symbol: str, context: dict) -> dict:
+        """
+        结构信号的评估上下文：日线周期时即为 context 本身，
+        否则从本地存储读取由日线聚合的周期 K 线（日线已在本次评估前同步，不再访问上游）
+        """
+        period = self.config.trend.period
+        if period == "daily":
+            return context
+        kline = stock_data_source.get_kline_arrays(
+            symbol,
+            lookback=self.structure_signal.lookback(self.config),
+            period=period,
+            sync=False,
+        )
+        if kline is None:
+            raise ValueError(f"未获取到股票 {symbol} 的{period} K线数据")
+        context["trend_kline"] = kline
+        return {
+            "config": self.config,
+            "kline": kline,
+            "indicators": IndicatorCache(kline),
+        }
+
+    def evaluate(self, symbol: str, kline: OhlcvArrays | None = None):
+        """
+        :param kline: 已获取的日线（如由异步数据源批量预取），为空时从数据源读取
+        """
+        context = {"symbol": symbol, "config": self.config}
+        lookback = self.lookback()
+        if kline is None:
+            kline = stock_data_source.get_kline_arrays(symbol, lookback=lookback)
+        if kline is None:
+            raise ValueError(f"未获取到股票 {symbol} 的K线数据")
+        context["kline"] = kline.tail(lookback)
+        # 各信号共享的指标缓存，相同 (列, 指标, 参数) 只计算一次
+        context["indicators"] = IndicatorCache(context["kline"])
+        structure_data = self.structure_signal.evaluate(
+            self.trend_context(symbol, context)
+        )
         # logger.debug(structure_data)
-        signal = TimingSignal()
-        data = signal.evaluate(context)
+        data = self.timing_signal.evaluate(context)
         structure_data.update(data)
+        if self.config.value.enabled:
+            structure_data.update(self.evaluate_value(context))
+        if self.config.event.enabled:
+            structure_data.update(self.evaluate_event(context))
         context["result"] = structure_data
         return context
 
+    def evaluate_value(self, context: dict) -> dict:
+        """估值只作为背景信息，获取失败时不影响趋势与择时信号"""
+        try:
+            return self.value_signal.evaluate(context)
+        except Exception as e:
+            logger.warning(f"{context['symbol']} 估值分位计算失败: {e}")
+            return ValueSignal.judge(None, self.config)
+
+    def evaluate_event(self, context: dict) -> dict:
+        """事件只作为风险提示，事件库不可用时不影响趋势与择时信号"""
+        try:
+            return self.event_signal.evaluate(context)
+        except Exception as e:
+            logger.warning(f"{context['symbol']} 公司事件查询失败: {e}")
+            return EventSignal.judge(None, None)
+
 
 if __name__ == "__main__":
     signal_engine = SignalEngine()
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import orjson
+
+from config import MONITOR_CONFIG
+from datacenter.backends import DATA_ROOT
+from utils.json import to_json
+from utils.sqlite import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signal_states (
+    symbol TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    result TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SignalStateStore:
+    """
+    各标的最近一次信号结果（SQLite）
+    state 为 state_fields 组成的状态（趋势、回调、突破、择时），result 为完整结果；
+    监控运行时将新结果与上一次的状态比较，只有状态变化的标的才需要生成解读并推送。
+    """
+
+    def __init__(
+        self,
+        path: str | None = MONITOR_CONFIG.state_db_path,
+        fields: List[str] = MONITOR_CONFIG.state_fields,
+    ):
+        self.path = path or os.path.join(DATA_ROOT, "monitor.db")
+        self.fields = list(fields)
+        self.db = open_database(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect(SCHEMA)
+
+    def state(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """从信号结果中取出状态字段（枚举等转换为 JSON 取值，便于与已保存的状态比较）"""
+        return orjson.loads(
+            to_json({field: result.get(field) for field in self.fields})
+        )
+
+    def get(self, symbol: str) -> Dict[str, Any] | None:
+        """上一次保存的状态，从未保存过时为 None"""
+        row = (
+            self._connect()
+            .execute("SELECT state FROM signal_states WHERE symbol = ?", (symbol,))
+            .fetchone()
+        )
+        return orjson.loads(row[0]) if row else None
+
+    def diff(self, symbol: str, result: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+        """
+        与上一次保存的状态比较
+        :return: 发生变化的字段 -> (旧值, 新值)；首次出现的标的所有字段都视为变化，
+                 状态未变化时返回空字典
+        """
+        old = self.get(symbol) or {}
+        new = self.state(result)
+        return {
+            field: (old.get(field), value)
+            for field, value in new.items()
+            if field not in old or old[field] != value
+        }
+
+    def save(self, symbol: str, result: Dict[str, Any]):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO signal_states VALUES (?, ?, ?, ?)",
+                (
+                    symbol,
+                    to_json(self.state(result)),
+                    to_json(result),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+
+signal_state_store = SignalStateStore()
@@ -0,0 +1,148 @@
+import os
+from typing import Any, Dict
+
+import numpy as np
+import orjson
+from loguru import logger
+
+from config import STRATEGY_CONFIG
+from config.strategy import StrategyConfig
+from datacenter.backends import DATA_ROOT
+from datacenter.market.kline_store import KLINE_COLUMNS, KlineStore, kline_store
+from datacenter.market.stock import StockDataSource, stock_data_source
+from signals.streaming import StreamingState, config_fingerprint
+
+from .signal_engine import SignalEngine
+
+
+class StreamingStateStore:
+    """流式信号状态的持久化，每个标的一个 JSON 文件：{root}/{adjust}/{symbol}.json"""
+
+    def __init__(self, root: str = os.path.join(DATA_ROOT, "streaming")):
+        self.root = root
+
+    def path(self, symbol: str, adjust: str) -> str:
+        return os.path.join(self.root, adjust, f"{symbol}.json")
+
+    def load(self, symbol: str, adjust: str, config: StrategyConfig):
+        try:
+            with open(self.path(symbol, adjust), "rb") as f:
+                data = orjson.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("fingerprint") != config_fingerprint(config):
+            return None
+        try:
+            return StreamingState.from_dict(data, config)
+        except (KeyError, TypeError):
+            logger.warning(f"流式状态 {adjust}/{symbol} 损坏，将重建")
+            return None
+
+    def save(self, symbol: str, adjust: str, state: StreamingState):
+        path = self.path(symbol, adjust)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(orjson.dumps(state.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(f"{path}.tmp", path)
+
+
+class StreamingSignalEngine:
+    """
+    流式信号引擎
+    按标的持久化各指标的增量状态，每次只把本地 K 线存储中新增的 K 线推入状态，
+    每根 K 线的更新为常数时间；盘中可用 peek 计算未收盘 K 线上的信号。
+    首次使用、策略窗口参数变化或历史价格变化（除权）时，按预热窗口从 K 线重建状态。
+    """
+
+    def __init__(
+        self,
+        config: StrategyConfig = STRATEGY_CONFIG,
+        source: StockDataSource = stock_data_source,
+        store: KlineStore = kline_store,
+        states: StreamingStateStore | None = None,
+        adjust: str = "qfq",
+    ):
+        self.config = config
+        self.source = source
+        self.store = store
+        self.states = states or StreamingStateStore()
+        self.adjust = adjust
+        self.lookback = SignalEngine(config).lookback()
+
+    @staticmethod
+    def _bar(kline, i: int) -> Dict[str, Any]:
+        return {col: kline[col][i] for col in KLINE_COLUMNS}
+
+    def _rebuild(self, symbol: str) -> StreamingState | None:
+        kline = self.source.get_kline_arrays(symbol, self.adjust, self.lookback)
+        if kline is None or kline.empty:
+            return None
+        state = StreamingState(self.config)
+        for i in range(len(kline)):
+            state.push(self._bar(kline, i))
+        return state
+
+    def _catch_up(self, symbol: str, state: StreamingState) -> StreamingState | None:
+        """把本地存储中晚于状态的 K 线推入状态，历史价格变化时重建"""
+        kline = self.store.read_arrays(f"stock/{self.adjust}/{symbol}", self.lookback)
+        if kline is None or kline.empty:
+            return state
+        last = np.datetime64(state.date, "D")
+        idx = int(np.searchsorted(kline.date, last))
+        if (
+            idx >= len(kline)
+            or kline.date[idx] != last
+            or not np.isclose(kline.close[idx], state.close, rtol=1e-6)
+        ):
+            logger.info(f"{symbol} 流式状态与K线不一致，重建")
+            return self._rebuild(symbol)
+        for i in range(idx + 1, len(kline)):
+            state.push(self._bar(kline, i))
+        return state
+
+    def state(self, symbol: str, sync: bool = True) -> StreamingState | None:
+        """
+        取出标的的最新流式状态并持久化
+        :param sync: 是否先从上游同步 K 线；盘中高频调用时可关闭，只使用本地存储
+        """
+        if self.config.trend.period != "daily":
+            raise ValueError("流式信号暂只支持日线趋势周期（trend.period: daily）")
+        if sync:
+            self.source.get_kline_arrays(symbol, self.adjust, self.lookback)
+        state = self.states.load(symbol, self.adjust, self.config)
+        before = state.date if state else None
+        state = (
+            self._rebuild(symbol) if state is None else self._catch_up(symbol, state)
+        )
+        if state is not None and state.date != before:
+            self.states.save(symbol, self.adjust, state)
+        return state
+
+    def evaluate(self, symbol: str) -> Dict[str, Any]:
+        """最后一根已收盘 K 线上的信号，结果与 SignalEngine.evaluate 一致"""
+        state = self.state(symbol)
+        if state is None:
+            raise ValueError(f"未获取到股票 {symbol} 的K线数据")
+        return {"result": state.result(self.config), "state": state}
+
+    def peek(self, symbol: str, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        盘中未收盘 K 线（如行情快照）上的信号，不修改持久化状态
+        bar 的日期与最后一根已提交 K 线相同时视为对其的覆盖，不能增量计算，退回批量计算。
+        """
+        state = self.state(symbol, sync=False)
+        if state is None:
+            raise ValueError(f"未获取到股票 {symbol} 的K线数据")
+        if str(np.datetime64(bar["date"], "D")) == state.date:
+            kline = self.store.read_arrays(
+                f"stock/{self.adjust}/{symbol}", self.lookback + 1
+            )
+            if kline is None or kline.empty:
+                raise ValueError(f"未获取到股票 {symbol} 的K线数据")
+            state = StreamingState(self.config)
+            for i in range(len(kline) - 1):
+                state.push(self._bar(kline, i))
+        return {"result": state.peek(bar, self.config), "state": state}
+
+
+streaming_signal_engine = StreamingSignalEngine()
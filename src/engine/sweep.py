@@ -0,0 +1,204 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config import STRATEGY_CONFIG, SWEEP_CONFIG, SweepConfig
+from config.strategy import StrategyConfig
+from datacenter.market.stock import StockDataSource, stock_data_source
+
+from .backtest import BacktestEngine
+from .panel_engine import align_right
+
+METRIC_COLUMNS = ("count", "hits", "hit_rate", "mean_return", "excess_return")
+
+# 工作进程内挂载的共享面板：(共享内存块, symbols, fields, dates)
+_WORKER: Dict[str, Any] = {}
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any):
+    keys = path.split(".")
+    node = data
+    for key in keys[:-1]:
+        node = node.get(key) if isinstance(node, dict) else None
+        if node is None:
+            break
+    if not isinstance(node, dict) or keys[-1] not in node:
+        raise ValueError(f"未知的策略参数: {path}")
+    node[keys[-1]] = value
+
+
+def expand_grid(
+    base: StrategyConfig, grid: Dict[str, List[Any]]
+) -> List[Tuple[Dict[str, Any], StrategyConfig]]:
+    """
+    展开参数网格，返回 (参数取值, 策略配置) 列表
+    每个组合在 base 的基础上覆盖对应字段，并经 StrategyConfig 校验；
+    短期均线不短于长期均线的组合没有意义，直接跳过。
+    """
+    keys = list(grid)
+    combos = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        data = base.model_dump()
+        params = dict(zip(keys, values))
+        for path, value in params.items():
+            _set_path(data, path, value)
+        config = StrategyConfig.model_validate(data)
+        ma_cfg = config.trend.moving_averages
+        if ma_cfg.short >= ma_cfg.long:
+            continue
+        combos.append((params, config))
+    return combos
+
+
+class SharedPanel:
+    """
+    放在共享内存中的右对齐面板
+    父进程创建后把 spec（名称、形状、类型）交给工作进程挂载，各进程直接读同一份数据，
+    不需要为每个任务序列化 K 线。用完后由父进程 close() 释放。
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: Dict[str, Tuple[str, tuple, str]] = {}
+        try:
+            for key, values in arrays.items():
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(values.nbytes, 1)
+                )
+                self.blocks[key] = block
+                np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+                self.spec[key] = (block.name, values.shape, values.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    @staticmethod
+    def attach(
+        spec: Dict[str, Tuple[str, tuple, str]],
+    ) -> Tuple[List[shared_memory.SharedMemory], Dict[str, np.ndarray]]:
+        """挂载共享内存，返回的数组为只读视图；需保留返回的内存块引用"""
+        blocks, arrays = [], {}
+        for key, (name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=name)
+            values = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+            values.flags.writeable = False
+            blocks.append(block)
+            arrays[key] = values
+        return blocks, arrays
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(spec: Dict[str, Tuple[str, tuple, str]], symbols: np.ndarray):
+    blocks, arrays = SharedPanel.attach(spec)
+    dates = arrays.pop("date")
+    _WORKER.update(blocks=blocks, symbols=symbols, fields=arrays, dates=dates)
+
+
+def _run_combo(task: Tuple[int, Dict[str, Any], str, int]) -> Dict[str, Any]:
+    index, config_data, signal, horizon = task
+    config = StrategyConfig.model_validate(config_data)
+    engine = BacktestEngine(config, horizons=(horizon,))
+    result = engine.run_aligned(_WORKER["symbols"], _WORKER["fields"], _WORKER["dates"])
+    summary = engine.summary(result.stats()).loc[config.strategy.id]
+    row = summary.loc[(signal, horizon)]
+    baseline = summary.loc[("all", horizon)]
+    return {
+        "index": index,
+        "count": int(row["count"]),
+        "hits": int(row["hits"]),
+        "hit_rate": row["hit_rate"],
+        "mean_return": row["mean_return"],
+        # 相对无条件持有的超额收益
+        "excess_return": row["mean_return"] - baseline["mean_return"],
+    }
+
+
+class ParameterSweep:
+    """
+    策略参数寻优
+    按 SweepConfig.grid 展开 StrategyConfig 的参数组合，在进程池中逐组合做向量化回测，
+    按信号在指定持有期的命中率或平均收益排序。K 线只加载、对齐一次并放入共享内存，
+    工作进程挂载后直接计算，组合数多时随 CPU 核数线性加速。
+    """
+
+    def __init__(
+        self,
+        config: SweepConfig = SWEEP_CONFIG,
+        base: StrategyConfig = STRATEGY_CONFIG,
+        source: StockDataSource = stock_data_source,
+    ):
+        self.config = config
+        self.base = base
+        self.source = source
+
+    def run(
+        self, symbols: Iterable[str], adjust: str = "qfq", compact: bool = True
+    ) -> pd.DataFrame:
+        """
+        :param compact: 以 float32 加载价格，共享内存占用减半
+        :return: 每个参数组合一行，列为各参数取值与 METRIC_COLUMNS，按排序指标降序
+        """
+        cfg = self.config
+        combos = expand_grid(self.base, cfg.grid)
+        param_columns = list(cfg.grid)
+        if not combos:
+            return pd.DataFrame(columns=[*param_columns, *METRIC_COLUMNS])
+
+        panel = self.source.get_klines(symbols, adjust, compact=compact)
+        fields, dates = align_right(panel, len(panel.dates))
+        processes = min(cfg.processes or os.cpu_count() or 1, len(combos))
+        logger.info(
+            f"参数寻优：{len(combos)} 组参数，{len(panel)} 只股票 × {dates.shape[1]} 根K线，"
+            f"{processes} 个进程"
+        )
+
+        tasks = [
+            (i, config.model_dump(), cfg.signal, cfg.horizon)
+            for i, (_, config) in enumerate(combos)
+        ]
+        rows = []
+        with SharedPanel({**fields, "date": dates}) as shared:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(shared.spec, panel.symbols),
+            ) as executor:
+                chunksize = max(1, len(tasks) // (processes * 4))
+                for done, row in enumerate(
+                    executor.map(_run_combo, tasks, chunksize=chunksize), 1
+                ):
+                    rows.append({**combos[row.pop("index")][0], **row})
+                    if done % 50 == 0 or done == len(tasks):
+                        logger.info(f"参数寻优进度 {done}/{len(tasks)}")
+
+        return self.rank(pd.DataFrame(rows, columns=[*param_columns, *METRIC_COLUMNS]))
+
+    def rank(self, df: pd.DataFrame) -> pd.DataFrame:
+        """样本不足 min_count 的组合排在最后"""
+        enough = df["count"] >= self.config.min_count
+        return (
+            df.assign(_enough=enough)
+            .sort_values(["_enough", self.config.metric], ascending=False)
+            .drop(columns="_enough")
+            .reset_index(drop=True)
+        )
+
+
+parameter_sweep = ParameterSweep()
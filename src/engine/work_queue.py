@@ -0,0 +1,248 @@
+import os
+import socket
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Any, Dict, List
+
+import orjson
+from loguru import logger
+
+from config import MONITOR_CONFIG, MonitorConfig
+from datacenter.backends import DATA_ROOT
+from utils.json import to_json
+from utils.sqlite import open_database
+
+from .signal_engine import SignalEngine
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (run_id, status);
+"""
+
+# 任务状态
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class WorkQueue:
+    """
+    监控任务队列（SQLite）
+    每个任务为 (run_id, symbol)，协调进程写入后由任意数量的工作进程领取：
+    领取在 IMMEDIATE 事务中完成，同一任务只会被一个进程拿到；领取时附带租约，
+    工作进程失联、租约过期的任务会被其它进程重新领取，超过最大尝试次数后标记为失败。
+    结果写回队列，协调进程据此汇总。
+    """
+
+    def __init__(
+        self,
+        path: str | None = MONITOR_CONFIG.queue_db_path,
+        lease_seconds: int = MONITOR_CONFIG.lease_seconds,
+        max_attempts: int = MONITOR_CONFIG.max_attempts,
+    ):
+        self.path = path or os.path.join(DATA_ROOT, "queue.db")
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # 自动提交，事务由各方法显式控制
+        self.db = open_database(self.path, isolation_level=None)
+
+    @classmethod
+    def from_config(cls, config: MonitorConfig) -> "WorkQueue":
+        return cls(config.queue_db_path, config.lease_seconds, config.max_attempts)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect(SCHEMA)
+
+    def _transaction(self, fn, *args):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = fn(conn, *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    # =====================
+    # 协调进程
+    # =====================
+
+    def enqueue(self, run_id: str, symbols: List[str]) -> int:
+        """
+        写入任务，返回新增与重新放回队列的数量
+        已完成与进行中的任务保持不变；此前已失败的任务重置为待处理并清零尝试次数，重跑时再次计算
+        """
+
+        def insert(conn: sqlite3.Connection) -> int:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO tasks (run_id, symbol, status, updated_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (run_id, symbol) DO UPDATE SET status = excluded.status, "
+                "worker = NULL, attempts = 0, lease_until = NULL, error = NULL, "
+                "updated_at = excluded.updated_at WHERE tasks.status = ?",
+                [(run_id, symbol, PENDING, _now(), FAILED) for symbol in symbols],
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def counts(self, run_id: str) -> Counter:
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY status",
+            (run_id,),
+        )
+        return Counter(dict(rows.fetchall()))
+
+    def results(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """已完成任务的结果：symbol -> result"""
+        rows = self._connect().execute(
+            "SELECT symbol, result FROM tasks WHERE run_id = ? AND status = ?",
+            (run_id, DONE),
+        )
+        return {symbol: orjson.loads(result) for symbol, result in rows}
+
+    def failures(self, run_id: str) -> Dict[str, str]:
+        rows = self._connect().execute(
+            "SELECT symbol, error FROM tasks WHERE run_id = ? AND status = ?",
+            (run_id, FAILED),
+        )
+        return dict(rows.fetchall())
+
+    def prune(self, keep_days: int):
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat()
+        self._connect().execute("DELETE FROM tasks WHERE updated_at < ?", (cutoff,))
+
+    # =====================
+    # 工作进程
+    # =====================
+
+    def claim(self, run_id: str, worker: str, n: int = 1) -> List[str]:
+        """领取至多 n 个待处理或租约已过期的任务"""
+
+        def take(conn: sqlite3.Connection) -> List[str]:
+            now = time.time()
+            # 租约过期且已用尽尝试次数的任务不再分发
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, updated_at = ? "
+                "WHERE run_id = ? AND status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, "租约过期", _now(), run_id, RUNNING, now, self.max_attempts),
+            )
+            symbols = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT symbol FROM tasks WHERE run_id = ? "
+                    "AND (status = ? OR (status = ? AND lease_until < ?)) LIMIT ?",
+                    (run_id, PENDING, RUNNING, now, n),
+                )
+            ]
+            conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, attempts = attempts + 1, "
+                "lease_until = ?, updated_at = ? WHERE run_id = ? AND symbol = ?",
+                [
+                    (RUNNING, worker, now + self.lease_seconds, _now(), run_id, symbol)
+                    for symbol in symbols
+                ],
+            )
+            return symbols
+
+        return self._transaction(take)
+
+    def complete(self, run_id: str, symbol: str, result: Dict[str, Any]):
+        self._connect().execute(
+            "UPDATE tasks SET status = ?, result = ?, error = NULL, updated_at = ? "
+            "WHERE run_id = ? AND symbol = ?",
+            (DONE, to_json(result), _now(), run_id, symbol),
+        )
+
+    def fail(self, run_id: str, symbol: str, error: str):
+        """记录失败，尝试次数未用尽时放回队列"""
+        self._connect().execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = ?, lease_until = NULL, updated_at = ? "
+            "WHERE run_id = ? AND symbol = ?",
+            (self.max_attempts, FAILED, PENDING, error, _now(), run_id, symbol),
+        )
+
+
+def run_worker(run_id: str, config: MonitorConfig = MONITOR_CONFIG) -> Counter:
+    """
+    工作进程主循环：领取任务、计算信号、写回结果，队列中没有待处理与进行中的任务时退出
+    可在本机由协调进程启动，也可在其它进程（或共享该 SQLite 文件的主机）上独立运行。
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue.from_config(config)
+    engine = SignalEngine()
+    stats = Counter()
+    while True:
+        symbols = queue.claim(run_id, worker, config.claim_batch)
+        if not symbols:
+            counts = queue.counts(run_id)
+            if not counts[PENDING] and not counts[RUNNING]:
+                break
+            # 其它进程仍在处理，等待其完成或租约过期
+            time.sleep(1)
+            continue
+        for symbol in symbols:
+            try:
+                result = engine.evaluate(symbol)["result"]
+            except Exception as e:
+                logger.warning(f"[{worker}] {symbol} 信号计算失败: {e}")
+                queue.fail(run_id, symbol, str(e))
+                stats["failed"] += 1
+                continue
+            queue.complete(run_id, symbol, result)
+            stats["done"] += 1
+    logger.info(f"[{worker}] 工作进程退出: {dict(stats)}")
+    return stats
+
+
+def evaluate_sharded(
+    run_id: str,
+    symbols: List[str],
+    config: MonitorConfig = MONITOR_CONFIG,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    把标的写入队列，启动 config.workers 个工作进程计算信号，等待全部完成后返回结果
+    :return: symbol -> 信号结果；失败的标的不在其中
+    """
+    queue = WorkQueue.from_config(config)
+    queue.prune(config.checkpoint_days)
+    added = queue.enqueue(run_id, symbols)
+    logger.info(
+        f"任务队列 {run_id}：新增或重试 {added} 个任务，启动 {config.workers} 个工作进程"
+    )
+    # 使用 spawn：协调进程中已有事件循环与线程池，fork 后的子进程可能死锁
+    with ProcessPoolExecutor(
+        max_workers=config.workers, mp_context=get_context("spawn")
+    ) as executor:
+        for future in [
+            executor.submit(run_worker, run_id, config) for _ in range(config.workers)
+        ]:
+            future.result()
+
+    for symbol, error in queue.failures(run_id).items():
+        logger.warning(f"{symbol} 信号计算失败（已达最大尝试次数）: {error}")
+    results = queue.results(run_id)
+    return {symbol: results[symbol] for symbol in symbols if symbol in results}
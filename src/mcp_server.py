@@ -1,12 +1,15 @@
 # server.py
 
+import asyncio
+
 import yaml
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 
 from agents.strategy_editor import edit_strategy
 from agents.strategy_explainer import explain_strategy
 from config import STRATEGY_CONFIG, STRATEGY_CONFIG_PATH, WATCHLIST_PATH
 from datacenter.market.stock import stock_data_source
+from engine.screener import format_hit, screener
 from engine.signal_engine import SignalEngine
 from log import logger
 from notifiers.formater.stock import format_trend_signal_message
@@ -16,6 +19,22 @@ from utils.stock import extract_code, get_fullcode, validate_stock_code
 mcp = FastMCP("InvestAI 🚀")
 
 
+def analyze_stock(fullcode: str, name: str | None = None) -> str:
+    """
+    同步执行单只股票分析
+    在工作线程中运行，避免阻塞事件循环，并发请求同一股票时由数据层合并上游请求
+    """
+    signal_engine = SignalEngine()
+    context = signal_engine.evaluate(fullcode)
+    result = context["result"]
+    if name is None:
+        data = stock_data_source.get_company_profile(extract_code(fullcode))
+        name = data.get("股票简称") if data else None
+    if name:
+        result.update({"name": name})
+    return format_trend_signal_message(result)
+
+
 @mcp.tool()
 async def analyze_stock_tool(code: str):
     """
@@ -36,15 +55,8 @@ async def analyze_stock_tool(code: str):
     try:
         fullcode = get_fullcode(code)
         logger.info(f"分析股票 {fullcode}")
-        signal_engine = SignalEngine()
-        context = signal_engine.evaluate(fullcode)
-        result = context["result"]
+        message = await asyncio.to_thread(analyze_stock, fullcode)
         logger.info(f"股票 {fullcode} 分析完成")
-        data = stock_data_source.get_company_profile(extract_code(fullcode))
-        stock_name = data.get("股票简称") if data else None
-        if stock_name:
-            result.update({"name": stock_name})
-        message = format_trend_signal_message(result)
         return message
     except ValueError as e:
         logger.error(f"参数错误: {e}")
@@ -128,11 +140,7 @@ async def analyze_watchlist_tool():
                     continue
 
                 fullcode = get_fullcode(code)
-                signal_engine = SignalEngine()
-                context = signal_engine.evaluate(fullcode)
-                result = context["result"]
-                result.update({"name": name})
-                message = format_trend_signal_message(result)
+                message = await asyncio.to_thread(analyze_stock, fullcode, name)
                 results.append(f"=== {name} ({code}) ===\n{message}\n")
             except Exception as e:
                 logger.error(f"分析股票 {code} 失败: {e}")
@@ -144,6 +152,34 @@ async def analyze_watchlist_tool():
         raise ValueError("批量分析失败，请稍后重试")
 
 
+@mcp.tool()
+async def screen_market_tool(ctx: Context, limit: int = 50):
+    """
+    全市场选股：找出当前处于上升趋势并出现突破或回调的 A 股
+    按批评估，命中的股票会以进度消息的形式实时推送
+
+    参数:
+        limit: 最多返回的股票数量
+
+    返回:
+    字符串，每行一只命中的股票。
+    """
+    try:
+        hits = []
+        async for hit in screener.ascan():
+            line = format_hit(hit)
+            hits.append(line)
+            await ctx.info(line)
+            if len(hits) >= limit:
+                break
+        if not hits:
+            return "当前没有符合条件的股票"
+        return "\n".join(hits)
+    except Exception as e:
+        logger.exception(f"全市场选股时发生错误: {e}")
+        raise ValueError("全市场选股失败，请稍后重试")
+
+
 @mcp.tool()
 async def explain_strategy_tool():
     """
@@ -49,6 +49,36 @@ def format_trend_signal_message(data: dict) -> str:
             "当前趋势或结构 / 择时条件不满足，暂不具备趋势型买入条件，建议继续观望。"
         )
 
+    # === 估值分位（可选） ===
+    valuation_desc = ""
+    if data.get("valuation"):
+        lines = []
+        for field, label in (("pe", "PE(TTM)"), ("pb", "PB")):
+            value = data.get(field)
+            if value is None:
+                continue
+            line = f"- {label}：{value:.2f}"
+            if data.get(f"{field}_percentile") is not None:
+                line += f"，近{STRATEGY_CONFIG.value.history_years}年分位 {data[f'{field}_percentile']:.1f}%"
+            lines.append(line)
+        industry = f"（{data['industry']}）" if data.get("industry") else ""
+        valuation_desc = (
+            f"估值背景{industry}：{data['valuation']}\n" + "\n".join(lines) + "\n\n"
+        )
+
+    # === 公司事件（可选） ===
+    event_desc = ""
+    if data.get("suspended"):
+        event_desc += "⚠️ 停牌中\n"
+    event_lines = [f"- {e['date']} {e['title']}" for e in data.get("events") or []] + [
+        f"- {e['date']} {e['title']}（将发生）"
+        for e in data.get("upcoming_events") or []
+    ]
+    if event_lines:
+        event_desc += "公司事件：\n" + "\n".join(event_lines) + "\n"
+    if event_desc:
+        event_desc += "\n"
+
     # === 拼装消息 ===
     message = (
         f"股票名称：{name}{get_trend_emoji(trend)}\n"
@@ -61,9 +91,46 @@ def format_trend_signal_message(data: dict) -> str:
         f"择时指标（软约束）：\n"
         f"- RSI：{rsi:.1f}（{rsi_desc}）\n"
         f"- CCI：{cci:.1f}（{cci_desc}）\n\n"
+        f"{valuation_desc}"
+        f"{event_desc}"
         f"综合判断：\n"
         f"{final_desc}\n\n"
         f"━━━━━━━━━━━━━━━━"
     )
 
     return message
+
+
+STATE_LABELS = {
+    "trend": "趋势",
+    "pullback": "回调形态",
+    "breakout": "突破形态",
+    "timing_ok": "择时条件",
+    "volume_ok": "量能",
+    "rsi_ok": "RSI",
+    "cci_ok": "CCI",
+}
+
+
+def format_state_change_message(data: dict, changes: dict, title: str = "盘中") -> str:
+    """
+    将信号状态变化格式化为简短通知文案（盘中监控不经 LLM 解读，直接推送）
+    :param changes: 字段 -> (旧值, 新值)
+    """
+
+    def _desc(value) -> str:
+        if isinstance(value, bool):
+            return "是" if value else "否"
+        if isinstance(value, TrendType):
+            return value.value
+        return "-" if value is None else str(value)
+
+    lines = [
+        f"- {STATE_LABELS.get(field, field)}：{_desc(old)} → {_desc(new)}"
+        for field, (old, new) in changes.items()
+    ]
+    return (
+        f"【{title}】{data.get('name')}{get_trend_emoji(data.get('trend'))}\n"
+        f"当前价格：{data.get('price'):.2f}\n"
+        f"信号变化：\n" + "\n".join(lines) + "\n━━━━━━━━━━━━━━━━"
+    )
@@ -1,12 +1,16 @@
+from log import logger
+
 from .senders.console import ConsoleSender
 from .senders.slack import SlackSender
 from .senders.webhook import WebhookSender
+from .sent_log import SentLog
 from config import NOTIFICATION_CONFIG, NotificationConfig
 
 
 class NotificationManager:
     def __init__(self, config: NotificationConfig):
         self.config = config
+        self.sent_log = SentLog(config.sent_log_path, config.sent_log_days)
 
         self.senders = {
             "slack": SlackSender(),
@@ -14,10 +18,17 @@ class NotificationManager:
             "console": ConsoleSender(),
         }
 
-    def notify(self, message: str):
+    def notify(self, message: str, idempotency_key: str | None = None):
+        """
+        向所有启用的渠道发送消息，某个渠道或目标失败时仍继续发送其余的，最后统一抛出异常
+        :param idempotency_key: 幂等键，同一键在各渠道（webhook 为各地址）只成功发送一次，
+            用于中断后重跑
+        :raises RuntimeError: 有渠道发送失败
+        """
         if not self.config.enabled:
             return
 
+        failed = []
         for name, channel in self.config.channels.items():
             if not channel.enabled:
                 continue
@@ -26,7 +37,22 @@ class NotificationManager:
             if not sender:
                 raise ValueError(f"Unsupported channel type: {channel.type}")
 
-            sender.send(channel, message)
+            for target, deliver in sender.targets(channel).items():
+                # 已发送记录按目标区分，重试时只补发失败的 webhook 地址
+                key = f"{name}/{target}" if target else name
+                if idempotency_key and self.sent_log.sent(idempotency_key, key):
+                    continue
+                try:
+                    deliver(message)
+                except Exception as e:
+                    logger.warning(f"通知渠道 {key} 发送失败: {e}")
+                    failed.append(key)
+                    continue
+                if idempotency_key:
+                    self.sent_log.mark(idempotency_key, key)
+
+        if failed:
+            raise RuntimeError(f"通知发送失败: {', '.join(failed)}")
 
 
 notification_manager = NotificationManager(NOTIFICATION_CONFIG)
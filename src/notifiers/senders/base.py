@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import Callable, Dict
 
 
 class BaseChannelSender(ABC):
     @abstractmethod
     def send(self, channel_config, message: str):
+        """发送失败时抛出异常"""
         pass
+
+    def targets(self, channel_config) -> Dict[str, Callable[[str], None]]:
+        """
+        渠道下各自独立投递的目标（如 webhook 的多个地址），发送结果按目标分别记录
+        默认整个渠道为一个目标
+        """
+        return {"": partial(self.send, channel_config)}
@@ -21,4 +21,4 @@ class SlackSender(BaseChannelSender):
             assert e.response["ok"] is False
             # str like 'invalid_auth', 'channel_not_found'
             assert e.response["error"]
-            print(f"Got an error: {e.response['error']}")
+            raise RuntimeError(f"Slack send failed: {e.response['error']}") from e
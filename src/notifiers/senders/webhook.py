@@ -1,18 +1,29 @@
+from functools import partial
+
 import requests
-from config.config import WebhookChannelConfig
+from config.config import WebhookChannelConfig, WebhookEndpointConfig
 from .base import BaseChannelSender
 
 
 class WebhookSender(BaseChannelSender):
     def send(self, channel_config: WebhookChannelConfig, message: str):
         for endpoint in channel_config.endpoints:
-            payload = {"msg_type": "text", "content": {"text": message}}
+            self.post(endpoint, message)
+
+    def targets(self, channel_config: WebhookChannelConfig):
+        return {
+            endpoint.name: partial(self.post, endpoint)
+            for endpoint in channel_config.endpoints
+        }
+
+    def post(self, endpoint: WebhookEndpointConfig, message: str):
+        payload = {"msg_type": "text", "content": {"text": message}}
 
-            resp = requests.post(
-                endpoint.url,
-                json=payload,
-                timeout=5,
-            )
+        resp = requests.post(
+            endpoint.url,
+            json=payload,
+            timeout=5,
+        )
 
-            if not resp.ok:
-                raise RuntimeError(f"Webhook [{endpoint.name}] failed: {resp.text}")
+        if not resp.ok:
+            raise RuntimeError(f"Webhook [{endpoint.name}] failed: {resp.text}")
@@ -0,0 +1,54 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from utils.sqlite import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sent (
+    key TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    sent_at TEXT NOT NULL,
+    PRIMARY KEY (key, channel)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sent_by_time ON sent (sent_at);
+"""
+
+
+class SentLog:
+    """
+    已发送消息记录（SQLite）
+    以 (幂等键, 渠道) 为主键，某渠道发送成功后才写入；同一幂等键再次发送时跳过已成功的渠道，
+    只重试失败或尚未发送的渠道。超过保留期的记录在打开时清理。
+    """
+
+    def __init__(self, path: str, retention_days: int = 7):
+        self.path = path
+        self.retention_days = retention_days
+        self.db = open_database(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect(SCHEMA, self._prune)
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        with conn:
+            conn.execute(
+                "DELETE FROM sent WHERE sent_at < ?",
+                (cutoff.isoformat(timespec="seconds"),),
+            )
+
+    def sent(self, key: str, channel: str) -> bool:
+        row = (
+            self._connect()
+            .execute("SELECT 1 FROM sent WHERE key = ? AND channel = ?", (key, channel))
+            .fetchone()
+        )
+        return row is not None
+
+    def mark(self, key: str, channel: str):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sent VALUES (?, ?, ?)",
+                (key, channel, datetime.now().isoformat(timespec="seconds")),
+            )
@@ -0,0 +1,36 @@
+import argparse
+
+import pandas as pd
+
+from config import WATCHLIST_PATH
+from datacenter.market.stock import stock_data_source
+from engine.backtest import backtest_engine
+from tools.watch_list import load_watchlist
+from utils.stock import get_fullcode, get_fullcodes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="回测当前策略配置的历史信号")
+    parser.add_argument("symbols", nargs="*", help="股票代码，默认为关注列表")
+    parser.add_argument("--all", action="store_true", help="回测全部 A 股")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.all:
+        symbols = get_fullcodes(stock_data_source.get_all_a_shares()["code"])
+    elif args.symbols:
+        symbols = [get_fullcode(code) for code in args.symbols]
+    else:
+        symbols = [
+            get_fullcode(code) for code in load_watchlist(WATCHLIST_PATH).values()
+        ]
+
+    stats = backtest_engine.run_stats(symbols)
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(backtest_engine.summary(stats))
+
+
+if __name__ == "__main__":
+    main()
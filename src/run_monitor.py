@@ -1,13 +1,17 @@
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.schedulers.background import BlockingScheduler
 from engine.monitor import StockMonitor
+from engine.intraday import IntradayMonitor
 from tools.index_tool import load_index_pool
 from tools.watch_list import load_watchlist
 from config import WATCHLIST_PATH, INDEX_POOL_PATH
 from log import logger
 from datetime import datetime
-from config import SCHEDULE_CONFIG
+from config import SCHEDULE_CONFIG, MONITOR_CONFIG, STRATEGY_CONFIG
 from notifiers.manager import notification_manager
+from datacenter.market.snapshot import snapshot_ingestor
+from datacenter.events.ingest import event_ingestor
+from datacenter.market.valuation import valuation_index
 
 
 def format_time_marker() -> str:
@@ -18,7 +22,11 @@ def format_time_marker() -> str:
 def start_monitor():
     marker = format_time_marker()
     logger.info(marker)
-    notification_manager.notify(marker)
+    # 中断后补跑时不重复推送日期标记
+    try:
+        notification_manager.notify(marker, idempotency_key=f"marker:{marker}")
+    except RuntimeError as e:
+        logger.warning(f"日期标记推送失败: {e}")
     watchlist = load_watchlist(WATCHLIST_PATH)
     index_pool = load_index_pool(INDEX_POOL_PATH)
     monitor = StockMonitor(
@@ -28,6 +36,10 @@ def start_monitor():
     monitor.run()
 
 
+def update_valuations():
+    valuation_index.refresh(load_watchlist(WATCHLIST_PATH).values())
+
+
 def start_scheduler():
     logger.info("启动定时任务调度器")
     scheduler = BlockingScheduler()
@@ -37,8 +49,65 @@ def start_scheduler():
         coalesce=True,
         misfire_grace_time=3600,  # 允许 1 小时内补跑
     )
+    scheduler.add_job(
+        snapshot_ingestor.ingest,
+        CronTrigger(
+            day_of_week="mon-fri",
+            hour=SCHEDULE_CONFIG.ingest_hour,
+            minute=SCHEDULE_CONFIG.ingest_minute,
+        ),
+        coalesce=True,
+        misfire_grace_time=3600,
+    )
+    scheduler.add_job(
+        event_ingestor.ingest,
+        CronTrigger(
+            day_of_week="mon-fri",
+            hour=SCHEDULE_CONFIG.events_hour,
+            minute=SCHEDULE_CONFIG.events_minute,
+        ),
+        coalesce=True,
+        misfire_grace_time=3600,
+    )
+    if STRATEGY_CONFIG.value.enabled:
+        scheduler.add_job(
+            update_valuations,
+            CronTrigger(
+                day_of_week="mon-fri",
+                hour=SCHEDULE_CONFIG.valuation_hour,
+                minute=SCHEDULE_CONFIG.valuation_minute,
+            ),
+            coalesce=True,
+            misfire_grace_time=3600,
+        )
+    if MONITOR_CONFIG.intraday_enabled:
+        add_intraday_jobs(scheduler)
     scheduler.start()
 
 
+def add_intraday_jobs(scheduler: BlockingScheduler):
+    """盘中监控：开盘前加载流式状态，交易时段内每隔 intraday_interval 分钟检查一次"""
+    intraday_monitor = IntradayMonitor(load_watchlist(WATCHLIST_PATH))
+    scheduler.add_job(
+        intraday_monitor.prepare,
+        CronTrigger(day_of_week="mon-fri", hour=9, minute=15),
+        coalesce=True,
+        misfire_grace_time=600,
+    )
+    # 午休与节假日由 tick 内的交易时段判断跳过
+    scheduler.add_job(
+        intraday_monitor.tick,
+        CronTrigger(
+            day_of_week="mon-fri",
+            hour="9-14",
+            minute=f"*/{MONITOR_CONFIG.intraday_interval}",
+        ),
+        coalesce=True,
+        max_instances=1,
+        # 错过的检查不补跑，直接等下一次
+        misfire_grace_time=30,
+    )
+
+
 if __name__ == "__main__":
     start_scheduler()
@@ -0,0 +1,14 @@
+from engine.screener import format_hit, screener
+from log import logger
+
+
+def run_screener():
+    count = 0
+    for hit in screener.scan():
+        count += 1
+        print(format_hit(hit), flush=True)
+    logger.info(f"选股完成，共 {count} 只股票命中")
+
+
+if __name__ == "__main__":
+    run_screener()
@@ -0,0 +1,37 @@
+import argparse
+
+import pandas as pd
+
+from config import WATCHLIST_PATH
+from datacenter.market.stock import stock_data_source
+from engine.sweep import parameter_sweep
+from tools.watch_list import load_watchlist
+from utils.stock import get_fullcode, get_fullcodes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="按 sweep 配置的参数网格寻优策略参数")
+    parser.add_argument("symbols", nargs="*", help="股票代码，默认为关注列表")
+    parser.add_argument("--all", action="store_true", help="使用全部 A 股")
+    parser.add_argument("--top", type=int, default=20, help="输出前 N 组参数")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.all:
+        symbols = get_fullcodes(stock_data_source.get_all_a_shares()["code"])
+    elif args.symbols:
+        symbols = [get_fullcode(code) for code in args.symbols]
+    else:
+        symbols = [
+            get_fullcode(code) for code in load_watchlist(WATCHLIST_PATH).values()
+        ]
+
+    ranked = parameter_sweep.run(symbols)
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(ranked.head(args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+
+from config import MONITOR_CONFIG
+from datacenter.market.calendar import trading_calendar
+from engine.work_queue import run_worker
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="加入监控任务队列，领取标的并计算信号（可在多个进程中同时运行）"
+    )
+    parser.add_argument(
+        "--run-id", help="运行标识，默认为当天的监控运行（monitor:YYYY-MM-DD）"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    run_id = args.run_id or f"monitor:{trading_calendar.today()}"
+    run_worker(run_id, MONITOR_CONFIG)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any
 from enum import Enum
 
+from config.strategy import StrategyConfig
+from signals.indicators import IndicatorCache
+
 
 class TrendType(Enum):
     UPTREND = "上升趋势，可以考虑买入"
@@ -14,8 +17,28 @@ class BaseSignal(ABC):
     def evaluate(self, context: Dict[str, Any]) -> dict:
         """
         context 中包含：
+        - config：本次评估使用的策略配置（由引擎传入，信号不读取全局配置）
         - 行情数据
         - 基本面数据
         - 事件数据
         """
         pass
+
+    @abstractmethod
+    def lookback(self, config: StrategyConfig) -> int:
+        """
+        计算最新一根 K 线上的信号所需的最少 K 线数量（预热窗口）
+        引擎据此只加载并计算最后这么多根 K 线，结果与使用全部历史一致。
+        """
+        pass
+
+
+def indicator_cache(context: Dict[str, Any]) -> IndicatorCache:
+    """
+    取出本次评估的指标缓存（context["indicators"]），不存在时按 context["kline"] 创建
+    同一 context 中的各个信号共享同一份缓存。
+    """
+    cache = context.get("indicators")
+    if cache is None or cache.kline is not context["kline"]:
+        cache = context["indicators"] = IndicatorCache(context["kline"])
+    return cache
@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from signals.base import BaseSignal
+from config.strategy import StrategyConfig
+from datacenter.events.store import SUSPENSION, event_store
+
+
+class EventSignal(BaseSignal):
+    """
+    公司事件信号：参考日前后一段时间内的财报披露、除权除息、停牌与限售解禁
+    事件由 EventIngestor 每日批量写入本地事件库，评估时按 (标的, 日期区间) 走主键索引查询，
+    不访问上游；仅作为风险提示背景，不参与买卖判断。
+    """
+
+    def lookback(self, config: StrategyConfig) -> int:
+        # 只用 K 线的最后日期作为参考日
+        return 0
+
+    def evaluate(self, context: dict):
+        ref = pd.Timestamp(context["kline"].date[-1]).date()
+        event_cfg = context["config"].event
+        events = event_store.query(
+            context["symbol"],
+            ref - timedelta(days=event_cfg.lookback_days),
+            ref + timedelta(days=event_cfg.lookahead_days),
+        )
+        return self.judge(events, ref)
+
+    @staticmethod
+    def judge(events: list | None, ref: date | None) -> dict:
+        """
+        :param events: EventStore.query 的结果（按日期升序）
+        :param ref: 参考日（最近一根 K 线的日期）
+        :return: events 为参考日及之前的事件，upcoming_events 为之后的事件，
+                 suspended 表示参考日及之后存在停牌
+        """
+        result = {"events": [], "upcoming_events": [], "suspended": False}
+        if not events or ref is None:
+            return result
+
+        ref_iso = ref.isoformat()
+        for event in events:
+            item = {
+                "date": event["date"],
+                "type": event["type"],
+                "title": event["title"],
+            }
+            if event["date"] <= ref_iso:
+                result["events"].append(item)
+            else:
+                result["upcoming_events"].append(item)
+            if event["type"] == SUSPENSION and event["date"] >= ref_iso:
+                result["suspended"] = True
+        return result
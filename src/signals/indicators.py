@@ -0,0 +1,156 @@
+"""
+基于 numpy 的技术指标
+输出与 pandas rolling 版本一致（前 n-1 个位置为 NaN），但保持输入精度：
+float32 的紧凑 K 线算出的仍是 float32，不会被放宽为 float64。
+所有函数沿最后一个轴计算，一维序列与 symbols × dates 面板均可直接传入。
+"""
+
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def kline_values(kline, col: str) -> np.ndarray:
+    """
+    取出 K 线中的一列
+    kline 可以是 DataFrame，也可以是内存映射的 OhlcvArrays；
+    后者直接返回底层数组，不发生拷贝，也不会向 K 线写回任何列。
+    列的 dtype 保持不变，紧凑布局的 float32 价格不会被放宽。
+    """
+    values = kline[col]
+    if isinstance(values, pd.Series):
+        return values.to_numpy()
+    return values
+
+
+def float_dtype(values: np.ndarray) -> np.dtype:
+    """浮点输入保持原精度；整数输入（如紧凑布局的成交量）按宽度选择 float32 / float64"""
+    if values.dtype.kind == "f":
+        return values.dtype
+    if values.dtype.itemsize <= 4:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def rolling_mean(values: np.ndarray, n: int) -> np.ndarray:
+    dtype = float_dtype(values)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    if values.shape[-1] >= n:
+        windows = sliding_window_view(values, n, axis=-1)
+        out[..., n - 1 :] = windows.mean(axis=-1, dtype=dtype)
+    return out
+
+
+def rolling_nanmax(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    窗口内忽略 NaN 的滑动最大值
+    序列开头不足 n 个时取已有部分，与 np.nanmax(close[-n:]) 在每个位置上的结果一致。
+    """
+    pad = np.full(values.shape[:-1] + (n - 1,), np.nan, dtype=values.dtype)
+    windows = sliding_window_view(np.concatenate([pad, values], axis=-1), n, axis=-1)
+    return np.fmax.reduce(windows, axis=-1)
+
+
+def rsi(close: np.ndarray, n: int) -> np.ndarray:
+    """简单移动平均版 RSI，与 TimingSignal 原 pandas 实现一致"""
+    dtype = float_dtype(close)
+    delta = np.full(close.shape, np.nan, dtype=dtype)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    # 首根的涨跌幅记为 0（同 pandas 实现）；收盘价缺失处保持 NaN，
+    # 使面板中左侧补齐的空位不会被当作 0 计入均值
+    missing = np.isnan(close)
+    gain = np.where(missing, np.nan, np.where(delta > 0, delta, 0)).astype(dtype)
+    loss = np.where(missing, np.nan, np.where(delta < 0, -delta, 0)).astype(dtype)
+
+    avg_gain = rolling_mean(gain, n)
+    avg_loss = rolling_mean(loss, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - 100 / (1 + rs)
+
+
+def typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (high + low + close) / 3
+
+
+# 每批处理的窗口数，限制 (窗口数 × n) 临时数组的大小
+_MEAN_DEV_BLOCK = 4096
+
+
+def mean_deviation(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    滚动平均绝对偏差 mean(|x - mean(x)|)，与
+    rolling(n).apply(lambda x: np.mean(np.abs(x - x.mean())), raw=True) 结果一致
+    绝对值无法用滑动累加和增量更新，这里在滑动窗口视图上一次性向量化计算，
+    按批处理以免面板输入时临时数组过大。
+    """
+    dtype = float_dtype(values)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    if values.shape[-1] < n:
+        return out
+    windows = sliding_window_view(values, n, axis=-1)
+    total = windows.shape[-2]
+    rows = int(np.prod(values.shape[:-1], dtype=np.int64))
+    block = max(_MEAN_DEV_BLOCK // max(rows, 1), 1)
+    for start in range(0, total, block):
+        w = windows[..., start : start + block, :]
+        dev = np.abs(w - w.mean(axis=-1, keepdims=True, dtype=dtype))
+        out[..., n - 1 + start : n - 1 + start + w.shape[-2]] = dev.mean(
+            axis=-1, dtype=dtype
+        )
+    return out
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int) -> np.ndarray:
+    tp = typical_price(high, low, close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (tp - rolling_mean(tp, n)) / (0.015 * mean_deviation(tp, n))
+
+
+# 指标名 -> 计算函数，参数依次为输入列与指标参数
+INDICATORS: Dict[str, Callable[..., np.ndarray]] = {
+    "sma": rolling_mean,
+    "rsi": rsi,
+    "mean_dev": mean_deviation,
+    "cci": cci,
+}
+
+
+class IndicatorCache:
+    """
+    单次评估内的指标缓存
+    以 (输入列, 指标, 参数) 为键记忆计算结果，同一 context 中的多个信号共享，
+    新增信号只要复用相同的窗口，就不会重复计算滚动指标。
+    """
+
+    def __init__(self, kline):
+        self.kline = kline
+        self._values: Dict[Tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def column(self, col: str) -> np.ndarray:
+        key = (col,)
+        if key not in self._values:
+            self._values[key] = kline_values(self.kline, col)
+        return self._values[key]
+
+    def get(self, indicator: str, cols: Tuple[str, ...], *params) -> np.ndarray:
+        key = (cols, indicator, params)
+        values = self._values.get(key)
+        if values is None:
+            inputs = (self.column(col) for col in cols)
+            values = self._values[key] = INDICATORS[indicator](*inputs, *params)
+        return values
+
+    def sma(self, col: str, n: int) -> np.ndarray:
+        return self.get("sma", (col,), n)
+
+    def rsi(self, col: str, n: int) -> np.ndarray:
+        return self.get("rsi", (col,), n)
+
+    def cci(self, n: int, cols: Tuple[str, str, str] = ("high", "low", "close")):
+        return self.get("cci", cols, n)
@@ -0,0 +1,359 @@
+"""
+流式增量指标
+每根新 K 线以常数时间更新 StructureSignal 与 TimingSignal 用到的全部指标：
+- 均线：环形缓冲 + 滑动累加和
+- 阻力位（滚动最大值）：单调队列
+- RSI：涨跌幅各自的滑动累加和
+- CCI：典型价格的滑动累加和；平均绝对偏差无法增量维护，按窗口长度 O(n) 计算
+
+push() 提交一根已收盘的 K 线，peek() 在不修改状态的前提下计算盘中未收盘 K 线的指标值，
+状态可序列化为 dict，按标的持久化。
+"""
+
+import hashlib
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+
+from config.strategy import StrategyConfig
+
+from signals.structrue_signal import StructureSignal
+from signals.timing_signal import TimingSignal
+
+
+def _floats(values: List[Optional[float]]) -> List[float]:
+    # JSON 中 NaN 会写成 null
+    return [np.nan if v is None else v for v in values]
+
+
+class RollingMean:
+    """
+    滑动均值
+    每 n 次更新按缓冲区重新求和一次，避免浮点累加误差随时间增长，均摊仍为 O(1)。
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buffer: List[float] = []
+        self.pos = 0  # 缓冲区满后下一个被覆盖的位置
+        self.total = 0.0
+        self.updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.buffer) == self.n
+
+    @property
+    def value(self) -> float:
+        return self.total / self.n if self.ready else np.nan
+
+    @property
+    def oldest(self) -> float:
+        return self.buffer[self.pos] if self.ready else 0.0
+
+    def window(self) -> List[float]:
+        """按时间顺序排列的窗口"""
+        return self.buffer[self.pos :] + self.buffer[: self.pos]
+
+    def push(self, x: float):
+        if self.ready:
+            self.total += x - self.buffer[self.pos]
+            self.buffer[self.pos] = x
+            self.pos = (self.pos + 1) % self.n
+        else:
+            self.buffer.append(x)
+            self.total += x
+
+        self.updates += 1
+        if self.updates % self.n == 0:
+            self.total = float(np.sum(self.buffer))
+
+    def peek(self, x: float) -> float:
+        """追加 x 后的均值（不修改状态）"""
+        if self.ready:
+            return (self.total - self.oldest + x) / self.n
+        if len(self.buffer) == self.n - 1:
+            return (self.total + x) / self.n
+        return np.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "buffer": self.buffer,
+            "pos": self.pos,
+            "updates": self.updates,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingMean":
+        obj = cls(data["n"])
+        obj.buffer = _floats(data["buffer"])
+        obj.pos = data["pos"]
+        obj.updates = data["updates"]
+        obj.total = float(np.sum(obj.buffer))
+        return obj
+
+
+class RollingMax:
+    """滑动最大值，单调递减队列保存 (序号, 值)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.queue: deque = deque()
+        self.count = 0
+
+    @property
+    def value(self) -> float:
+        return self.queue[0][1] if self.queue else np.nan
+
+    def push(self, x: float):
+        while self.queue and self.queue[-1][1] <= x:
+            self.queue.pop()
+        self.queue.append((self.count, x))
+        self.count += 1
+        if self.queue[0][0] <= self.count - 1 - self.n:
+            self.queue.popleft()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "queue": list(self.queue), "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingMax":
+        obj = cls(data["n"])
+        obj.queue = deque((idx, value) for idx, value in data["queue"])
+        obj.count = data["count"]
+        return obj
+
+
+class RollingRSI:
+    """简单移动平均版 RSI，与 signals.indicators.rsi 一致"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.prev: Optional[float] = None
+        self.gain = RollingMean(n)
+        self.loss = RollingMean(n)
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else np.nan
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.gain.value, self.loss.value)
+
+    def push(self, close: float):
+        if self.prev is not None:
+            delta = close - self.prev
+            self.gain.push(max(delta, 0.0))
+            self.loss.push(max(-delta, 0.0))
+        self.prev = close
+
+    def peek(self, close: float) -> float:
+        if self.prev is None:
+            return np.nan
+        delta = close - self.prev
+        return self._rsi(
+            self.gain.peek(max(delta, 0.0)), self.loss.peek(max(-delta, 0.0))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "prev": self.prev,
+            "gain": self.gain.to_dict(),
+            "loss": self.loss.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingRSI":
+        obj = cls(data["n"])
+        obj.prev = data["prev"]
+        obj.gain = RollingMean.from_dict(data["gain"])
+        obj.loss = RollingMean.from_dict(data["loss"])
+        return obj
+
+
+class RollingCCI:
+    """CCI，典型价格均值为 O(1)，平均绝对偏差为 O(n)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.tp = RollingMean(n)
+
+    @staticmethod
+    def _cci(tp: float, window: List[float]) -> float:
+        mean = float(np.mean(window))
+        mean_dev = float(np.mean(np.abs(np.asarray(window) - mean)))
+        if mean_dev == 0:
+            return np.nan
+        return (tp - mean) / (0.015 * mean_dev)
+
+    @property
+    def value(self) -> float:
+        if not self.tp.ready:
+            return np.nan
+        window = self.tp.window()
+        return self._cci(window[-1], window)
+
+    def push(self, high: float, low: float, close: float):
+        self.tp.push((high + low + close) / 3)
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        tp = (high + low + close) / 3
+        if self.tp.ready:
+            window = self.tp.window()[1:] + [tp]
+        elif len(self.tp.buffer) == self.n - 1:
+            window = self.tp.buffer + [tp]
+        else:
+            return np.nan
+        return self._cci(tp, window)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "tp": self.tp.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingCCI":
+        obj = cls(data["n"])
+        obj.tp = RollingMean.from_dict(data["tp"])
+        return obj
+
+
+# 状态字段或计算口径变化时递增，已持久化的旧状态随指纹变化而重建
+# 2：阻力位改为不含最新一根的前 N 根最高价
+STATE_VERSION = 2
+
+
+def config_fingerprint(config: StrategyConfig) -> str:
+    """影响流式状态的窗口参数指纹，窗口变化后需要重建状态（阈值变化不需要）"""
+    windows = (
+        STATE_VERSION,
+        config.trend.moving_averages.short,
+        config.trend.moving_averages.long,
+        config.trend.breakout.resistance_window,
+        config.volume.ma_window,
+    )
+    return hashlib.sha1(orjson.dumps(windows)).hexdigest()[:12]
+
+
+class StreamingState:
+    """
+    单个标的的流式信号状态
+    push(bar) 提交一根已收盘 K 线；result() 为最后一根已提交 K 线上的信号，
+    peek(bar) 为盘中未收盘 K 线上的信号。bar 含 date, open, high, low, close, volume。
+    """
+
+    def __init__(self, config: StrategyConfig):
+        ma_cfg = config.trend.moving_averages
+        n = config.volume.ma_window
+        self.fingerprint = config_fingerprint(config)
+        self.date: Optional[str] = None
+        self.close: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.volume: Optional[float] = None
+        self.ma_short = RollingMean(ma_cfg.short)
+        self.ma_long = RollingMean(ma_cfg.long)
+        # 最后 N 根已提交收盘价的最高价，即下一根 K 线的阻力位
+        self.resistance = RollingMax(config.trend.breakout.resistance_window)
+        # 最后一根已提交 K 线的阻力位（提交它之前的 resistance）
+        self.last_resistance: float = np.nan
+        self.volume_ma = RollingMean(n)
+        self.rsi = RollingRSI(n)
+        self.cci = RollingCCI(n)
+
+    def push(self, bar: Dict[str, Any]):
+        close = float(bar["close"])
+        self.ma_short.push(close)
+        self.ma_long.push(close)
+        self.last_resistance = self.resistance.value
+        self.resistance.push(close)
+        self.volume_ma.push(float(bar["volume"]))
+        self.rsi.push(close)
+        self.cci.push(float(bar["high"]), float(bar["low"]), close)
+        self.prev_close, self.close = self.close, close
+        self.volume = float(bar["volume"])
+        self.date = str(bar["date"])
+
+    def result(self, config: StrategyConfig) -> dict:
+        result = StructureSignal.judge(
+            self.close,
+            self.prev_close,
+            self.ma_short.value,
+            self.ma_long.value,
+            self.last_resistance,
+            config,
+        )
+        result.update(
+            TimingSignal.judge(
+                self.volume,
+                self.volume_ma.value,
+                self.rsi.value,
+                self.cci.value,
+                config,
+            )
+        )
+        return result
+
+    def peek(self, bar: Dict[str, Any], config: StrategyConfig) -> dict:
+        close = float(bar["close"])
+        volume = float(bar["volume"])
+        result = StructureSignal.judge(
+            close,
+            self.close,
+            self.ma_short.peek(close),
+            self.ma_long.peek(close),
+            self.resistance.value,
+            config,
+        )
+        result.update(
+            TimingSignal.judge(
+                volume,
+                self.volume_ma.peek(volume),
+                self.rsi.peek(close),
+                self.cci.peek(float(bar["high"]), float(bar["low"]), close),
+                config,
+            )
+        )
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "date": self.date,
+            "close": self.close,
+            "prev_close": self.prev_close,
+            "volume": self.volume,
+            "ma_short": self.ma_short.to_dict(),
+            "ma_long": self.ma_long.to_dict(),
+            "resistance": self.resistance.to_dict(),
+            "last_resistance": self.last_resistance,
+            "volume_ma": self.volume_ma.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "cci": self.cci.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], config: StrategyConfig
+    ) -> "StreamingState":
+        obj = cls(config)
+        obj.fingerprint = data["fingerprint"]
+        obj.date = data["date"]
+        obj.close = data["close"]
+        obj.prev_close = data["prev_close"]
+        obj.volume = data["volume"]
+        obj.ma_short = RollingMean.from_dict(data["ma_short"])
+        obj.ma_long = RollingMean.from_dict(data["ma_long"])
+        obj.resistance = RollingMax.from_dict(data["resistance"])
+        # NaN 序列化为 null
+        obj.last_resistance = (
+            np.nan if data["last_resistance"] is None else data["last_resistance"]
+        )
+        obj.volume_ma = RollingMean.from_dict(data["volume_ma"])
+        obj.rsi = RollingRSI.from_dict(data["rsi"])
+        obj.cci = RollingCCI.from_dict(data["cci"])
+        return obj
@@ -1,29 +1,57 @@
-from signals.base import BaseSignal, TrendType
-from config import STRATEGY_CONFIG
+import numpy as np
+
+from signals.base import BaseSignal, TrendType, indicator_cache
+from config.strategy import StrategyConfig
 
 
 class StructureSignal(BaseSignal):
+    def lookback(self, config: StrategyConfig) -> int:
+        ma_cfg = config.trend.moving_averages
+        # 阻力位取最新一根之前的 resistance_window 根，另需最新一根本身
+        return max(
+            ma_cfg.short, ma_cfg.long, config.trend.breakout.resistance_window + 1
+        )
+
     def evaluate(self, context: dict):
-        df = context["kline"]
-        price_col = "close"
+        indicators = indicator_cache(context)
+        close = indicators.column("close")
 
         # ===== 配置读取 =====
-        ma_cfg = STRATEGY_CONFIG.trend.moving_averages
-        pullback_cfg = STRATEGY_CONFIG.trend.pullback
-        breakout_cfg = STRATEGY_CONFIG.trend.breakout
-
-        short_ma = ma_cfg.short
-        long_ma = ma_cfg.long
+        config = context["config"]
+        ma_cfg = config.trend.moving_averages
+        breakout_cfg = config.trend.breakout
 
         # ===== 均线计算 =====
-        df["ma_short"] = df[price_col].rolling(window=short_ma).mean()
-        df["ma_long"] = df[price_col].rolling(window=long_ma).mean()
+        ma_short_val = indicators.sma("close", ma_cfg.short)[-1]
+        ma_long_val = indicators.sma("close", ma_cfg.long)[-1]
 
-        price = df[price_col].iloc[-1]
-        prev_price = df[price_col].iloc[-2]
+        price = close[-1]
+        prev_price = close[-2]
 
-        ma_short_val = df["ma_short"].iloc[-1]
-        ma_long_val = df["ma_long"].iloc[-1]
+        # ===== 阻力位 =====
+        # 最新一根之前 N 根的最高收盘价；包含最新一根时价格不可能高于阻力位，突破永远不成立
+        window = breakout_cfg.resistance_window
+        resistance = np.nanmax(close[-window - 1 : -1])
+
+        return self.judge(
+            price, prev_price, ma_short_val, ma_long_val, resistance, config
+        )
+
+    @staticmethod
+    def judge(
+        price: float,
+        prev_price: float,
+        ma_short_val: float,
+        ma_long_val: float,
+        resistance: float,
+        config: StrategyConfig,
+    ) -> dict:
+        """
+        由最新一根 K 线的指标值得出结构信号
+        批量计算与流式增量计算共用这套判断规则。
+        """
+        pullback_cfg = config.trend.pullback
+        breakout_cfg = config.trend.breakout
 
         # ===== 趋势判断 =====
         if price > ma_short_val > ma_long_val:
@@ -43,9 +71,6 @@ class StructureSignal(BaseSignal):
             )
 
         # ===== 突破判断 =====
-        resistance_window = breakout_cfg.resistance_window
-        resistance = df[price_col].iloc[-resistance_window:].max()
-
         breakout = prev_price <= resistance and price > resistance * (
             1 + breakout_cfg.buffer
         )
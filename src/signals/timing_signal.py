@@ -1,85 +1,51 @@
-from signals.base import BaseSignal
-from pandas import DataFrame
-from loguru import logger
-import numpy as np
-from config import STRATEGY_CONFIG
+from signals.base import BaseSignal, indicator_cache
+from config.strategy import StrategyConfig
 
 
 class TimingSignal(BaseSignal):
-    # =====================
-    # 指标计算
-    # =====================
-
-    def compute_rsi(self, df: DataFrame, price_col: str, n: int):
-        try:
-            delta = df[price_col].diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-
-            avg_gain = gain.rolling(window=n).mean()
-            avg_loss = loss.rolling(window=n).mean()
-
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi
-        except Exception as e:
-            logger.error(f"RSI error: {e}")
-            return None
-
-    def compute_cci(
-        self,
-        df: DataFrame,
-        high_col: str,
-        low_col: str,
-        close_col: str,
-        n: int,
-    ):
-        try:
-            tp = (df[high_col] + df[low_col] + df[close_col]) / 3
-            tp_sma = tp.rolling(window=n).mean()
-            mean_dev = tp.rolling(window=n).apply(
-                lambda x: np.mean(np.abs(x - x.mean())),
-                raw=True,
-            )
-            cci = (tp - tp_sma) / (0.015 * mean_dev)
-            return cci
-        except Exception as e:
-            logger.error(f"CCI error: {e}")
-            return None
-
     # =====================
     # Signal 评估
     # =====================
 
+    def lookback(self, config: StrategyConfig) -> int:
+        # 成交量均线、RSI、CCI 共用 volume.ma_window；
+        # RSI 的 n 个涨跌幅需要 n + 1 根收盘价
+        return config.volume.ma_window + 1
+
     def evaluate(self, context: dict):
-        df = context["kline"]
+        indicators = indicator_cache(context)
         price_col = "close"
-
+        config = context["config"]
+        n = config.volume.ma_window
+
+        volume = indicators.column("volume")[-1]
+        volume_ma = indicators.sma("volume", n)[-1]
+        rsi_val = indicators.rsi(price_col, n)[-1]
+        cci_val = indicators.cci(n, ("high", "low", price_col))[-1]
+
+        return self.judge(volume, volume_ma, rsi_val, cci_val, config)
+
+    @staticmethod
+    def judge(
+        volume: float,
+        volume_ma: float,
+        rsi_val: float,
+        cci_val: float,
+        config: StrategyConfig,
+    ) -> dict:
+        """由最新一根 K 线的指标值得出择时信号，批量与流式计算共用"""
         # ===== 配置 =====
-        volume_cfg = STRATEGY_CONFIG.volume
-        rsi_cfg = STRATEGY_CONFIG.rsi
-        cci_cfg = STRATEGY_CONFIG.cci
+        volume_cfg = config.volume
+        rsi_cfg = config.rsi
+        cci_cfg = config.cci
 
         # ===== 成交量 =====
-        df["vol_ma"] = df["volume"].rolling(window=volume_cfg.ma_window).mean()
-
-        volume = df["volume"].iloc[-1]
-        volume_ma = df["vol_ma"].iloc[-1]
-
         volume_ok = volume >= volume_ma * volume_cfg.min_ratio
 
         # ===== RSI =====
-        rsi_series = self.compute_rsi(df, price_col, n=volume_cfg.ma_window)
-        rsi_val = rsi_series.iloc[-1]
-
         rsi_ok = rsi_cfg.min <= rsi_val <= rsi_cfg.max
 
         # ===== CCI =====
-        cci_series = self.compute_cci(
-            df, "high", "low", price_col, n=volume_cfg.ma_window
-        )
-        cci_val = cci_series.iloc[-1]
-
         cci_ok = cci_cfg.min <= cci_val <= cci_cfg.max
 
         return {
@@ -0,0 +1,49 @@
+from signals.base import BaseSignal
+from config.strategy import StrategyConfig
+from datacenter.market.valuation import VALUATION_FIELDS, valuation_index
+
+
+class ValueSignal(BaseSignal):
+    """
+    估值信号：当前 PE(TTM) / PB 在自身历史中的分位
+    分位数由 ValuationIndex 在收盘后的定时任务中预先维护，评估时只做二分查找；
+    仅作为估值背景，不参与买卖判断。
+    """
+
+    def lookback(self, config: StrategyConfig) -> int:
+        # 不使用 K 线
+        return 0
+
+    def evaluate(self, context: dict):
+        # 索引由收盘后的定时任务更新，评估路径上不访问上游
+        valuation = valuation_index.query(context["symbol"], update=False)
+        return self.judge(valuation, context["config"])
+
+    @staticmethod
+    def judge(valuation: dict | None, config: StrategyConfig) -> dict:
+        """
+        优先按 PE 的历史分位判断估值高低，PE 为负（亏损）或缺失时退回 PB
+        :return: 估值各字段，valuation 为 低估 / 适中 / 高估 / 亏损，无数据时各字段为 None
+        """
+        value_cfg = config.value
+        result = {"industry": None, "valuation": None}
+        for field in VALUATION_FIELDS:
+            result.update({field: None, f"{field}_percentile": None})
+        if valuation is None:
+            return result
+
+        result.update({key: valuation.get(key) for key in result})
+
+        level = result["pe_percentile"]
+        if level is None:
+            level = result["pb_percentile"]
+        if level is None:
+            pe = result["pe"]
+            result["valuation"] = "亏损" if pe is not None and pe <= 0 else None
+        elif level <= value_cfg.low:
+            result["valuation"] = "低估"
+        elif level >= value_cfg.high:
+            result["valuation"] = "高估"
+        else:
+            result["valuation"] = "适中"
+        return result
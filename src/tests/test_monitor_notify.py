@@ -0,0 +1,117 @@
+"""
+推送失败时不记录新的信号状态
+
+运行（在仓库根目录下，配置从 conf/ 读取）：
+    PYTHONPATH=src python -m unittest discover -s src/tests -t src
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from slack_sdk.errors import SlackApiError
+
+from config.config import NotificationConfig
+from engine.checkpoint import DONE, CheckpointStore
+from engine.monitor import StockMonitor
+from engine.signal_state import SignalStateStore
+from notifiers.manager import NotificationManager
+from notifiers.senders.base import BaseChannelSender
+
+SYMBOL = "sh600000"
+FIELDS = ["trend", "breakout"]
+
+
+class RecordingSender(BaseChannelSender):
+    """记录消息的发送渠道，fail 为 True 时发送失败"""
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.messages = []
+
+    def send(self, channel_config, message: str):
+        if self.fail:
+            raise RuntimeError("channel unavailable")
+        self.messages.append(message)
+
+
+class NotifyStockTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        db = os.path.join(self.tmp.name, "monitor.db")
+        self.state_store = SignalStateStore(db, FIELDS)
+        self.checkpoints = CheckpointStore(db)
+        self.monitor = StockMonitor(
+            watchlist={"浦发银行": SYMBOL},
+            index_pool={},
+            state_store=self.state_store,
+            checkpoints=self.checkpoints,
+            run_id="test",
+        )
+        self.state_store.save(SYMBOL, {"trend": "下跌", "breakout": False})
+        self.item = {
+            "symbol": SYMBOL,
+            "result": {"trend": "上涨", "breakout": True},
+            "message": "信号变化",
+        }
+
+    def manager(self, channel: dict) -> NotificationManager:
+        return NotificationManager(
+            NotificationConfig.model_validate(
+                {
+                    "enabled": True,
+                    "channels": {"test": {"enabled": True, **channel}},
+                    "sent_log_path": os.path.join(self.tmp.name, "sent.db"),
+                }
+            )
+        )
+
+    def notify_with(self, sender: RecordingSender):
+        manager = self.manager({"type": "console"})
+        manager.senders["console"] = sender
+        with mock.patch("engine.monitor.notification_manager", manager):
+            self.monitor.notify_pending(self.item)
+
+    def assert_state_unchanged(self):
+        self.assertEqual(
+            self.state_store.get(SYMBOL), {"trend": "下跌", "breakout": False}
+        )
+        self.assertNotIn(DONE, self.checkpoints.load("test").get(SYMBOL, {}))
+        # 下一次运行仍能发现状态变化并重新推送
+        self.assertTrue(self.state_store.diff(SYMBOL, self.item["result"]))
+
+    def test_failed_send_keeps_previous_state(self):
+        with self.assertRaises(RuntimeError):
+            self.notify_with(RecordingSender(fail=True))
+        self.assert_state_unchanged()
+
+    def test_slack_api_error_keeps_previous_state(self):
+        manager = self.manager(
+            {"type": "slack", "token": "xoxb-test", "default_channel": "#test"}
+        )
+        error = SlackApiError("error", {"ok": False, "error": "invalid_auth"})
+        with (
+            mock.patch("engine.monitor.notification_manager", manager),
+            mock.patch(
+                "notifiers.senders.slack.WebClient.chat_postMessage",
+                side_effect=error,
+            ),
+        ):
+            with self.assertRaises(RuntimeError):
+                self.monitor.notify_pending(self.item)
+        self.assert_state_unchanged()
+
+    def test_successful_send_saves_state(self):
+        sender = RecordingSender(fail=False)
+        self.notify_with(sender)
+        self.assertEqual(len(sender.messages), 1)
+        self.assertEqual(
+            self.state_store.get(SYMBOL), {"trend": "上涨", "breakout": True}
+        )
+        self.assertIn(DONE, self.checkpoints.load("test")[SYMBOL])
+
+
+if __name__ == "__main__":
+    unittest.main()
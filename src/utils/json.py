@@ -35,3 +35,10 @@ def to_pretty_json(data: Any) -> str:
     return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2).decode(
         "utf-8"
     )
+
+
+def to_json(data: Any) -> str:
+    """
+    将 Python 对象安全序列化为紧凑 JSON 字符串（用于持久化）
+    """
+    return orjson.dumps(data, default=_json_default).decode("utf-8")
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Tuple
+
+# 首次连接时对数据库执行的初始化（如清理过期记录、升级表结构）
+InitHook = Callable[[sqlite3.Connection], None]
+
+
+class SQLiteDatabase:
+    """
+    按线程复用连接的 SQLite 文件
+    sqlite3 连接不能跨线程共享，每个线程各用一个；连接开启 WAL，读写互不阻塞。
+    同一文件上的多个存储（如信号状态与运行检查点）共用一个实例，
+    各自的表结构与初始化在该文件上只执行一次。
+    """
+
+    def __init__(self, path: str, isolation_level: str | None = "", row_factory=None):
+        """
+        :param isolation_level: 传给 sqlite3.connect，None 为自动提交（事务由调用方显式控制）
+        :param row_factory: 如 sqlite3.Row，按列名访问查询结果
+        """
+        self.path = path
+        self.isolation_level = isolation_level
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized: set[str] = set()
+
+    def connect(self, schema: str, init: InitHook | None = None) -> sqlite3.Connection:
+        """
+        当前线程的连接
+        :param schema: 建表语句，首次连接时执行
+        :param init: 建表后执行一次的初始化
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=self.isolation_level
+            )
+            conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if schema not in self._initialized:
+            with self._init_lock:
+                if schema not in self._initialized:
+                    conn.executescript(schema)
+                    if init is not None:
+                        init(conn)
+                    self._initialized.add(schema)
+        return conn
+
+
+_databases: Dict[Tuple, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def open_database(
+    path: str, isolation_level: str | None = "", row_factory=None
+) -> SQLiteDatabase:
+    """同一文件、同一连接选项的 SQLiteDatabase 在进程内只创建一个"""
+    key = (os.path.abspath(path), isolation_level, row_factory)
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = SQLiteDatabase(path, isolation_level, row_factory)
+        return _databases[key]
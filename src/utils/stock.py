@@ -1,5 +1,8 @@
 import re
 
+import numpy as np
+import pandas as pd
+
 
 def validate_stock_code(code: str) -> bool:
     """
@@ -41,3 +44,17 @@ def extract_code(fullcode: str) -> str:
     if match:
         return match.group(2)
     return fullcode
+
+
+def get_fullcodes(codes: pd.Series) -> np.ndarray:
+    """
+    批量为 6 位代码加上交易所前缀
+    6 开头为上交所（含科创板），0/3 开头为深交所，其余为北交所
+    """
+    codes = codes.astype(str)
+    prefix = np.select(
+        [codes.str.startswith("6"), codes.str.startswith(("0", "3"))],
+        ["sh", "sz"],
+        default="bj",
+    )
+    return prefix + codes.to_numpy()